@@ -0,0 +1,181 @@
+"""
+Contrôle d’admission des requêtes liées à la base.
+
+Au-delà de ce que SQLite absorbe, les requêtes s’empilent dans le pool de
+threads derrière ``get_db`` et la latence croît sans limite. Un
+``AdmissionLimiter`` borne le nombre de requêtes en cours et la file
+d’attente qui les précède ; ``AdmissionMiddleware`` l’applique avant
+l’envoi au pool de threads et répond 503 (avec ``Retry-After``) dès que
+la file est pleine ou que l’attente dépasse son délai.
+
+L’attente se fait dans la boucle d’événements, sans occuper de thread.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+def _wake(future: asyncio.Future):
+    """Réveille une requête en attente (si elle attend encore)."""
+    if not future.done():
+        future.set_result(True)
+
+
+class AdmissionLimiter:
+    """
+    Limite de concurrence avec file d’attente bornée.
+
+    Au plus ``max_concurrent`` requêtes s’exécutent ; au plus
+    ``max_queue`` attendent, chacune pendant ``queue_timeout`` secondes au
+    maximum. Une place libérée est transmise directement à la plus
+    ancienne requête en attente (ordre FIFO).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float = 5.0
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self.active = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self.queue_wait = 0.0
+
+    async def acquire(self) -> bool:
+        """
+        Attend une place ; retourne False si la requête est refusée
+        (file pleine ou délai d’attente dépassé).
+        """
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                return True
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                return False
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self.queued += 1
+            self.max_queue_depth = max(
+                self.max_queue_depth, len(self._waiters)
+            )
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter[1]), self.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # Requête annulée : rendre la place si elle a été transmise
+            if not self._abandon(waiter):
+                self.release()
+            raise
+        abandoned = self._abandon(waiter)
+        with self._lock:
+            self.queue_wait += time.perf_counter() - start
+            if abandoned:
+                self.timeouts += 1
+                self.rejected += 1
+                return False
+            # Place transmise (éventuellement juste avant le délai)
+            self.admitted += 1
+            return True
+
+    def _abandon(self, waiter: tuple) -> bool:
+        """Retire une requête de la file ; False si elle n’y est plus."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                return False
+            return True
+
+    def release(self):
+        """Libère une place, transmise à la première requête en attente."""
+        with self._lock:
+            if self._waiters:
+                loop, future = self._waiters.popleft()
+            else:
+                self.active -= 1
+                return
+        loop.call_soon_threadsafe(_wake, future)
+
+    def stats(self) -> dict:
+        """Retourne la charge courante et les compteurs de la limite."""
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "queue_wait_seconds": round(self.queue_wait, 6),
+            }
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI appliquant une limite choisie par requête.
+
+    ``select`` reçoit le scope HTTP et retourne la limite à appliquer, ou
+    None pour une requête non limitée.
+    """
+
+    def __init__(
+        self,
+        app,
+        select: Callable[[dict], Optional[AdmissionLimiter]],
+        retry_after: int = 1
+    ):
+        self.app = app
+        self.select = select
+        self.body = json.dumps(
+            {"detail": "Serveur surchargé, réessayer plus tard"},
+            ensure_ascii=False
+        ).encode()
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.select(scope) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        if not await limiter.acquire():
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": self.headers,
+            })
+            await send({"type": "http.response.body", "body": self.body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -1,21 +1,225 @@
 """Application FastAPI pour la gestion des clients avec validation, persistance et documentation."""
 
-from typing import Optional, List
+import asyncio
+import base64
+import binascii
+import csv
+import hashlib
+import io
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from typing import (
+    Any, Awaitable, Callable, Iterable, Iterator, Literal, Optional, List,
+    Union
+)
+from urllib.parse import urlencode
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy import create_engine, Column, Integer, String
+from fastapi import (
+    FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request,
+    Response
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import (
+    create_engine, delete, event, insert, inspect, literal_column, select,
+    sql, text, update, Column, DDL, Integer, String
+)
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession, async_sessionmaker, create_async_engine
+)
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 
+from admission import AdmissionLimiter, AdmissionMiddleware
+from batching import WriteBatcher
+from cache import ReadThroughCache, SingleFlight, create_cache_backend
+from idempotency import (
+    IdempotencyConflict, IdempotencyPending, StoredResponse,
+    create_idempotency_store
+)
+from metrics import (
+    Metrics, MetricsMiddleware, TimedQueuePool, install_statement_metrics
+)
+from profiler import (
+    ProfileStore, ProfilerBusy, ProfilingMiddleware, SamplingProfiler,
+    install_signal_handler, render_collapsed, token_matches
+)
+from querylog import QueryTrackingMiddleware, install_query_log
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur json
+    orjson = None
 
-# Configuration de la base de données
-CONNECTION_STRING = "sqlite:///./test.db"
 
-engine = create_engine(
-    CONNECTION_STRING,
-    connect_args={"check_same_thread": False}
+# Configuration de la base de données
+CONNECTION_STRING = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+ASYNC_CONNECTION_STRING = os.getenv(
+    "ASYNC_DATABASE_URL",
+    CONNECTION_STRING.replace("sqlite://", "sqlite+aiosqlite://", 1)
 )
 
+# Métriques Prometheus exposées sur /metrics (requêtes HTTP des routes
+# client, requêtes SQL, pool de connexions)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Journal des requêtes SQL plus lentes que le seuil, avec leur plan
+# d’exécution (0 : pas de journal) ; en mode debug, chaque réponse
+# indique ses instructions SQL et le temps passé en base
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SQL_DEBUG = os.getenv("SQL_DEBUG", "0") == "1"
+
+# Profilage par échantillonnage : jeton d’administration exigé par
+# /api/v1/admin/profile et l’en-tête X-Profile (vide : désactivé), période
+# d’échantillonnage et durée maximale d’un profil
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+# Signal déclenchant un profil écrit sur disque (ex. SIGUSR2 ; vide : aucun)
+PROFILER_SIGNAL = os.getenv("PROFILER_SIGNAL", "")
+PROFILER_SIGNAL_SECONDS = float(os.getenv("PROFILER_SIGNAL_SECONDS", "10"))
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", tempfile.gettempdir())
+
+# Mode des endpoints CRUD client : "sync" (threadpool) ou "async"
+API_MODE = os.getenv("API_MODE", "sync")
+
+# Profils de réglage du moteur : PRAGMA SQLite appliqués à chaque nouvelle
+# connexion et paramètres du pool de connexions
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
+DB_PROFILES = {
+    "default": {
+        "pragmas": {},
+        "pool": {},
+    },
+    "production": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "cache_size": -64000,
+            "mmap_size": 268435456,
+            "temp_store": "MEMORY",
+        },
+        "pool": {
+            "pool_size": 20,
+            "max_overflow": 20,
+            "pool_timeout": 10,
+            "pool_pre_ping": True,
+            "pool_recycle": 3600,
+        },
+    },
+}
+
+# Surcharges individuelles du pool par variables d’environnement
+POOL_ENV_VARIABLES = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": (
+        "DB_POOL_PRE_PING", lambda value: value.lower() in ("1", "true")
+    ),
+}
+
+
+def is_memory_sqlite(url: str) -> bool:
+    """Indique si l’URL désigne une base SQLite en mémoire."""
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database in (None, "", ":memory:")
+    )
+
+
+def sqlite_pragmas(profile: str = DB_PROFILE) -> dict:
+    """
+    Retourne les PRAGMA SQLite du profil.
+
+    ``SQLITE_PRAGMAS`` (ex. ``busy_timeout=10000,cache_size=-32000``)
+    complète ou remplace les valeurs du profil.
+    """
+    pragmas = dict(DB_PROFILES[profile]["pragmas"])
+    for item in os.getenv("SQLITE_PRAGMAS", "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            pragmas[name.strip()] = value.strip()
+    return pragmas
+
+
+def pool_options(url: str, profile: str = DB_PROFILE) -> dict:
+    """
+    Retourne les paramètres du pool de connexions du profil.
+
+    Les variables ``DB_POOL_*`` surchargent le profil ; une base SQLite en
+    mémoire garde le pool par défaut de SQLAlchemy.
+    """
+    if is_memory_sqlite(url):
+        return {}
+    options = dict(DB_PROFILES[profile]["pool"])
+    for option, (variable, convert) in POOL_ENV_VARIABLES.items():
+        if os.getenv(variable):
+            options[option] = convert(os.getenv(variable))
+    return options
+
+
+def install_sqlite_pragmas(sync_engine: Engine, pragmas: dict):
+    """Applique les PRAGMA à chaque connexion ouverte par le moteur."""
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(
+    url: str = CONNECTION_STRING,
+    profile: str = DB_PROFILE
+) -> Engine:
+    """
+    Crée le moteur synchrone réglé selon le profil choisi.
+
+    Hors base en mémoire, le pool mesure l’attente de chaque emprunt de
+    connexion (métrique ``db_pool_wait_seconds``).
+    """
+    if profile not in DB_PROFILES:
+        raise ValueError(f"DB_PROFILE inconnu : {profile}")
+    connect_args = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+    options = pool_options(url, profile)
+    if not is_memory_sqlite(url):
+        options["poolclass"] = TimedQueuePool
+    db_engine = create_engine(
+        url,
+        connect_args=connect_args,
+        **options
+    )
+    install_sqlite_pragmas(db_engine, sqlite_pragmas(profile))
+    return db_engine
+
+
+engine = create_db_engine()
+
+install_query_log(engine, SLOW_QUERY_MS / 1000)
+
+metrics = Metrics() if METRICS_ENABLED else None
+if metrics is not None:
+    install_statement_metrics(engine, metrics)
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -24,6 +228,97 @@ SessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# Cache des lectures client par codcli (0 entrée : cache désactivé, par
+# défaut) ; le stockage "sqlite" est partagé par les workers d’un même hôte
+CLIENT_CACHE_MAX_ENTRIES = int(os.getenv("CLIENT_CACHE_MAX_ENTRIES", "0"))
+CLIENT_CACHE_TTL = float(os.getenv("CLIENT_CACHE_TTL", "30"))
+CLIENT_CACHE_BACKEND = os.getenv("CLIENT_CACHE_BACKEND", "memory")
+CLIENT_CACHE_PATH = os.getenv("CLIENT_CACHE_PATH", "./client_cache.db")
+
+# Chemin rapide de la liste : lignes Core encodées directement en JSON,
+# sans objets ORM ni validation Pydantic ligne à ligne
+CLIENT_FAST_JSON = os.getenv("CLIENT_FAST_JSON", "0") == "1"
+
+# Regroupement des lectures identiques simultanées (single-flight) : une
+# seule requête SQL par client ou par page en cours de lecture
+CLIENT_READ_COALESCING = os.getenv("CLIENT_READ_COALESCING", "1") == "1"
+
+# Regroupement des écritures unitaires (group commit) : les POST, PATCH et
+# DELETE concurrents sont validés ensemble toutes les quelques
+# millisecondes, ou dès que le lot atteint sa taille maximale
+CLIENT_WRITE_BATCH = os.getenv("CLIENT_WRITE_BATCH", "0") == "1"
+CLIENT_WRITE_BATCH_SIZE = int(os.getenv("CLIENT_WRITE_BATCH_SIZE", "64"))
+CLIENT_WRITE_BATCH_DELAY_MS = float(
+    os.getenv("CLIENT_WRITE_BATCH_DELAY_MS", "2")
+)
+
+# Contrôle d’admission des routes client : requêtes simultanées et file
+# d’attente bornées, séparément pour les lectures et les écritures
+# (0 requête simultanée : pas de limite) ; 503 quand la file est pleine
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", "0"))
+ADMISSION_READ_QUEUE = int(os.getenv("ADMISSION_READ_QUEUE", "64"))
+ADMISSION_WRITE_CONCURRENCY = int(
+    os.getenv("ADMISSION_WRITE_CONCURRENCY", "0")
+)
+ADMISSION_WRITE_QUEUE = int(os.getenv("ADMISSION_WRITE_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+ADMISSION_READ_METHODS = ("GET", "HEAD")
+
+# Clés d’idempotence des créations et écritures en masse : une requête
+# répétée avec le même en-tête Idempotency-Key reçoit la réponse
+# enregistrée (0 entrée : en-tête ignoré)
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "100000"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+IDEMPOTENCY_PATH = os.getenv("IDEMPOTENCY_PATH", "./idempotency.db")
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "10"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Pagination par curseur (keyset) sur la clé primaire
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Recherche plein texte : index FTS5 (trigrammes) tenu à jour par triggers
+CLIENT_SEARCH_TABLE = "t_client_fts"
+CLIENT_SEARCH_FIELDS = ("nom", "prenom", "adresse", "complement_adresse")
+MIN_SEARCH_TERM_LENGTH = 3
+
+# Statistiques : compteurs par dimension tenus à jour par triggers
+CLIENT_STATS_TABLE = "t_client_stats"
+CLIENT_STATS_DIMENSIONS = ("newsletter", "genre")
+
+# Export en flux : lignes lues et envoyées par lots
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Création en masse : taille des lots d’insertion et taille maximale
+BULK_CHUNK_SIZE = 500
+MAX_BULK_ITEMS = 100_000
+# Mise à jour / suppression en masse : identifiants par requête SQL
+MAX_BULK_IDS = 10_000
+
+
+_row_version_lock = threading.Lock()
+_last_row_version = 0
+
+
+def new_row_version() -> int:
+    """
+    Retourne la version initiale d’une nouvelle ligne client.
+
+    Tirée de l’horloge (en µs) et strictement croissante dans le processus,
+    elle évite qu’un codcli réattribué par SQLite après une suppression
+    retrouve l’ETag de l’ancien client.
+    """
+    global _last_row_version
+    with _row_version_lock:
+        _last_row_version = max(time.time_ns() // 1000, _last_row_version + 1)
+        return _last_row_version
+
 
 class Client(Base):
     """Modèle SQLAlchemy représentant un client."""
@@ -32,16 +327,273 @@ class Client(Base):
 
     codcli = Column(Integer, primary_key=True, index=True)
     nom = Column(String(40), index=True)
-    prenom = Column(String(30))
+    prenom = Column(String(30), index=True)
     genre = Column(String(8), default=None)
     adresse = Column(String(50))
     complement_adresse = Column(String(50), default=None)
-    tel = Column(String(10), default=None)
-    email = Column(String(255), default=None)
-    newsletter = Column(Integer, default=0)
+    tel = Column(String(10), default=None, index=True)
+    email = Column(String(255), default=None, index=True)
+    newsletter = Column(Integer, default=0, index=True)
+    # Version de ligne (ETag, If-Match) : incrémentée à chaque UPDATE
+    version = Column(
+        Integer,
+        nullable=False,
+        default=new_row_version,
+        onupdate=literal_column("version") + 1,
+        server_default=text("1")
+    )
+
+
+client_table = Client.__table__
+CLIENT_FIELDS = tuple(column.name for column in client_table.columns)
+
+
+def _search_values(prefix: str) -> str:
+    """Liste les colonnes indexées d’une ligne de trigger (new/old)."""
+    return ", ".join(
+        [f"{prefix}.codcli"]
+        + [f"{prefix}.{field}" for field in CLIENT_SEARCH_FIELDS]
+    )
+
+
+_SEARCH_COLUMNS = ", ".join(("rowid",) + CLIENT_SEARCH_FIELDS)
+_SEARCH_INSERT = (
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}({_SEARCH_COLUMNS}) "
+    f"VALUES ({_search_values('new')});"
+)
+_SEARCH_DELETE = (
+    f"INSERT INTO {CLIENT_SEARCH_TABLE}"
+    f"({CLIENT_SEARCH_TABLE}, {_SEARCH_COLUMNS}) "
+    f"VALUES ('delete', {_search_values('old')});"
+)
+
+# Table FTS5 à contenu externe (les textes restent dans t_client) et
+# triggers qui la synchronisent ; la mise à jour ne réindexe que si un
+# champ indexé change
+CLIENT_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {CLIENT_SEARCH_TABLE} USING fts5("
+    f"{', '.join(CLIENT_SEARCH_FIELDS)}, content='t_client', "
+    "content_rowid='codcli', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_SEARCH_TABLE}_ai "
+    f"AFTER INSERT ON t_client BEGIN {_SEARCH_INSERT} END",
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_SEARCH_TABLE}_ad "
+    f"AFTER DELETE ON t_client BEGIN {_SEARCH_DELETE} END",
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_SEARCH_TABLE}_au "
+    f"AFTER UPDATE OF {', '.join(CLIENT_SEARCH_FIELDS)} ON t_client "
+    f"BEGIN {_SEARCH_DELETE} {_SEARCH_INSERT} END",
+)
+
+for _statement in CLIENT_SEARCH_DDL:
+    event.listen(
+        client_table, "after_create",
+        DDL(_statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    client_table, "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {CLIENT_SEARCH_TABLE}")
+    .execute_if(dialect="sqlite")
+)
+
+client_search_table = sql.table(
+    CLIENT_SEARCH_TABLE, sql.column("rowid"), sql.column("rank")
+)
+
+
+def install_client_search(bind: Engine = engine, rebuild: bool = False):
+    """
+    Installe l’index plein texte et ses triggers s’ils manquent.
+
+    ``rebuild`` réindexe tout t_client : nécessaire quand l’index est
+    ajouté à une base existante, ou pour le réparer.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        for statement in CLIENT_SEARCH_DDL:
+            conn.exec_driver_sql(statement)
+        if rebuild:
+            conn.exec_driver_sql(
+                f"INSERT INTO {CLIENT_SEARCH_TABLE}({CLIENT_SEARCH_TABLE}) "
+                "VALUES ('rebuild')"
+            )
+
+
+def _stats_upsert(dimension: str, value: str, delta: int) -> str:
+    """Instruction de trigger qui ajoute ``delta`` à un compteur."""
+    return (
+        f"INSERT INTO {CLIENT_STATS_TABLE} (dimension, value, count) "
+        f"VALUES ('{dimension}', {value}, {delta}) "
+        "ON CONFLICT (dimension, value) "
+        f"DO UPDATE SET count = count + ({delta});"
+    )
+
+
+def _stats_trigger_body(row: str, delta: int) -> str:
+    """Met à jour le total et chaque répartition pour une ligne."""
+    return " ".join(
+        [_stats_upsert("total", "'*'", delta)]
+        + [
+            _stats_upsert(dimension, f"quote({row}.{dimension})", delta)
+            for dimension in CLIENT_STATS_DIMENSIONS
+        ]
+    )
+
+
+# Compteurs par (dimension, valeur) : la valeur est stockée sous sa forme
+# SQL (quote()) pour distinguer NULL, texte et entier ; « total » a la
+# seule valeur '*'. Un trigger par dimension ne la recompte que si elle
+# change.
+CLIENT_STATS_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {CLIENT_STATS_TABLE} ("
+    "dimension VARCHAR(20) NOT NULL, value VARCHAR(300) NOT NULL, "
+    "count INTEGER NOT NULL, PRIMARY KEY (dimension, value))",
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_STATS_TABLE}_ai "
+    f"AFTER INSERT ON t_client BEGIN {_stats_trigger_body('new', 1)} END",
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_STATS_TABLE}_ad "
+    f"AFTER DELETE ON t_client BEGIN {_stats_trigger_body('old', -1)} END",
+) + tuple(
+    f"CREATE TRIGGER IF NOT EXISTS {CLIENT_STATS_TABLE}_au_{dimension} "
+    f"AFTER UPDATE OF {dimension} ON t_client "
+    f"WHEN old.{dimension} IS NOT new.{dimension} BEGIN "
+    f"{_stats_upsert(dimension, f'quote(old.{dimension})', -1)} "
+    f"{_stats_upsert(dimension, f'quote(new.{dimension})', 1)} END"
+    for dimension in CLIENT_STATS_DIMENSIONS
+)
+
+for _statement in CLIENT_STATS_DDL:
+    event.listen(
+        client_table, "after_create",
+        DDL(_statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    client_table, "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {CLIENT_STATS_TABLE}")
+    .execute_if(dialect="sqlite")
+)
+
+client_stats_table = sql.table(
+    CLIENT_STATS_TABLE,
+    sql.column("dimension"), sql.column("value"), sql.column("count")
+)
+
+
+def decode_stat_value(value: str):
+    """Décode une valeur de compteur stockée sous sa forme SQL quote()."""
+    if value == "NULL":
+        return None
+    if value.startswith("'"):
+        return value[1:-1].replace("''", "'")
+    return int(value)
+
+
+def actual_client_stats(conn) -> dict:
+    """
+    Recompte les clients par (dimension, valeur) avec des COUNT(*).
+
+    Réservé à la réconciliation : les lectures passent par les compteurs.
+    """
+    counts = {("total", "*"): conn.scalar(
+        text("SELECT count(*) FROM t_client")
+    )}
+    for dimension in CLIENT_STATS_DIMENSIONS:
+        rows = conn.execute(text(
+            f"SELECT quote({dimension}), count(*) FROM t_client "
+            f"GROUP BY quote({dimension})"
+        ))
+        counts.update(((dimension, value), count) for value, count in rows)
+    return counts
+
+
+def reconcile_client_stats(bind: Engine = engine) -> List[dict]:
+    """
+    Recalcule les compteurs de statistiques et corrige leur dérive.
+
+    Retourne les écarts constatés (compteur stocké et valeur réelle) ;
+    les compteurs sont réécrits dans la même transaction.
+    """
+    with bind.begin() as conn:
+        stored = {
+            (dimension, value): count
+            for dimension, value, count in conn.execute(
+                select(client_stats_table)
+            )
+        }
+        actual = actual_client_stats(conn)
+        drift = [
+            {
+                "dimension": dimension,
+                "value": decode_stat_value(value)
+                if dimension != "total" else None,
+                "stored": stored.get((dimension, value), 0),
+                "actual": actual.get((dimension, value), 0),
+            }
+            for dimension, value in sorted(set(stored) | set(actual))
+            if stored.get((dimension, value), 0)
+            != actual.get((dimension, value), 0)
+        ]
+        conn.execute(delete(client_stats_table))
+        conn.execute(insert(client_stats_table), [
+            {"dimension": dimension, "value": value, "count": count}
+            for (dimension, value), count in actual.items()
+        ])
+    return drift
+
+
+def install_client_stats(bind: Engine = engine, rebuild: bool = False):
+    """
+    Installe la table des compteurs et ses triggers s’ils manquent.
+
+    ``rebuild`` recalcule les compteurs : nécessaire quand ils sont
+    ajoutés à une base existante.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        for statement in CLIENT_STATS_DDL:
+            conn.exec_driver_sql(statement)
+    if rebuild:
+        reconcile_client_stats(bind)
+
+
+def init_db(bind: Engine = engine):
+    """
+    Crée les tables manquantes et met à niveau une base existante.
+
+    ``create_all`` ne modifie pas une table déjà présente : les colonnes
+    ajoutées depuis au modèle le sont par ALTER TABLE, puis les index
+    manquants sont créés. Un index plein texte ou des compteurs de
+    statistiques absents sont créés et alimentés avec les clients
+    existants.
+    """
+    Base.metadata.create_all(bind=bind)
+    existing = {
+        column["name"]
+        for column in inspect(bind).get_columns(client_table.name)
+    }
+    with bind.begin() as conn:
+        for column in client_table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f"ALTER TABLE {client_table.name} ADD COLUMN {column.name} "
+                f"{column.type.compile(bind.dialect)}"
+            )
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg.text}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            conn.exec_driver_sql(ddl)
+        for index in client_table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    install_client_search(
+        bind, rebuild=not inspect(bind).has_table(CLIENT_SEARCH_TABLE)
+    )
+    install_client_stats(
+        bind, rebuild=not inspect(bind).has_table(CLIENT_STATS_TABLE)
+    )
 
 
-Base.metadata.create_all(bind=engine)
+init_db()
 
 
 class ClientBase(BaseModel):
@@ -79,97 +631,1330 @@ class ClientInDB(ClientBase):
     """Schéma enrichi avec l’identifiant du client."""
 
     codcli: int
+    version: int = 1
 
     class Config:
-        """Configuration pour l’utilisation avec ORM."""
+        """Configuration pour l’utilisation avec ORM (Pydantic 1 et 2)."""
         orm_mode = True
+        from_attributes = True
+
+
+# Ordre des champs d’un ClientInDB sérialisé (Pydantic 2, sinon 1)
+CLIENT_JSON_FIELDS = tuple(
+    getattr(ClientInDB, "model_fields", None) or ClientInDB.__fields__
+)
+
+# Représentation des lectures : tuple nommé immuable aux champs de
+# ClientInDB, sans instrumentation ORM ni entrée dans l’identity map
+ClientRecord = namedtuple("ClientRecord", CLIENT_JSON_FIELDS)
+
+
+class ClientBulkError(BaseModel):
+    """Erreur rencontrée sur un élément d’une création en masse."""
+
+    index: int
+    detail: Any
+
+
+class ClientBulkResult(BaseModel):
+    """Résultat d’une création en masse."""
+
+    codcli: List[Optional[int]]
+    errors: List[ClientBulkError] = []
+
+
+class ClientFilter(BaseModel):
+    """Filtre simple sur les clients pour les opérations en masse."""
+
+    newsletter: Optional[int] = None
+    genre: Optional[str] = None
+
+
+class ClientSelection(BaseModel):
+    """Sélection de clients par liste d’identifiants et/ou filtre."""
+
+    ids: Optional[List[int]] = None
+    filter: Optional[ClientFilter] = None
+
+
+class ClientBulkPatch(ClientSelection):
+    """Mise à jour partielle appliquée à toute une sélection."""
+
+    patch: ClientPatch
+
+
+class ClientBulkCount(BaseModel):
+    """Nombre de clients affectés par une opération en masse."""
+
+    affected: int
+
+
+class ClientStatBucket(BaseModel):
+    """Nombre de clients ayant une valeur donnée d’un champ."""
+
+    value: Optional[Union[int, str]] = None
+    count: int
+
+
+class ClientStats(BaseModel):
+    """Statistiques agrégées des clients."""
+
+    total: int
+    newsletter_ratio: float
+    newsletter: List[ClientStatBucket]
+    genre: List[ClientStatBucket]
+
+
+def encode_cursor(value: int, kind: str = "codcli") -> str:
+    """
+    Encode un curseur opaque pour la page suivante.
+
+    ``kind`` précise la nature de la valeur : dernier codcli de la page
+    (liste) ou position dans les résultats (``offset``, recherche).
+    """
+    raw = f"{kind}:{value}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str = "codcli") -> int:
+    """Décode un curseur opaque ; lève une erreur 400 s’il est invalide."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = base64.urlsafe_b64decode(padded).decode()
+        prefix, _, value = decoded.partition(":")
+        if prefix != kind:
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Retourne la plus petite chaîne supérieure à toutes celles qui
+    commencent par ``prefix`` (None s’il n’en existe pas).
+
+    Les demi-codets (U+D800 à U+DFFF), qui ne s’encodent pas en UTF-8,
+    sont sautés : la borne qui suit U+D7FF est U+E000.
+    """
+    while prefix and ord(prefix[-1]) == 0x10FFFF:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if following == 0xD800:
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
+def filter_key(filters: Optional[dict]) -> tuple:
+    """Forme hachable et ordonnée d’un jeu de filtres (clé de lecture)."""
+    return tuple(sorted((filters or {}).items()))
+
+
+def client_search_criteria(filters: Optional[dict]) -> list:
+    """
+    Construit les conditions WHERE des filtres de recherche.
+
+    ``champ`` filtre en égalité, ``champ_prefix`` par préfixe. Un préfixe
+    est traduit en intervalle ``champ >= p AND champ < p'`` plutôt qu’en
+    LIKE : SQLite le résout par un parcours de plage de l’index du champ.
+    """
+    criteria = []
+    for key, value in (filters or {}).items():
+        column = client_table.c[key.removesuffix("_prefix")]
+        if not key.endswith("_prefix"):
+            criteria.append(column == value)
+            continue
+        criteria.append(column >= value)
+        upper_bound = prefix_upper_bound(value)
+        if upper_bound is not None:
+            criteria.append(column < upper_bound)
+    return criteria
+
+
+def select_clients_page(
+    after: Optional[int],
+    limit: int,
+    fields: Optional[Iterable[str]] = None,
+    filters: Optional[dict] = None
+):
+    """
+    Construit la requête keyset d’une page de clients.
+
+    Sans ``fields``, la requête charge des objets ORM ; sinon elle ne lit
+    que ces colonnes, en lignes Core. ``filters`` restreint la page aux
+    clients correspondant aux filtres de recherche.
+    """
+    columns = (
+        [client_table.c[field] for field in fields] if fields else [Client]
+    )
+    statement = (
+        select(*columns)
+        .where(*client_search_criteria(filters))
+        .order_by(Client.codcli)
+        .limit(limit)
+    )
+    if after is not None:
+        statement = statement.where(Client.codcli > after)
+    return statement
+
+
+def select_client_records():
+    """Construit un SELECT des colonnes d’un ClientRecord, dans l’ordre."""
+    return select(*(client_table.c[field] for field in CLIENT_JSON_FIELDS))
+
+
+def search_match_query(text_query: str) -> Optional[str]:
+    """
+    Traduit une saisie libre en requête FTS5.
+
+    Chaque mot devient une phrase entre guillemets (les opérateurs FTS5
+    sont ainsi pris littéralement) et les mots se cumulent (ET). Les mots
+    trop courts pour un trigramme sont ignorés ; retourne None s’il n’en
+    reste aucun.
+    """
+    terms = [
+        '"' + term.replace('"', '""') + '"'
+        for term in text_query.split()
+        if len(term) >= MIN_SEARCH_TERM_LENGTH
+    ]
+    return " ".join(terms) or None
+
+
+def select_client_search(match_query: str, offset: int, limit: int):
+    """Construit la recherche plein texte, triée par pertinence (bm25)."""
+    return (
+        select_client_records()
+        .join_from(
+            client_table, client_search_table,
+            client_search_table.c.rowid == client_table.c.codcli
+        )
+        .where(literal_column(CLIENT_SEARCH_TABLE).match(match_query))
+        .order_by(client_search_table.c.rank, client_table.c.codcli)
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def insert_client_statement(data: dict):
+    """Construit l’INSERT ... RETURNING d’un client."""
+    return insert(client_table).values(**data).returning(*client_table.c)
+
+
+def client_criteria(client_id: int, versions: Optional[List[int]] = None):
+    """Conditions WHERE d’un client, restreintes aux versions attendues."""
+    criteria = [client_table.c.codcli == client_id]
+    if versions is not None:
+        criteria.append(client_table.c.version.in_(versions))
+    return criteria
+
+
+def patch_client_statement(
+    client_id: int,
+    updates: dict,
+    versions: Optional[List[int]] = None
+):
+    """Construit l’UPDATE ... RETURNING d’un client."""
+    return (
+        update(client_table)
+        .where(*client_criteria(client_id, versions))
+        .values(**updates)
+        .returning(*client_table.c)
+    )
+
+
+def delete_client_statement(
+    client_id: int,
+    versions: Optional[List[int]] = None
+):
+    """Construit le DELETE ... RETURNING d’un client."""
+    return (
+        delete(client_table)
+        .where(*client_criteria(client_id, versions))
+        .returning(*client_table.c)
+    )
+
+
+def writable_fields(updates: dict) -> dict:
+    """Ne conserve que les colonnes modifiables d’une mise à jour."""
+    return {
+        field: value for field, value in updates.items()
+        if field in CLIENT_FIELDS and field not in ("codcli", "version")
+    }
+
+
+def client_etag(codcli: int, version: int) -> str:
+    """ETag fort d’un client, dérivé de son identifiant et de sa version."""
+    return f'"{codcli}-{version}"'
+
+
+def page_etag(clients: list, fields: Optional[tuple] = None) -> str:
+    """
+    ETag fort d’une page, dérivé des couples (codcli, version).
+
+    Une projection (``fields``) est une autre représentation de la page :
+    ses champs entrent aussi dans l’empreinte.
+    """
+    digest = hashlib.sha1()
+    if fields is not None:
+        digest.update(f"{','.join(fields)}|".encode())
+    for client in clients:
+        digest.update(f"{client.codcli}:{client.version};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Compare un en-tête If-None-Match à un ETag (comparaison faible).
+
+    Accepte ``*`` et une liste d’ETags séparés par des virgules.
+    """
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (
+        candidate[2:] if candidate.startswith("W/") else candidate
+        for candidate in candidates
+    )
+
+
+def if_match_versions(header: Optional[str], client_id: int):
+    """
+    Extrait d’un en-tête If-Match les versions attendues du client.
+
+    Retourne None sans condition (en-tête absent ou ``*``), sinon la liste
+    des versions (éventuellement vide) des ETags forts visant ce client.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for candidate in header.split(","):
+        codcli, _, version = candidate.strip().strip('"').partition("-")
+        if codcli == str(client_id) and version.isdigit():
+            versions.append(int(version))
+    return versions
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """
+    Analyse un paramètre ``fields`` (champs séparés par des virgules).
+
+    Retourne None sans projection, sinon les champs demandés dans leur
+    ordre, sans doublon ; lève une erreur 400 si un champ est inconnu.
+    """
+    if fields is None:
+        return None
+    requested = tuple(dict.fromkeys(
+        field.strip() for field in fields.split(",") if field.strip()
+    ))
+    unknown = [field for field in requested if field not in CLIENT_JSON_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Champs inconnus : {', '.join(unknown)}"
+        )
+    if not requested:
+        raise HTTPException(status_code=400, detail="Aucun champ demandé")
+    return requested
+
+
+def projection_columns(fields: tuple) -> tuple:
+    """
+    Colonnes à lire pour une projection : les champs demandés, suivis de
+    codcli et version s’ils manquent (curseur et ETag en ont besoin).
+    """
+    return fields + tuple(
+        field for field in ("codcli", "version") if field not in fields
+    )
+
+
+def split_page(clients: list, limit: int):
+    """
+    Sépare la ligne sentinelle d’une page lue avec ``limit + 1`` lignes.
+
+    Retourne la page et le curseur de la suivante (None si c’est la
+    dernière).
+    """
+    if len(clients) > limit:
+        clients = clients[:limit]
+        return clients, encode_cursor(clients[-1].codcli)
+    return clients, None
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Sérialise en JSON compact UTF-8, octet pour octet comme JSONResponse.
+
+    Utilise orjson s’il est installé, sinon le module json.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def rows_to_json(rows: Iterable[tuple], fields: Iterable[str]) -> bytes:
+    """Encode des lignes Core en tableau JSON d’objets ``fields``."""
+    fields = tuple(fields)
+    return dumps_json([dict(zip(fields, row)) for row in rows])
+
+
+def iter_ndjson(rows: Iterable[dict], batch_size: int) -> Iterator[bytes]:
+    """Sérialise des lignes en NDJSON, un bloc d’octets par lot."""
+    batch = []
+    for row in rows:
+        batch.append(dumps_json(row))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def iter_csv(
+    rows: Iterable[dict],
+    batch_size: int,
+    fields: Iterable[str] = CLIENT_FIELDS
+) -> Iterator[bytes]:
+    """Sérialise des lignes en CSV (avec en-tête), un bloc par lot."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
 
 
 class ClientRepository:
     """Couche d’accès aux données client."""
 
-    def __init__(self, db: Session):
-        """Initialise le repository avec une session SQLAlchemy."""
+    def __init__(self, db: Session, autocommit: bool = True):
+        """
+        Initialise le repository avec une session SQLAlchemy.
+
+        Sans ``autocommit``, les écritures unitaires ne valident pas
+        elles-mêmes : la transaction appartient à l’appelant (écritures
+        regroupées).
+        """
         self.db = db
+        self.autocommit = autocommit
+
+    def _commit(self):
+        """Valide une écriture unitaire si le repository en a la charge."""
+        if self.autocommit:
+            self.db.commit()
+
+    def _records(self, statement) -> List[ClientRecord]:
+        """Exécute un SELECT de ``select_client_records`` en ClientRecord."""
+        return [
+            ClientRecord._make(row) for row in self.db.execute(statement)
+        ]
+
+    def get_all_clients(self) -> List[ClientRecord]:
+        """Retourne tous les clients, en lecture seule."""
+        return self._records(
+            select_client_records().order_by(client_table.c.codcli)
+        )
+
+    def get_clients_page(
+        self,
+        after: Optional[int],
+        limit: int,
+        filters: Optional[dict] = None
+    ):
+        """
+        Retourne au plus ``limit`` clients dont le codcli suit ``after``.
 
-    def get_all_clients(self):
-        """Retourne tous les clients."""
-        return self.db.query(Client).all()
+        La pagination par clé (keyset) parcourt l’index de la clé primaire
+        à partir du curseur : le coût d’une page reste constant quelle que
+        soit sa profondeur, contrairement à un OFFSET. Avec ``filters``,
+        la recherche passe par l’index du champ filtré.
+        """
+        statement = select_clients_page(after, limit, filters=filters)
+        return self.db.scalars(statement).all()
+
+    def get_client_rows_page(
+        self,
+        after: Optional[int],
+        limit: int,
+        filters: Optional[dict] = None,
+        fields: Iterable[str] = CLIENT_JSON_FIELDS
+    ):
+        """
+        Comme ``get_clients_page``, en lignes Core sans objets ORM.
 
-    def get_client_by_id(self, client_id: int):
-        """Retourne un client par son identifiant."""
-        return self.db.query(Client).get(client_id)
+        Seules les colonnes ``fields`` sont lues, dans cet ordre (par
+        défaut, celles de ClientInDB).
+        """
+        statement = select_clients_page(after, limit, fields, filters)
+        return self.db.execute(statement).all()
+
+    def search_clients(
+        self,
+        match_query: str,
+        offset: int,
+        limit: int
+    ) -> List[ClientRecord]:
+        """Retourne les clients d’une requête FTS5 par pertinence."""
+        return self._records(
+            select_client_search(match_query, offset, limit)
+        )
+
+    def iter_clients(
+        self,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        fields: Iterable[str] = CLIENT_FIELDS
+    ):
+        """
+        Parcourt tous les clients par ordre de codcli, en dictionnaires.
+
+        ``yield_per`` récupère les lignes du curseur par lots au lieu de
+        charger toute la table, et les lignes Core évitent de construire
+        des objets ORM : la mémoire reste constante quelle que soit la
+        taille de la table. Seules les colonnes ``fields`` sont lues.
+        """
+        statement = (
+            select(*(client_table.c[field] for field in fields))
+            .order_by(client_table.c.codcli)
+            .execution_options(yield_per=batch_size)
+        )
+        return (row._asdict() for row in self.db.execute(statement))
+
+    def get_client_by_id(self, client_id: int) -> Optional[ClientRecord]:
+        """Retourne un client par son identifiant, en lecture seule."""
+        records = self._records(
+            select_client_records().where(client_table.c.codcli == client_id)
+        )
+        return records[0] if records else None
+
+    def get_client_fields(self, client_id: int, fields: Iterable[str]):
+        """Lit les seules colonnes ``fields`` d’un client, ou None."""
+        return self.db.execute(
+            select(*(client_table.c[field] for field in fields))
+            .where(client_table.c.codcli == client_id)
+        ).one_or_none()
+
+    def get_client_version(self, client_id: int) -> Optional[int]:
+        """Retourne la seule version d’un client, ou None s’il n’existe pas."""
+        return self.db.scalar(
+            select(client_table.c.version)
+            .where(client_table.c.codcli == client_id)
+        )
+
+    def get_stats(self):
+        """
+        Retourne les compteurs non nuls (dimension, valeur, nombre).
+
+        Les compteurs sont tenus par triggers : leur lecture ne parcourt
+        jamais t_client.
+        """
+        return self.db.execute(
+            select(client_stats_table)
+            .where(client_stats_table.c.count > 0)
+            .order_by(client_stats_table.c.dimension,
+                      client_stats_table.c.value)
+        ).all()
 
     def create_client(self, data: dict):
-        """Crée un nouveau client."""
-        client = Client(**data)
-        self.db.add(client)
-        self.db.commit()
-        self.db.refresh(client)
+        """
+        Crée un nouveau client.
+
+        L’INSERT renvoie directement la ligne créée (RETURNING) : un seul
+        aller-retour, sans SELECT de rafraîchissement après le commit.
+        """
+        client = self.db.execute(insert_client_statement(data)).one()
+        self._commit()
         return client
 
-    def patch_client(self, client_id: int, updates: dict):
+    def create_clients(
+        self,
+        rows: List[dict],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[int]:
         """
-        Met à jour partiellement un client existant.
+        Crée des clients en masse dans une seule transaction.
 
-        Seuls les champs valides du modèle sont modifiés.
-        Retourne None si le client n’existe pas.
+        Chaque lot est inséré par un seul INSERT multi-lignes avec
+        RETURNING, et le tout validé par un unique commit. Les codcli,
+        attribués croissants dans l’ordre des VALUES, sont triés pour être
+        renvoyés dans l’ordre des lignes ; en cas d’erreur, rien n’est
+        conservé.
         """
-        client = self.get_client_by_id(client_id)
-        if not client:
-            return None
+        ids = []
+        try:
+            for start in range(0, len(rows), chunk_size):
+                statement = insert(Client).values(
+                    rows[start:start + chunk_size]
+                ).returning(Client.codcli)
+                ids.extend(sorted(self.db.scalars(statement).all()))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return ids
+
+    @staticmethod
+    def _selection_criteria(ids: Optional[List[int]], filters: dict):
+        """Construit les conditions WHERE d’une sélection de clients."""
+        criteria = []
+        if ids is not None:
+            criteria.append(Client.codcli.in_(ids))
+        for field, value in filters.items():
+            criteria.append(getattr(Client, field) == value)
+        return criteria
+
+    def patch_clients(
+        self,
+        ids: Optional[List[int]],
+        filters: dict,
+        updates: dict
+    ) -> int:
+        """
+        Applique la même mise à jour à une sélection de clients.
+
+        Une seule instruction UPDATE ensembliste est exécutée, sans charger
+        les objets ORM. Retourne le nombre de lignes modifiées.
+        """
+        updates = {
+            field: value for field, value in updates.items()
+            if hasattr(Client, field)
+        }
+        if not updates:
+            return 0
+        statement = (
+            update(Client)
+            .where(*self._selection_criteria(ids, filters))
+            .values(**updates)
+            .execution_options(synchronize_session=False)
+        )
+        result = self.db.execute(statement)
+        self.db.commit()
+        return result.rowcount
 
-        for field, value in updates.items():
-            if hasattr(client, field):
-                setattr(client, field, value)
+    def delete_clients(self, ids: Optional[List[int]], filters: dict) -> int:
+        """
+        Supprime une sélection de clients en une seule instruction DELETE.
 
+        Retourne le nombre de lignes supprimées.
+        """
+        statement = (
+            delete(Client)
+            .where(*self._selection_criteria(ids, filters))
+            .execution_options(synchronize_session=False)
+        )
+        result = self.db.execute(statement)
         self.db.commit()
-        self.db.refresh(client)
+        return result.rowcount
+
+    def patch_client(
+        self,
+        client_id: int,
+        updates: dict,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Met à jour partiellement un client existant.
+
+        Seuls les champs valides du modèle sont modifiés, par un unique
+        UPDATE ... RETURNING qui incrémente aussi la version. Retourne None
+        si aucune ligne n’est touchée : client inexistant, ou version hors
+        de ``versions`` quand elles sont imposées.
+        """
+        updates = writable_fields(updates)
+        if not updates:
+            client = self.get_client_by_id(client_id)
+            if client is not None and versions is not None \
+                    and client.version not in versions:
+                return None
+            return client
+
+        statement = patch_client_statement(client_id, updates, versions)
+        client = self.db.execute(statement).one_or_none()
+        self._commit()
         return client
 
-    def delete_client(self, client_id: int):
-        """Supprime un client existant."""
-        client = self.get_client_by_id(client_id)
-        if not client:
-            return None
-        self.db.delete(client)
-        self.db.commit()
+    def delete_client(
+        self,
+        client_id: int,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Supprime un client existant par un unique DELETE ... RETURNING.
+
+        Retourne la ligne supprimée, ou None si aucune ligne n’est touchée
+        (client inexistant ou version hors de ``versions``).
+        """
+        statement = delete_client_statement(client_id, versions)
+        client = self.db.execute(statement).one_or_none()
+        self._commit()
         return client
 
 
 class ClientService:
     """Couche métier pour la gestion des clients."""
 
-    def __init__(self, repository: ClientRepository):
-        """Initialise le service avec un repository."""
+    def __init__(
+        self,
+        repository: ClientRepository,
+        cache: Optional[ReadThroughCache] = None,
+        writer: Optional[WriteBatcher] = None,
+        reads: Optional[SingleFlight] = None
+    ):
+        """
+        Initialise le service avec un repository.
+
+        Le cache optionnel sert les lectures par codcli ; les écritures du
+        service l’invalident avant de rendre la main. Avec ``writer``, les
+        écritures unitaires sont regroupées avec celles des autres
+        requêtes et validées par lots. Avec ``reads``, les lectures
+        identiques simultanées partagent une seule exécution (et son
+        résultat), y compris entre requêtes de services différents.
+        """
         self.repository = repository
+        self.cache = cache
+        self.writer = writer
+        self.reads = reads
+
+    def _write(self, write: Callable[[ClientRepository], Any]):
+        """
+        Exécute une écriture unitaire sur un repository.
+
+        Regroupée, l’écriture rend la main une fois son lot validé ; sinon
+        elle passe par le repository de la requête.
+        """
+        if self.writer is None:
+            return write(self.repository)
+        return self.writer.submit(write)
+
+    def _coalesce(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """
+        Exécute une lecture, ou attend la lecture identique en cours.
+
+        Le résultat est partagé entre les requêtes : il ne doit pas être
+        modifié.
+        """
+        if self.reads is None:
+            return load()
+        return self.reads.do(key, load)
+
+    def _invalidate(self, client_ids: Optional[List[int]] = None):
+        """
+        Retire des clients du cache (tout le cache si ids est None).
+
+        Les lectures en cours sont détachées : une lecture lancée après
+        l’écriture ne reçoit pas un résultat lu avant.
+        """
+        if self.reads is not None:
+            self.reads.forget()
+        if self.cache is None:
+            return
+        if client_ids is None:
+            self.cache.clear()
+        else:
+            for client_id in client_ids:
+                self.cache.invalidate(client_id)
+
+    def _load_client(self, client_id: int) -> Optional[dict]:
+        """
+        Lit un client et le sérialise au format ClientInDB.
+
+        Le ClientRecord porte déjà les champs de ClientInDB, dans l’ordre,
+        avec des valeurs issues de la base : il est converti directement.
+        """
+        client = self.repository.get_client_by_id(client_id)
+        if client is None:
+            return None
+        return client._asdict()
 
     def get_all_clients(self):
         """Retourne tous les clients."""
         return self.repository.get_all_clients()
 
-    def get_client_by_id(self, client_id: int):
-        """Retourne un client par son identifiant."""
-        return self.repository.get_client_by_id(client_id)
+    def get_clients_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        filters: Optional[dict] = None
+    ):
+        """
+        Retourne une page de clients et le curseur de la page suivante.
+
+        Un client supplémentaire est lu pour savoir s’il reste une page ;
+        le curseur vaut None sur la dernière page.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return self._coalesce(
+            ("page", after, limit, filter_key(filters)),
+            lambda: split_page(
+                self.repository.get_clients_page(after, limit + 1, filters),
+                limit
+            )
+        )
+
+    def get_client_rows_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        filters: Optional[dict] = None,
+        fields: Iterable[str] = CLIENT_JSON_FIELDS
+    ):
+        """
+        Comme ``get_clients_page``, en lignes Core des colonnes ``fields``
+        (chemin rapide et projections).
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        return split_page(
+            self.repository.get_client_rows_page(
+                after, limit + 1, filters, fields
+            ),
+            limit
+        )
+
+    def get_clients_page_json(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        filters: Optional[dict] = None,
+        fields: Optional[tuple] = None
+    ):
+        """
+        Retourne une page de clients déjà encodée en JSON, son ETag et le
+        curseur de la page suivante.
+
+        Lecture en lignes Core et encodage sont partagés par les requêtes
+        simultanées sur la même page.
+        """
+        def load():
+            rows, next_cursor = self.get_client_rows_page(
+                after, limit, filters,
+                projection_columns(fields or CLIENT_JSON_FIELDS)
+            )
+            # zip s’arrête aux champs demandés : codcli et version ajoutés
+            # pour le curseur et l’ETag ne sont pas renvoyés
+            body = rows_to_json(rows, fields or CLIENT_JSON_FIELDS)
+            return body, page_etag(rows, fields), next_cursor
+
+        key = ("json", after, limit, filter_key(filters), fields)
+        return self._coalesce(key, load)
+
+    def search_clients(
+        self,
+        text_query: str,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE
+    ):
+        """
+        Recherche des clients par fragments de nom, prénom ou adresse.
+
+        Retourne une page de résultats classés par pertinence et le
+        curseur de la suivante (None sur la dernière page).
+        """
+        match_query = search_match_query(text_query)
+        if match_query is None:
+            raise HTTPException(
+                status_code=422,
+                detail="La recherche doit contenir un mot d’au moins "
+                       f"{MIN_SEARCH_TERM_LENGTH} caractères"
+            )
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clients = self._coalesce(
+            ("search", match_query, offset, limit),
+            lambda: self.repository.search_clients(
+                match_query, offset, limit + 1
+            )
+        )
+        if len(clients) > limit:
+            return clients[:limit], encode_cursor(offset + limit, "offset")
+        return clients, None
+
+    def export_clients(
+        self,
+        export_format: str,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        fields: Optional[tuple] = None
+    ):
+        """
+        Génère l’export de tous les clients au format NDJSON ou CSV.
+
+        ``fields`` restreint l’export (et la lecture) à ces colonnes.
+        """
+        fields = fields or CLIENT_FIELDS
+        rows = self.repository.iter_clients(batch_size, fields)
+        if export_format == "csv":
+            return iter_csv(rows, batch_size, fields)
+        return iter_ndjson(rows, batch_size)
+
+    def get_client_by_id(self, client_id: int) -> Optional[dict]:
+        """
+        Retourne un client sérialisé (ClientInDB) par son identifiant.
+
+        La lecture passe par le cache s’il existe (qui regroupe lui-même
+        les chargements simultanés).
+        """
+        if self.cache is None:
+            return self._coalesce(
+                ("client", client_id), lambda: self._load_client(client_id)
+            )
+        return self.cache.get_or_load(
+            client_id, lambda: self._load_client(client_id)
+        )
+
+    def get_client_fields(
+        self,
+        client_id: int,
+        fields: tuple
+    ) -> Optional[dict]:
+        """
+        Retourne une projection d’un client : les champs ``fields``, plus
+        codcli et version.
+
+        Un client en cache est projeté sans requête ; sinon seules ces
+        colonnes sont lues, sans alimenter le cache.
+        """
+        columns = projection_columns(fields)
+        if self.cache is not None:
+            cached = self.cache.peek(client_id)
+            if cached is not None:
+                return {field: cached[field] for field in columns}
+        row = self._coalesce(
+            ("fields", client_id, columns),
+            lambda: self.repository.get_client_fields(client_id, columns)
+        )
+        return row._asdict() if row is not None else None
+
+    def get_stats(self) -> dict:
+        """
+        Retourne le total des clients, la part d’abonnés à la newsletter
+        et les répartitions par newsletter et par genre.
+        """
+        stats = {"total": 0}
+        stats.update((dimension, []) for dimension in CLIENT_STATS_DIMENSIONS)
+        counters = self._coalesce(("stats",), self.repository.get_stats)
+        for dimension, value, count in counters:
+            if dimension == "total":
+                stats["total"] = count
+            elif dimension in CLIENT_STATS_DIMENSIONS:
+                stats[dimension].append(
+                    {"value": decode_stat_value(value), "count": count}
+                )
+        subscribed = sum(
+            bucket["count"] for bucket in stats["newsletter"]
+            if bucket["value"] == 1
+        )
+        stats["newsletter_ratio"] = (
+            subscribed / stats["total"] if stats["total"] else 0.0
+        )
+        return stats
+
+    def get_client_version(self, client_id: int) -> Optional[int]:
+        """
+        Retourne la version d’un client sans le sérialiser.
+
+        La version est lue dans le cache si le client y est et que le
+        stockage est partagé entre workers (un cache propre au processus
+        ignore les écritures des autres), sinon par une requête qui ne lit
+        que cette colonne.
+        """
+        if self.cache is not None and self.cache.shared:
+            cached = self.cache.peek(client_id)
+            if cached is not None:
+                return cached["version"]
+        return self.repository.get_client_version(client_id)
+
+    def _check_precondition(self, client_id: int):
+        """
+        Explique une écriture conditionnelle qui n’a touché aucune ligne.
+
+        Lève 412 si le client existe (sa version a changé), 404 sinon.
+        """
+        if self.repository.get_client_version(client_id) is None:
+            raise HTTPException(status_code=404, detail="Client non trouvé")
+        raise HTTPException(
+            status_code=412, detail="La version du client a changé"
+        )
 
     def create_client(self, new_client: ClientPost):
         """Crée un client à partir d’un schéma Pydantic."""
         data = new_client.dict()
-        return self.repository.create_client(data)
+        client = self._write(lambda repo: repo.create_client(data))
+        self._invalidate([client.codcli])
+        return client
+
+    def create_clients_bulk(self, items: List[Any], atomic: bool = True):
+        """
+        Crée des clients en masse et signale les erreurs élément par élément.
+
+        En mode atomique, un seul élément invalide fait tout rejeter ; sinon
+        seuls les éléments valides sont créés. Le résultat aligne les codcli
+        attribués sur les positions reçues (None pour un élément en erreur).
+        """
+        rows, positions, errors = [], [], []
+        for index, item in enumerate(items):
+            try:
+                rows.append(ClientPost.parse_obj(item).dict())
+                positions.append(index)
+            except ValidationError as exc:
+                errors.append({"index": index, "detail": [
+                    {"loc": e["loc"], "msg": e["msg"], "type": e["type"]}
+                    for e in exc.errors()
+                ]})
+
+        codcli = [None] * len(items)
+        if rows and not (atomic and errors):
+            ids = self.repository.create_clients(rows)
+            self._invalidate(ids)
+            for index, new_id in zip(positions, ids):
+                codcli[index] = new_id
+        return {"codcli": codcli, "errors": errors}
+
+    def patch_client(
+        self,
+        client_id: int,
+        client_patch: ClientPatch,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Met à jour partiellement un client.
 
-    def patch_client(self, client_id: int, client_patch: ClientPatch):
-        """Met à jour partiellement un client."""
+        Avec ``versions`` (en-tête If-Match), la mise à jour n’a lieu que si
+        la version courante en fait partie, sinon une erreur 412 est levée.
+        """
         data = client_patch.dict(exclude_unset=True)
-        return self.repository.patch_client(client_id, data)
+        client = self._write(
+            lambda repo: repo.patch_client(client_id, data, versions)
+        )
+        self._invalidate([client_id])
+        if client is None and versions is not None:
+            self._check_precondition(client_id)
+        return client
 
-    def delete_client(self, client_id: int):
-        """Supprime un client existant."""
-        client = self.repository.get_client_by_id(client_id)
-        if not client:
+    @staticmethod
+    def _check_selection(selection: ClientSelection) -> dict:
+        """
+        Valide une sélection en masse et retourne ses filtres renseignés.
+
+        Une sélection vide est refusée pour éviter de modifier ou supprimer
+        toute la table par erreur.
+        """
+        filters = (
+            selection.filter.dict(exclude_none=True)
+            if selection.filter else {}
+        )
+        if selection.ids is None and not filters:
+            raise HTTPException(
+                status_code=422,
+                detail="Une liste d’identifiants ou un filtre est requis"
+            )
+        if selection.ids is not None and len(selection.ids) > MAX_BULK_IDS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Au plus {MAX_BULK_IDS} identifiants par requête"
+            )
+        return filters
+
+    def patch_clients(self, bulk_patch: ClientBulkPatch) -> int:
+        """Met à jour en masse une sélection de clients."""
+        filters = self._check_selection(bulk_patch)
+        if bulk_patch.ids == []:
+            return 0
+        updates = bulk_patch.patch.dict(exclude_unset=True)
+        affected = self.repository.patch_clients(
+            bulk_patch.ids, filters, updates
+        )
+        self._invalidate(None if filters else bulk_patch.ids)
+        return affected
+
+    def delete_clients(self, selection: ClientSelection) -> int:
+        """Supprime en masse une sélection de clients."""
+        filters = self._check_selection(selection)
+        if selection.ids == []:
+            return 0
+        affected = self.repository.delete_clients(selection.ids, filters)
+        self._invalidate(None if filters else selection.ids)
+        return affected
+
+    def delete_client(
+        self,
+        client_id: int,
+        versions: Optional[List[int]] = None
+    ):
+        """Supprime un client existant (sous condition de version)."""
+        deleted = self._write(
+            lambda repo: repo.delete_client(client_id, versions)
+        )
+        self._invalidate([client_id])
+        if deleted is None:
+            if versions is not None:
+                self._check_precondition(client_id)
+            raise HTTPException(status_code=404, detail="Client non trouvé")
+
+
+class AsyncClientRepository:
+    """Couche d’accès aux données client en mode asynchrone."""
+
+    def __init__(self, db: AsyncSession):
+        """Initialise le repository avec une session asynchrone."""
+        self.db = db
+
+    async def get_clients_page(
+        self,
+        after: Optional[int],
+        limit: int,
+        filters: Optional[dict] = None
+    ):
+        """Retourne au plus ``limit`` clients dont le codcli suit ``after``."""
+        result = await self.db.scalars(
+            select_clients_page(after, limit, filters=filters)
+        )
+        return result.all()
+
+    async def get_client_rows_page(
+        self,
+        after: Optional[int],
+        limit: int,
+        filters: Optional[dict],
+        fields: Iterable[str]
+    ):
+        """Comme ``get_clients_page``, en lignes Core des colonnes choisies."""
+        result = await self.db.execute(
+            select_clients_page(after, limit, fields, filters)
+        )
+        return result.all()
+
+    async def get_client_by_id(self, client_id: int):
+        """Retourne un client par son identifiant."""
+        return await self.db.get(Client, client_id)
+
+    async def get_client_fields(self, client_id: int, fields: Iterable[str]):
+        """Lit les seules colonnes ``fields`` d’un client, ou None."""
+        result = await self.db.execute(
+            select(*(client_table.c[field] for field in fields))
+            .where(client_table.c.codcli == client_id)
+        )
+        return result.one_or_none()
+
+    async def get_client_version(self, client_id: int) -> Optional[int]:
+        """Retourne la seule version d’un client, ou None s’il n’existe pas."""
+        return await self.db.scalar(
+            select(client_table.c.version)
+            .where(client_table.c.codcli == client_id)
+        )
+
+    async def create_client(self, data: dict):
+        """Crée un nouveau client (INSERT ... RETURNING)."""
+        result = await self.db.execute(insert_client_statement(data))
+        client = result.one()
+        await self.db.commit()
+        return client
+
+    async def patch_client(
+        self,
+        client_id: int,
+        updates: dict,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Met à jour partiellement un client ; None s’il n’existe pas ou si
+        sa version est hors de ``versions`` quand elles sont imposées.
+        """
+        updates = writable_fields(updates)
+        if not updates:
+            client = await self.get_client_by_id(client_id)
+            if client is not None and versions is not None \
+                    and client.version not in versions:
+                return None
+            return client
+
+        statement = patch_client_statement(client_id, updates, versions)
+        client = (await self.db.execute(statement)).one_or_none()
+        await self.db.commit()
+        return client
+
+    async def delete_client(
+        self,
+        client_id: int,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Supprime un client ; retourne None s’il n’existe pas ou si sa
+        version est hors de ``versions``.
+        """
+        statement = delete_client_statement(client_id, versions)
+        client = (await self.db.execute(statement)).one_or_none()
+        await self.db.commit()
+        return client
+
+
+class AsyncClientService:
+    """Couche métier client en mode asynchrone."""
+
+    def __init__(self, repository: AsyncClientRepository):
+        """Initialise le service avec un repository asynchrone."""
+        self.repository = repository
+
+    async def get_clients_page(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        filters: Optional[dict] = None
+    ):
+        """Retourne une page de clients et le curseur de la page suivante."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clients = await self.repository.get_clients_page(
+            after, limit + 1, filters
+        )
+        return split_page(clients, limit)
+
+    async def get_clients_page_json(
+        self,
+        after: Optional[int],
+        limit: int,
+        filters: Optional[dict],
+        fields: tuple
+    ):
+        """
+        Retourne une page projetée sur ``fields`` déjà encodée en JSON, son
+        ETag et le curseur de la page suivante.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        rows, next_cursor = split_page(
+            await self.repository.get_client_rows_page(
+                after, limit + 1, filters, projection_columns(fields)
+            ),
+            limit
+        )
+        return rows_to_json(rows, fields), page_etag(rows, fields), next_cursor
+
+    async def get_client_by_id(self, client_id: int):
+        """Retourne un client par son identifiant."""
+        return await self.repository.get_client_by_id(client_id)
+
+    async def get_client_fields(
+        self,
+        client_id: int,
+        fields: tuple
+    ) -> Optional[dict]:
+        """
+        Retourne une projection d’un client : les champs ``fields``, plus
+        codcli et version.
+        """
+        row = await self.repository.get_client_fields(
+            client_id, projection_columns(fields)
+        )
+        return row._asdict() if row is not None else None
+
+    async def get_client_version(self, client_id: int) -> Optional[int]:
+        """Retourne la version d’un client sans le lire entièrement."""
+        return await self.repository.get_client_version(client_id)
+
+    async def _check_precondition(self, client_id: int):
+        """
+        Explique une écriture conditionnelle qui n’a touché aucune ligne.
+
+        Lève 412 si le client existe (sa version a changé), 404 sinon.
+        """
+        if await self.repository.get_client_version(client_id) is None:
+            raise HTTPException(status_code=404, detail="Client non trouvé")
+        raise HTTPException(
+            status_code=412, detail="La version du client a changé"
+        )
+
+    async def create_client(self, new_client: ClientPost):
+        """Crée un client à partir d’un schéma Pydantic."""
+        return await self.repository.create_client(new_client.dict())
+
+    async def patch_client(
+        self,
+        client_id: int,
+        client_patch: ClientPatch,
+        versions: Optional[List[int]] = None
+    ):
+        """
+        Met à jour partiellement un client.
+
+        Avec ``versions`` (en-tête If-Match), la mise à jour n’a lieu que si
+        la version courante en fait partie, sinon une erreur 412 est levée.
+        """
+        data = client_patch.dict(exclude_unset=True)
+        client = await self.repository.patch_client(client_id, data, versions)
+        if client is None and versions is not None:
+            await self._check_precondition(client_id)
+        return client
+
+    async def delete_client(
+        self,
+        client_id: int,
+        versions: Optional[List[int]] = None
+    ):
+        """Supprime un client existant (sous condition de version)."""
+        if await self.repository.delete_client(client_id, versions) is None:
+            if versions is not None:
+                await self._check_precondition(client_id)
             raise HTTPException(status_code=404, detail="Client non trouvé")
-        self.repository.delete_client(client_id)
 
 
+client_cache = (
+    ReadThroughCache(create_cache_backend(
+        CLIENT_CACHE_BACKEND,
+        CLIENT_CACHE_MAX_ENTRIES,
+        CLIENT_CACHE_TTL,
+        CLIENT_CACHE_PATH
+    ))
+    if CLIENT_CACHE_MAX_ENTRIES > 0 else None
+)
+
+client_reads = SingleFlight() if CLIENT_READ_COALESCING else None
+
+client_writer = (
+    WriteBatcher(
+        SessionLocal,
+        lambda session: ClientRepository(session, autocommit=False),
+        max_operations=CLIENT_WRITE_BATCH_SIZE,
+        max_delay=CLIENT_WRITE_BATCH_DELAY_MS / 1000
+    )
+    if CLIENT_WRITE_BATCH else None
+)
+
+idempotency_store = (
+    create_idempotency_store(
+        IDEMPOTENCY_BACKEND,
+        IDEMPOTENCY_TTL,
+        IDEMPOTENCY_MAX_ENTRIES,
+        IDEMPOTENCY_PATH
+    )
+    if IDEMPOTENCY_MAX_ENTRIES > 0 else None
+)
+
+read_admission = (
+    AdmissionLimiter(
+        "read",
+        ADMISSION_READ_CONCURRENCY,
+        ADMISSION_READ_QUEUE,
+        ADMISSION_QUEUE_TIMEOUT
+    )
+    if ADMISSION_READ_CONCURRENCY > 0 else None
+)
+
+write_admission = (
+    AdmissionLimiter(
+        "write",
+        ADMISSION_WRITE_CONCURRENCY,
+        ADMISSION_WRITE_QUEUE,
+        ADMISSION_QUEUE_TIMEOUT
+    )
+    if ADMISSION_WRITE_CONCURRENCY > 0 else None
+)
+
+profiler = SamplingProfiler(PROFILER_INTERVAL_MS / 1000)
+request_profiles = ProfileStore()
+
 app = FastAPI()
 
 router = APIRouter(
@@ -177,6 +1962,16 @@ router = APIRouter(
     tags=["client"]
 )
 
+async_router = APIRouter(
+    prefix="/api/v1/client",
+    tags=["client"]
+)
+
+admin_router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"]
+)
+
 
 def get_db():
     """Fournit une session de base de données."""
@@ -194,51 +1989,868 @@ def get_client_repository(db: Session = Depends(get_db)):
 
 def get_client_service(repo: ClientRepository = Depends(get_client_repository)):
     """Injecte le service client."""
-    return ClientService(repo)
+    return ClientService(
+        repo, cache=client_cache, writer=client_writer, reads=client_reads
+    )
+
+
+_async_session_factory = None
+
+
+def get_async_session_factory():
+    """
+    Crée à la demande le moteur et la fabrique de sessions asynchrones.
+
+    Le moteur n’est construit qu’au premier usage : le mode synchrone ne
+    dépend pas du pilote asynchrone (aiosqlite pour SQLite).
+    """
+    global _async_session_factory
+    if _async_session_factory is None:
+        async_engine = create_async_engine(
+            ASYNC_CONNECTION_STRING,
+            **pool_options(ASYNC_CONNECTION_STRING)
+        )
+        install_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+        _async_session_factory = async_sessionmaker(
+            async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db():
+    """Fournit une session de base de données asynchrone."""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def get_async_client_service(db: AsyncSession = Depends(get_async_db)):
+    """Injecte le service client asynchrone."""
+    return AsyncClientService(AsyncClientRepository(db))
+
+
+def get_client_filters(
+    nom: Optional[str] = Query(None, description="Nom exact"),
+    nom_prefix: Optional[str] = Query(None, min_length=1),
+    prenom: Optional[str] = Query(None, description="Prénom exact"),
+    prenom_prefix: Optional[str] = Query(None, min_length=1),
+    email: Optional[str] = Query(None, description="Email exact"),
+    email_prefix: Optional[str] = Query(None, min_length=1),
+    tel: Optional[str] = Query(None, description="Téléphone exact"),
+    tel_prefix: Optional[str] = Query(None, min_length=1),
+    newsletter: Optional[int] = Query(None, ge=0, le=1)
+) -> dict:
+    """
+    Rassemble les filtres de recherche de la liste des clients.
+
+    Chaque filtre s’appuie sur un index de t_client ; les filtres fournis
+    se cumulent (ET).
+    """
+    filters = {
+        "nom": nom, "nom_prefix": nom_prefix,
+        "prenom": prenom, "prenom_prefix": prenom_prefix,
+        "email": email, "email_prefix": email_prefix,
+        "tel": tel, "tel_prefix": tel_prefix,
+        "newsletter": newsletter,
+    }
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def get_client_projection(
+    fields: Optional[str] = Query(
+        None, description="Champs à renvoyer, ex. codcli,nom,email"
+    )
+) -> Optional[tuple]:
+    """Lit la projection demandée (None : tous les champs)."""
+    return parse_fields(fields)
+
+
+def set_next_page_headers(
+    response: Response,
+    next_cursor: Optional[str],
+    limit: int,
+    filters: Optional[dict] = None,
+    path: str = "/"
+):
+    """
+    Annonce la page suivante dans les en-têtes X-Next-Cursor et Link.
+
+    Le lien reprend les filtres de recherche de la page courante.
+    """
+    if next_cursor is not None:
+        query = f"cursor={next_cursor}&limit={limit}"
+        if filters:
+            query += "&" + urlencode(filters)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = (
+            f'<{router.prefix}{path}?{query}>; rel="next"'
+        )
+
+
+async def read_bulk_items(request: Request) -> List[Any]:
+    """
+    Lit le corps d’une requête en masse.
+
+    Accepte un tableau JSON ou, avec ``Content-Type: application/x-ndjson``,
+    un objet JSON par ligne.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/x-ndjson"):
+            items = [
+                json.loads(line) for line in body.splitlines() if line.strip()
+            ]
+        else:
+            items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Corps JSON invalide")
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=422, detail="Un tableau de clients est attendu"
+        )
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Au plus {MAX_BULK_ITEMS} clients par requête"
+        )
+    return items
+
+
+def request_fingerprint(request: Request, payload: Any) -> str:
+    """Empreinte d’une requête : méthode, chemin, paramètres et corps."""
+    canonical = json.dumps(
+        jsonable_encoder(payload), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(
+        f"{request.method} {request.url.path}?{request.url.query}\n"
+        f"{canonical}".encode()
+    ).hexdigest()
+
+
+def replayed_response(stored: StoredResponse) -> Response:
+    """Reconstruit une réponse enregistrée sous une clé d’idempotence."""
+    headers = {"Idempotent-Replayed": "true"}
+    if stored.etag:
+        headers["ETag"] = stored.etag
+    return Response(
+        stored.body, stored.status, headers, media_type="application/json"
+    )
+
+
+def reserve_idempotency_key(
+    key: str,
+    request: Request,
+    payload: Any
+) -> Optional[StoredResponse]:
+    """
+    Valide et réserve une clé d’idempotence.
+
+    Retourne la réponse déjà enregistrée pour une répétition, sinon None
+    (la clé est alors réservée). Peut attendre une requête concurrente
+    portant la même clé : appel bloquant.
+    """
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key : 1 à {MAX_IDEMPOTENCY_KEY_LENGTH} "
+                   "caractères"
+        )
+
+    fingerprint = request_fingerprint(request, payload)
+    try:
+        return idempotency_store.begin(key, fingerprint, IDEMPOTENCY_WAIT)
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key déjà utilisée pour une autre requête"
+        )
+    except IdempotencyPending:
+        raise HTTPException(
+            status_code=409,
+            detail="Requête avec la même Idempotency-Key en cours",
+            headers={"Retry-After": "1"}
+        )
+
+
+def abandon_idempotency_key(key: str, error: Exception):
+    """
+    Clôt une clé dont l’écriture a échoué : une erreur 4xx est
+    enregistrée et sera rejouée, toute autre erreur libère la clé.
+    """
+    if isinstance(error, HTTPException) and error.status_code < 500:
+        idempotency_store.complete(key, StoredResponse(
+            error.status_code,
+            dumps_json(jsonable_encoder({"detail": error.detail}))
+        ))
+    else:
+        idempotency_store.release(key)
+
+
+def complete_idempotency_key(
+    key: str,
+    content: Any,
+    headers: dict
+) -> Response:
+    """Enregistre la réponse d’une écriture réussie et la retourne."""
+    body = dumps_json(jsonable_encoder(content))
+    idempotency_store.complete(
+        key, StoredResponse(200, body, headers.get("ETag"))
+    )
+    return Response(body, headers=headers, media_type="application/json")
+
+
+def run_idempotent(
+    key: Optional[str],
+    request: Request,
+    payload: Any,
+    response: Response,
+    handler: Callable[[], tuple]
+):
+    """
+    Exécute une écriture au plus une fois par clé d’idempotence.
+
+    ``handler`` retourne le contenu de la réponse et ses en-têtes. Sans
+    clé (ou stockage désactivé), il est simplement exécuté. Avec une clé,
+    la réponse (y compris une erreur 4xx) est enregistrée ; une répétition
+    de la même requête la reçoit sans nouvelle écriture, une requête
+    concurrente attend la première. Une clé réutilisée pour une autre
+    requête est refusée en 422 ; une erreur 5xx libère la clé.
+    """
+    if key is None or idempotency_store is None:
+        content, headers = handler()
+        response.headers.update(headers)
+        return content
+    stored = reserve_idempotency_key(key, request, payload)
+    if stored is not None:
+        return replayed_response(stored)
+
+    try:
+        content, headers = handler()
+    except Exception as exc:
+        abandon_idempotency_key(key, exc)
+        raise
+    except BaseException:
+        idempotency_store.release(key)
+        raise
+    return complete_idempotency_key(key, content, headers)
+
+
+async def run_idempotent_async(
+    key: Optional[str],
+    request: Request,
+    payload: Any,
+    response: Response,
+    handler: Callable[[], Awaitable[tuple]]
+):
+    """
+    Équivalent de ``run_idempotent`` pour une écriture asynchrone.
+
+    Sans clé, ``handler`` est attendu directement. Avec une clé, seuls
+    les appels bloquants au stockage passent par le pool de threads ;
+    l’écriture reste dans la boucle d’événements.
+    """
+    if key is None or idempotency_store is None:
+        content, headers = await handler()
+        response.headers.update(headers)
+        return content
+    stored = await run_in_threadpool(
+        reserve_idempotency_key, key, request, payload
+    )
+    if stored is not None:
+        return replayed_response(stored)
+
+    try:
+        content, headers = await handler()
+    except Exception as exc:
+        await run_in_threadpool(abandon_idempotency_key, key, exc)
+        raise
+    except BaseException:
+        idempotency_store.release(key)
+        raise
+    return await run_in_threadpool(
+        complete_idempotency_key, key, content, headers
+    )
 
 
 @router.get("/", response_model=List[ClientInDB])
-def get_clients(service: ClientService = Depends(get_client_service)):
-    """Retourne tous les clients."""
-    return service.get_all_clients()
+def get_clients(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    after: Optional[int] = Query(
+        None, ge=0, description="Dernier codcli de la page précédente"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Curseur opaque renvoyé dans X-Next-Cursor"
+    ),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: dict = Depends(get_client_filters),
+    fields: Optional[tuple] = Depends(get_client_projection),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Retourne une page de clients triée par codcli.
+
+    Le curseur de la page suivante est renvoyé dans l’en-tête
+    ``X-Next-Cursor`` (et dans ``Link``) tant qu’il reste des clients.
+    Les paramètres ``nom``, ``prenom``, ``email``, ``tel`` (égalité),
+    ``<champ>_prefix`` (préfixe) et ``newsletter`` filtrent la liste ;
+    ``fields`` limite les champs lus et renvoyés.
+    Avec ``CLIENT_FAST_JSON`` ou une projection, la page est lue en
+    lignes Core et encodée directement en JSON.
+    """
+    if cursor is not None:
+        after = decode_cursor(cursor)
+    direct = CLIENT_FAST_JSON or fields is not None
+    if direct:
+        body, etag, next_cursor = service.get_clients_page_json(
+            after, limit, filters, fields
+        )
+    else:
+        clients, next_cursor = service.get_clients_page(after, limit, filters)
+        etag = page_etag(clients, fields)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if direct:
+        response = Response(body, media_type="application/json")
+    response.headers["ETag"] = etag
+    query = dict(filters, fields=",".join(fields)) if fields else filters
+    set_next_page_headers(response, next_cursor, limit, query)
+    return response if direct else clients
+
+
+@router.get("/export")
+def export_clients(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    fields: Optional[tuple] = Depends(get_client_projection),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Exporte tous les clients en flux NDJSON ou CSV.
+
+    Les lignes sont envoyées au fil de la lecture : le premier octet part
+    dès le premier lot, quelle que soit la taille de la table. ``fields``
+    limite les colonnes exportées.
+    """
+    return StreamingResponse(
+        service.export_clients(export_format, fields=fields),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="clients.{export_format}"'
+        }
+    )
+
+
+@router.get("/stats", response_model=ClientStats)
+def get_client_stats(service: ClientService = Depends(get_client_service)):
+    """
+    Retourne le nombre de clients et leurs répartitions.
+
+    Les valeurs proviennent de compteurs tenus à jour par les écritures,
+    sans COUNT(*) par requête.
+    """
+    return service.get_stats()
+
+
+@router.get("/search", response_model=List[ClientInDB])
+def search_clients(
+    response: Response,
+    q: str = Query(..., max_length=200, description="Texte recherché"),
+    cursor: Optional[str] = Query(
+        None, description="Curseur opaque renvoyé dans X-Next-Cursor"
+    ),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Recherche des clients par fragments de nom, prénom ou adresse.
+
+    Chaque mot (3 caractères minimum) peut apparaître n’importe où dans
+    ces champs, sans tenir compte de la casse ; les résultats sont
+    classés par pertinence puis par codcli.
+    """
+    offset = decode_cursor(cursor, "offset") if cursor is not None else 0
+    clients, next_cursor = service.search_clients(q, offset, limit)
+    set_next_page_headers(response, next_cursor, limit, {"q": q}, "/search")
+    return clients
 
 
 @router.get("/{client_id}", response_model=ClientInDB)
-def get_client(client_id: int, service: ClientService = Depends(get_client_service)):
-    """Retourne un client par son identifiant."""
-    client = service.get_client_by_id(client_id)
+def get_client(
+    client_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[tuple] = Depends(get_client_projection),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Retourne un client par son identifiant, avec son ETag.
+
+    Si ``If-None-Match`` correspond à la version courante, la réponse est
+    un 304 décidé sur la seule version, sans lire ni sérialiser le client.
+    Avec ``fields``, seuls ces champs sont lus et renvoyés ; l’ETag est
+    alors faible, une projection ne pouvant servir de condition If-Match.
+    """
+    weak = "W/" if fields is not None else ""
+    if if_none_match:
+        version = service.get_client_version(client_id)
+        if version is not None:
+            etag = client_etag(client_id, version)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=304, headers={"ETag": weak + etag}
+                )
+    if fields is None:
+        client = service.get_client_by_id(client_id)
+    else:
+        client = service.get_client_fields(client_id, fields)
     if not client:
         raise HTTPException(status_code=404, detail="Client non trouvé")
+    etag = weak + client_etag(client_id, client["version"])
+    if fields is not None:
+        return Response(
+            dumps_json({field: client[field] for field in fields}),
+            media_type="application/json",
+            headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
     return client
 
 
 @router.post("/", response_model=ClientInDB)
-def create_client(client: ClientPost, service: ClientService = Depends(get_client_service)):
-    """Crée un nouveau client."""
-    return service.create_client(client)
+def create_client(
+    client: ClientPost,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Crée un nouveau client.
+
+    Avec ``Idempotency-Key``, une requête répétée reçoit le client déjà
+    créé au lieu d’en créer un second.
+    """
+    def handler():
+        created = service.create_client(client)
+        etag = client_etag(created.codcli, created.version)
+        return ClientInDB.from_orm(created), {"ETag": etag}
+
+    return run_idempotent(
+        idempotency_key, request, client.dict(), response, handler
+    )
+
+
+@router.post("/bulk", response_model=ClientBulkResult)
+def create_clients_bulk(
+    request: Request,
+    response: Response,
+    items: List[Any] = Depends(read_bulk_items),
+    mode: Literal["atomic", "partial"] = Query("atomic"),
+    idempotency_key: Optional[str] = Header(None),
+    service: ClientService = Depends(get_client_service)
+):
+    """
+    Crée des clients en masse (tableau JSON ou NDJSON).
+
+    ``mode=atomic`` (par défaut) rejette tout le lot en 422 si un élément
+    est invalide ; ``mode=partial`` crée les éléments valides et liste les
+    erreurs des autres.
+    """
+    def handler():
+        result = service.create_clients_bulk(items, atomic=mode == "atomic")
+        if mode == "atomic" and result["errors"]:
+            raise HTTPException(status_code=422, detail=result["errors"])
+        return ClientBulkResult.parse_obj(result), {}
+
+    return run_idempotent(idempotency_key, request, items, response, handler)
+
+
+@router.patch("/bulk", response_model=ClientBulkCount)
+def patch_clients_bulk(
+    bulk_patch: ClientBulkPatch,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    service: ClientService = Depends(get_client_service)
+):
+    """Applique une mise à jour partielle à une liste d’ids ou un filtre."""
+    return run_idempotent(
+        idempotency_key, request, bulk_patch.dict(exclude_unset=True),
+        response, lambda: ({"affected": service.patch_clients(bulk_patch)}, {})
+    )
+
+
+@router.delete("/bulk", response_model=ClientBulkCount)
+def delete_clients_bulk(
+    selection: ClientSelection,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    service: ClientService = Depends(get_client_service)
+):
+    """Supprime une liste d’ids ou les clients correspondant à un filtre."""
+    return run_idempotent(
+        idempotency_key, request, selection.dict(exclude_unset=True),
+        response, lambda: ({"affected": service.delete_clients(selection)}, {})
+    )
 
 
 @router.patch("/{client_id}", response_model=ClientInDB)
 def patch_client(
     client_id: int,
     client: ClientPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: ClientService = Depends(get_client_service)
 ):
-    """Met à jour partiellement un client."""
-    patched_client = service.patch_client(client_id, client)
+    """
+    Met à jour partiellement un client.
+
+    Avec ``If-Match``, la mise à jour n’a lieu que si l’ETag correspond
+    toujours à la version courante (sinon 412).
+    """
+    versions = if_match_versions(if_match, client_id)
+    patched_client = service.patch_client(client_id, client, versions)
     if not patched_client:
         raise HTTPException(status_code=404, detail="Client non trouvé")
+    response.headers["ETag"] = client_etag(
+        client_id, patched_client.version
+    )
     return patched_client
 
 
 @router.delete("/{client_id}")
-def delete_client(client_id: int, service: ClientService = Depends(get_client_service)):
-    """Supprime un client existant."""
-    service.delete_client(client_id)
+def delete_client(
+    client_id: int,
+    if_match: Optional[str] = Header(None),
+    service: ClientService = Depends(get_client_service)
+):
+    """Supprime un client existant (sous condition If-Match éventuelle)."""
+    service.delete_client(client_id, if_match_versions(if_match, client_id))
     return {"message": "Client supprimé"}
 
 
-app.include_router(router)
+@async_router.get("/", response_model=List[ClientInDB])
+async def get_clients_async(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    after: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: dict = Depends(get_client_filters),
+    fields: Optional[tuple] = Depends(get_client_projection),
+    service: AsyncClientService = Depends(get_async_client_service)
+):
+    """
+    Retourne une page de clients, avec son ETag (mode asynchrone).
+
+    ``fields`` limite les champs lus et renvoyés ; la page projetée est
+    lue en lignes Core et encodée directement en JSON.
+    """
+    if cursor is not None:
+        after = decode_cursor(cursor)
+    if fields is not None:
+        body, etag, next_cursor = await service.get_clients_page_json(
+            after, limit, filters, fields
+        )
+    else:
+        clients, next_cursor = await service.get_clients_page(
+            after, limit, filters
+        )
+        etag = page_etag(clients)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if fields is not None:
+        response = Response(body, media_type="application/json")
+    response.headers["ETag"] = etag
+    query = dict(filters, fields=",".join(fields)) if fields else filters
+    set_next_page_headers(response, next_cursor, limit, query)
+    return response if fields is not None else clients
+
+
+@async_router.get("/{client_id}", response_model=ClientInDB)
+async def get_client_async(
+    client_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[tuple] = Depends(get_client_projection),
+    service: AsyncClientService = Depends(get_async_client_service)
+):
+    """
+    Retourne un client par son identifiant, avec son ETag (mode
+    asynchrone).
+
+    Si ``If-None-Match`` correspond à la version courante, la réponse est
+    un 304 décidé sur la seule version. Avec ``fields``, seuls ces champs
+    sont lus et renvoyés, sous un ETag faible.
+    """
+    weak = "W/" if fields is not None else ""
+    if if_none_match:
+        version = await service.get_client_version(client_id)
+        if version is not None:
+            etag = client_etag(client_id, version)
+            if etag_matches(if_none_match, etag):
+                return Response(
+                    status_code=304, headers={"ETag": weak + etag}
+                )
+    if fields is not None:
+        client = await service.get_client_fields(client_id, fields)
+        if not client:
+            raise HTTPException(status_code=404, detail="Client non trouvé")
+        return Response(
+            dumps_json({field: client[field] for field in fields}),
+            media_type="application/json",
+            headers={"ETag": weak + client_etag(client_id, client["version"])}
+        )
+    client = await service.get_client_by_id(client_id)
+    if not client:
+        raise HTTPException(status_code=404, detail="Client non trouvé")
+    response.headers["ETag"] = client_etag(client_id, client.version)
+    return client
+
+
+@async_router.post("/", response_model=ClientInDB)
+async def create_client_async(
+    client: ClientPost,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    service: AsyncClientService = Depends(get_async_client_service)
+):
+    """
+    Crée un nouveau client (mode asynchrone).
+
+    Avec ``Idempotency-Key``, une requête répétée reçoit le client déjà
+    créé au lieu d’en créer un second.
+    """
+    async def handler():
+        created = await service.create_client(client)
+        etag = client_etag(created.codcli, created.version)
+        return ClientInDB.from_orm(created), {"ETag": etag}
+
+    return await run_idempotent_async(
+        idempotency_key, request, client.dict(), response, handler
+    )
+
+
+@async_router.patch("/{client_id}", response_model=ClientInDB)
+async def patch_client_async(
+    client_id: int,
+    client: ClientPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    service: AsyncClientService = Depends(get_async_client_service)
+):
+    """
+    Met à jour partiellement un client (mode asynchrone).
+
+    Avec ``If-Match``, la mise à jour n’a lieu que si l’ETag correspond
+    toujours à la version courante (sinon 412).
+    """
+    versions = if_match_versions(if_match, client_id)
+    patched_client = await service.patch_client(client_id, client, versions)
+    if not patched_client:
+        raise HTTPException(status_code=404, detail="Client non trouvé")
+    response.headers["ETag"] = client_etag(
+        client_id, patched_client.version
+    )
+    return patched_client
+
+
+@async_router.delete("/{client_id}")
+async def delete_client_async(
+    client_id: int,
+    if_match: Optional[str] = Header(None),
+    service: AsyncClientService = Depends(get_async_client_service)
+):
+    """Supprime un client existant (mode asynchrone, If-Match éventuel)."""
+    await service.delete_client(
+        client_id, if_match_versions(if_match, client_id)
+    )
+    return {"message": "Client supprimé"}
+
+
+def build_client_router(mode: str = API_MODE) -> APIRouter:
+    """
+    Assemble les routes client selon le mode choisi.
+
+    En mode ``async``, les routes CRUD asynchrones remplacent leurs
+    équivalents synchrones ; les autres routes (export, masse) restent
+    synchrones et sont placées avant, pour garder leur priorité sur
+    ``/{client_id}``.
+    """
+    if mode == "sync":
+        return router
+    if mode != "async":
+        raise ValueError(f"API_MODE inconnu : {mode}")
+
+    def key(route):
+        return route.path, frozenset(route.methods)
+
+    overridden = {key(route) for route in async_router.routes}
+    combined = APIRouter()
+    combined.routes.extend(
+        route for route in router.routes if key(route) not in overridden
+    )
+    combined.routes.extend(async_router.routes)
+    return combined
+
+
+@admin_router.get("/cache")
+def get_cache_stats():
+    """Retourne les compteurs du cache des lectures client."""
+    if client_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **client_cache.stats()}
+
+
+@admin_router.get("/reads")
+def get_read_coalescing_stats():
+    """Retourne les compteurs du regroupement des lectures."""
+    if client_reads is None:
+        return {"enabled": False}
+    return {"enabled": True, **client_reads.stats()}
+
+
+@admin_router.get("/writes")
+def get_write_batch_stats():
+    """Retourne les compteurs du regroupement des écritures."""
+    if client_writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **client_writer.stats()}
+
+
+@admin_router.get("/idempotency")
+def get_idempotency_stats():
+    """Retourne les compteurs des clés d’idempotence."""
+    if idempotency_store is None:
+        return {"enabled": False}
+    return {"enabled": True, **idempotency_store.stats()}
+
+
+@admin_router.get("/admission")
+def get_admission_stats():
+    """Retourne la charge et les refus du contrôle d’admission."""
+    return {
+        limiter_name: (
+            {"enabled": True, **limiter.stats()}
+            if limiter is not None else {"enabled": False}
+        )
+        for limiter_name, limiter in (
+            ("read", read_admission), ("write", write_admission)
+        )
+    }
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Exige le jeton d’administration du profilage (404 si le profilage
+    est désactivé, 403 si le jeton est absent ou faux).
+    """
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Profilage désactivé")
+    if not token_matches(PROFILER_TOKEN, x_admin_token):
+        raise HTTPException(
+            status_code=403, detail="Jeton d’administration invalide"
+        )
+
+
+@admin_router.get("/profile", dependencies=[Depends(require_admin_token)])
+async def get_profile(
+    seconds: float = Query(5, gt=0, le=PROFILER_MAX_SECONDS),
+    idle: bool = False
+):
+    """
+    Profile le processus pendant ``seconds`` secondes et retourne les
+    piles au format « collapsed stacks » (``idle`` : inclure les threads
+    en attente).
+    """
+    try:
+        session = profiler.start(include_idle=idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Profilage déjà en cours")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        counts = session.stop()
+    return Response(render_collapsed(counts), media_type="text/plain")
+
+
+@admin_router.get(
+    "/profile/{profile_id}", dependencies=[Depends(require_admin_token)]
+)
+def get_request_profile(profile_id: str):
+    """Retourne le profil d’une requête ciblée par l’en-tête X-Profile."""
+    collapsed = request_profiles.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return Response(collapsed, media_type="text/plain")
+
+
+def select_admission(scope: dict) -> Optional[AdmissionLimiter]:
+    """
+    Choisit la limite d’une requête : celle des lectures ou des
+    écritures pour les routes client, aucune pour les autres.
+    """
+    if not scope["path"].startswith(router.prefix):
+        return None
+    if scope["method"] in ADMISSION_READ_METHODS:
+        return read_admission
+    return write_admission
+
+
+client_router = build_client_router()
+app.include_router(client_router)
+app.include_router(admin_router)
+app.add_middleware(
+    AdmissionMiddleware,
+    select=select_admission,
+    retry_after=ADMISSION_RETRY_AFTER
+)
+app.add_middleware(QueryTrackingMiddleware, debug=SQL_DEBUG)
+if PROFILER_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiler,
+        store=request_profiles,
+        token=PROFILER_TOKEN
+    )
+if PROFILER_SIGNAL and threading.current_thread() is threading.main_thread():
+    install_signal_handler(
+        profiler,
+        getattr(signal, PROFILER_SIGNAL),
+        PROFILER_SIGNAL_SECONDS,
+        PROFILER_OUTPUT_DIR
+    )
+if metrics is not None:
+    # Ajouté en dernier, donc le plus externe : la durée mesurée inclut
+    # l’attente d’admission et les refus 503 sont comptés
+    metrics.register_routes(client_router.routes, router.prefix)
+    app.add_middleware(
+        MetricsMiddleware, metrics=metrics, prefix=router.prefix
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Expose les métriques au format texte de Prometheus."""
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Métriques désactivées")
+    return Response(
+        metrics.render(
+            [("sync", engine.pool)],
+            [
+                (limiter_name, limiter) for limiter_name, limiter in (
+                    ("read", read_admission), ("write", write_admission)
+                )
+                if limiter is not None
+            ]
+        ),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.get("/")
@@ -0,0 +1,192 @@
+"""
+Regroupement des écritures (group commit).
+
+``WriteBatcher`` exécute les écritures unitaires soumises par des
+requêtes concurrentes dans une même transaction : un thread dédié les
+accumule pendant quelques millisecondes (ou jusqu’à N opérations), les
+exécute puis valide le lot par un seul COMMIT, donc une seule
+synchronisation disque.
+
+Chaque requête reçoit son propre résultat ou sa propre erreur, et
+seulement après la validation de son lot. Si une opération échoue, le lot
+est annulé puis rejoué opération par opération, chacune dans sa propre
+transaction : l’erreur ne touche que la requête fautive.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Tuple
+
+
+class _Operation:
+    """Écriture en attente et son issue."""
+
+    __slots__ = ("write", "done", "result", "error")
+
+    def __init__(self, write: Callable[[Any], Any]):
+        self.write = write
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class WriteBatcher:
+    """
+    File d’écritures validées par lots dans une transaction commune.
+
+    ``session_factory`` ouvre une session par lot ; ``context_factory``
+    construit, à partir de cette session, l’objet passé à chaque écriture
+    (typiquement un repository qui ne valide pas lui-même).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        context_factory: Callable[[Any], Any],
+        max_operations: int = 64,
+        max_delay: float = 0.002
+    ):
+        self.session_factory = session_factory
+        self.context_factory = context_factory
+        self.max_operations = max_operations
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.operations = 0
+        self.fallbacks = 0
+
+    def _ensure_started(self):
+        """
+        Démarre le thread de validation (et le relance après un fork ou
+        s’il s’est arrêté sur une erreur imprévue).
+        """
+        with self._lock:
+            if (
+                self._thread is None
+                or not self._thread.is_alive()
+                or self._pid != os.getpid()
+            ):
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="write-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, write: Callable[[Any], Any]) -> Any:
+        """
+        Soumet une écriture et attend la validation de son lot.
+
+        Retourne le résultat de ``write`` ou relève son exception.
+        """
+        operation = _Operation(write)
+        self._ensure_started()
+        self._queue.put(operation)
+        operation.done.wait()
+        if operation.error is not None:
+            raise operation.error
+        return operation.result
+
+    def close(self):
+        """Valide les écritures en attente puis arrête le thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs de lots et d’opérations."""
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "fallbacks": self.fallbacks,
+        }
+
+    def _collect(
+        self,
+        first: _Operation
+    ) -> Tuple[List[_Operation], bool]:
+        """
+        Accumule un lot à partir de sa première opération.
+
+        Retourne le lot et True si l’arrêt a été demandé entre-temps.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_operations:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                operation = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if operation is None:
+                return batch, True
+            batch.append(operation)
+        return batch, False
+
+    def _run(self):
+        """Boucle du thread : un lot, un COMMIT."""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            try:
+                self._flush(batch)
+            finally:
+                for operation in batch:
+                    operation.done.set()
+
+    def _flush(self, batch: List[_Operation]):
+        """
+        Exécute et valide un lot, ou le rejoue opération par opération.
+
+        Si la session ne peut être ouverte, chaque opération du lot reçoit
+        l’erreur.
+        """
+        session = None
+        try:
+            session = self.session_factory()
+            context = self.context_factory(session)
+            results = [operation.write(context) for operation in batch]
+            session.commit()
+        except Exception as exc:
+            if session is None:
+                for operation in batch:
+                    operation.error = exc
+                return
+            session.rollback()
+            session.close()
+            self.fallbacks += 1
+            for operation in batch:
+                self._flush_one(operation)
+        else:
+            session.close()
+            for operation, result in zip(batch, results):
+                operation.result = result
+        self.batches += 1
+        self.operations += len(batch)
+
+    def _flush_one(self, operation: _Operation):
+        """Exécute et valide une opération seule dans sa transaction."""
+        session = None
+        try:
+            session = self.session_factory()
+            operation.result = operation.write(self.context_factory(session))
+            session.commit()
+        except Exception as exc:
+            if session is not None:
+                session.rollback()
+            operation.result = None
+            operation.error = exc
+        finally:
+            if session is not None:
+                session.close()
@@ -0,0 +1,159 @@
+"""
+Mesure la latence sous surcharge, avec et sans contrôle d’admission.
+
+Comme dans le scénario k6, chaque utilisateur virtuel enchaîne des
+requêtes (lectures et écritures mêlées) séparées d’un temps de pause,
+pour un nombre d’utilisateurs donné puis pour le double. L’API tourne
+dans un processus uvicorn séparé, pour que le générateur de charge ne
+lui prenne ni boucle d’événements ni GIL. Avec le contrôle d’admission,
+les requêtes en excès sont refusées en 503 : la latence des requêtes
+servies doit rester bornée. Les résultats sont écrits en JSON.
+
+Usage : python -m benchmarks.bench_admission --users 100 --iterations 40
+
+Attention : les tables de la base configurée sont recréées.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.bench_api_modes import percentile, seed
+
+
+def free_port() -> int:
+    """Retourne un port TCP libre sur la boucle locale."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, limits: dict) -> subprocess.Popen:
+    """
+    Lance l’API dans un processus uvicorn, limitée si ``limits`` (read,
+    write, queue) est fourni, et attend qu’elle réponde.
+    """
+    env = dict(os.environ)
+    if limits:
+        env.update({
+            "ADMISSION_READ_CONCURRENCY": str(limits["read"]),
+            "ADMISSION_WRITE_CONCURRENCY": str(limits["write"]),
+            "ADMISSION_READ_QUEUE": str(limits["queue"]),
+            "ADMISSION_WRITE_QUEUE": str(limits["queue"]),
+        })
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Le serveur uvicorn n’a pas démarré")
+
+
+def send(client: httpx.AsyncClient, i: int, ids: list, write_ratio: float):
+    """Prépare la requête n° ``i`` : une écriture toutes les 1/ratio."""
+    if write_ratio and i % round(1 / write_ratio) == 0:
+        return client.post("/api/v1/client/", json={
+            "nom": f"Bench{i}", "prenom": "Prenom", "adresse": "Adresse"
+        })
+    return client.get(f"/api/v1/client/{ids[i % len(ids)]}")
+
+
+async def run(port, users, iterations, think, ids, write_ratio) -> dict:
+    """Exécute le scénario pour ``users`` utilisateurs virtuels."""
+    latencies, rejected, errors = [], 0, 0
+    limits = httpx.Limits(max_connections=users)
+
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+    ) as client:
+        async def user(index):
+            nonlocal rejected, errors
+            for n in range(iterations):
+                start = time.perf_counter()
+                try:
+                    response = await send(
+                        client, index * iterations + n, ids, write_ratio
+                    )
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                if response.status_code == 503:
+                    rejected += 1
+                elif response.status_code >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(think)
+
+        # Connexions ouvertes avant la mesure (route non limitée)
+        await asyncio.gather(*(client.get("/") for _ in range(users)))
+        start = time.perf_counter()
+        await asyncio.gather(*(user(index) for index in range(users)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "users": users,
+        "requests": users * iterations,
+        "served": len(latencies),
+        "rejected": rejected,
+        "errors": errors,
+        "ops_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=40)
+    parser.add_argument("--think-ms", type=float, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--read-limit", type=int, default=8)
+    parser.add_argument("--write-limit", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=16)
+    args = parser.parse_args()
+
+    ids = seed(args.rows)
+    limits = {
+        "read": args.read_limit,
+        "write": args.write_limit,
+        "queue": args.queue,
+    }
+    results = []
+    for mode in (None, limits):
+        port = free_port()
+        server = start_server(port, mode)
+        try:
+            for users in (args.users, 2 * args.users):
+                result = asyncio.run(run(
+                    port, users, args.iterations, args.think_ms / 1000,
+                    ids, args.write_ratio
+                ))
+                results.append({"admission": bool(mode), **result})
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compare côte à côte les endpoints client en mode sync et async.
+
+Les deux modes sont servis en mémoire (ASGI) sur la même base, avec le
+même nombre de requêtes concurrentes ; les résultats sont écrits en JSON.
+
+Usage : python -m benchmarks.bench_api_modes --requests 2000 --concurrency 10
+
+Avec le pool par défaut (5 + 10 connexions), le mode sync se bloque
+au-delà d’une quinzaine de requêtes concurrentes ; utiliser
+DB_PROFILE=production (pool de 40 connexions) pour monter en charge.
+
+Attention : les tables de la base configurée sont recréées.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app import engine, build_client_router
+from datagen import seed_clients
+
+SCENARIOS = ("get", "list", "create")
+
+
+def seed(rows: int, seed_value: int = 0):
+    """
+    Recrée la table client et y charge ``rows`` clients générés
+    (déterministes pour une graine donnée) ; retourne leurs codcli.
+    """
+    return seed_clients(engine, rows, seed_value)
+
+
+def build_app(mode: str) -> FastAPI:
+    """Construit une application ne servant que les routes client."""
+    api = FastAPI()
+    api.include_router(build_client_router(mode))
+    return api
+
+
+def send(client: httpx.AsyncClient, scenario: str, i: int, ids: list):
+    """Prépare la requête n° ``i`` du scénario."""
+    if scenario == "get":
+        return client.get(f"/api/v1/client/{ids[i % len(ids)]}")
+    if scenario == "list":
+        return client.get("/api/v1/client/?limit=100")
+    return client.post("/api/v1/client/", json={
+        "nom": f"Bench{i}", "prenom": "Prenom", "adresse": "Adresse"
+    })
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Retourne le percentile ``fraction`` (0-1) d’une liste non vide."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode, scenario, total, concurrency, ids) -> dict:
+    """Exécute un scénario et mesure débit et latences."""
+    transport = httpx.ASGITransport(app=build_app(mode))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await send(client, scenario, i, ids)
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "scenario": scenario,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "ops_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append")
+    args = parser.parse_args()
+
+    ids = seed(args.rows)
+    results = [
+        asyncio.run(run(mode, scenario, args.requests, args.concurrency, ids))
+        for scenario in args.scenario or SCENARIOS
+        for mode in ("sync", "async")
+    ]
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
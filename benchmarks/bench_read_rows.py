@@ -0,0 +1,103 @@
+"""
+Compare la lecture des clients en objets ORM et en ClientRecord.
+
+Pour chaque représentation, la même table est relue plusieurs fois ; on
+mesure le temps de construction et la mémoire allouée par ligne
+(tracemalloc), ainsi que la conversion au format ClientInDB. Les
+résultats sont écrits en JSON.
+
+Usage : python -m benchmarks.bench_read_rows --rows 10000 --repeat 5
+
+Attention : les tables de la base configurée sont recréées.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from app import Client, ClientInDB, ClientRepository, SessionLocal
+from benchmarks.bench_api_modes import seed
+
+
+def load_orm(db):
+    """Charge tous les clients en instances ORM (chemin historique)."""
+    return db.query(Client).order_by(Client.codcli).all()
+
+
+def load_records(db):
+    """Charge tous les clients en ClientRecord (lecture seule)."""
+    return ClientRepository(db).get_all_clients()
+
+
+def to_orm_dicts(clients):
+    """Sérialise des instances ORM au format ClientInDB."""
+    return [ClientInDB.from_orm(client).dict() for client in clients]
+
+
+def to_record_dicts(records):
+    """Sérialise des ClientRecord au format ClientInDB."""
+    return [record._asdict() for record in records]
+
+
+PATHS = {
+    "orm": (load_orm, to_orm_dicts),
+    "record": (load_records, to_record_dicts),
+}
+
+
+def measure(path: str, rows: int, repeat: int) -> dict:
+    """Mesure construction, sérialisation et mémoire d’une représentation."""
+    load, serialize = PATHS[path]
+    load_times, dump_times = [], []
+    for _ in range(repeat):
+        # Session neuve : l’identity map ne doit pas servir d’un tour à
+        # l’autre
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            clients = load(db)
+            load_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            serialize(clients)
+            dump_times.append(time.perf_counter() - start)
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        clients = load(db)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del clients
+    finally:
+        db.close()
+
+    load_time = statistics.median(load_times)
+    dump_time = statistics.median(dump_times)
+    return {
+        "path": path,
+        "rows": rows,
+        "repeat": repeat,
+        "load_us_per_row": round(load_time / rows * 1e6, 3),
+        "serialize_us_per_row": round(dump_time / rows * 1e6, 3),
+        "retained_bytes_per_row": round(retained / rows, 1),
+        "peak_bytes_per_row": round(peak / rows, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    results = [measure(path, args.rows, args.repeat) for path in PATHS]
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
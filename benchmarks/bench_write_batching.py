@@ -0,0 +1,122 @@
+"""
+Compare le débit d’écriture avec et sans regroupement des commits.
+
+Comme le scénario k6, chaque utilisateur virtuel enchaîne POST, PATCH et
+DELETE d’un client ; chaque opération ouvre sa propre session comme une
+requête. Le mode ``commit`` valide chaque écriture séparément, le mode
+``batch`` passe par un WriteBatcher. Les résultats sont écrits en JSON.
+
+Usage : python -m benchmarks.bench_write_batching --users 50 --cycles 40
+
+Le gain dépend du coût d’une synchronisation disque : utiliser une base
+sur fichier (DATABASE_URL) et, pour la production, DB_PROFILE=production.
+
+Attention : les tables de la base configurée sont recréées.
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from app import (
+    Base, engine, SessionLocal, ClientPatch, ClientPost, ClientRepository,
+    ClientService
+)
+from batching import WriteBatcher
+from benchmarks.bench_api_modes import percentile
+
+MODES = ("commit", "batch")
+
+
+def cycle(writer, i: int, latencies: list):
+    """Crée, modifie puis supprime un client, en mesurant chaque écriture."""
+    def timed(operation):
+        db = SessionLocal()
+        try:
+            service = ClientService(ClientRepository(db), writer=writer)
+            start = time.perf_counter()
+            result = operation(service)
+            latencies.append(time.perf_counter() - start)
+            return result
+        finally:
+            db.close()
+
+    client = timed(lambda service: service.create_client(ClientPost(
+        nom=f"Bench{i}", prenom="Prenom", adresse="Adresse"
+    )))
+    timed(lambda service: service.patch_client(
+        client.codcli, ClientPatch(nom=f"Modif{i}")
+    ))
+    timed(lambda service: service.delete_client(client.codcli))
+
+
+def run(mode: str, users: int, cycles: int, batch_size: int, delay_ms: float):
+    """Exécute le scénario pour un mode et mesure débit et latences."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    writer = None
+    if mode == "batch":
+        writer = WriteBatcher(
+            SessionLocal,
+            lambda session: ClientRepository(session, autocommit=False),
+            max_operations=batch_size,
+            max_delay=delay_ms / 1000
+        )
+    latencies, errors = [], []
+
+    def user(index):
+        for n in range(cycles):
+            try:
+                cycle(writer, index * cycles + n, latencies)
+            except Exception as exc:
+                errors.append(exc)
+
+    threads = [
+        threading.Thread(target=user, args=(index,)) for index in range(users)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "mode": mode,
+        "users": users,
+        "writes": len(latencies),
+        "errors": len(errors),
+        "writes_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+    if writer is not None:
+        writer.close()
+        stats = writer.stats()
+        result["commits"] = stats["batches"]
+        result["writes_per_commit"] = round(
+            stats["operations"] / max(stats["batches"], 1), 1
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    results = [
+        run(mode, args.users, args.cycles, args.batch_size, args.delay_ms)
+        for mode in MODES
+    ]
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
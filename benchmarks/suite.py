@@ -0,0 +1,467 @@
+"""
+Suite de benchmarks des couches repository, service et HTTP.
+
+Pour chaque taille de table, les mêmes scénarios sont mesurés sur :
+
+- ``repository`` : ClientRepository, une session par opération ;
+- ``service`` : ClientService, avec le cache et le regroupement des
+  lectures configurés pour l’application ;
+- ``http`` : routes FastAPI de l’application, en mémoire (TestClient) ;
+- ``uvicorn`` : les mêmes routes, servies par un processus uvicorn local.
+
+Scénarios : ``create``, ``get``, ``update``, ``delete``, ``list`` (page
+de 100 clients à partir d’un curseur aléatoire), mesurés un par un, et
+``mixed`` (70 % lectures, 15 % listes, 10 % mises à jour, 5 % créations)
+mesuré avec ``--concurrency`` threads. Chaque résultat donne ops/s et
+les latences p50/p95/p99 ; le tout est écrit en JSON.
+
+Usage : python -m benchmarks.suite --sizes 1000,100000 --output bench.json
+        python -m benchmarks.suite --sizes 1000 --baseline bench.json
+
+Avec ``--baseline``, chaque résultat est comparé à celui de même couche,
+scénario, taille et concurrence : une dégradation au-delà de
+``--threshold`` (0.2 = 20 %) d’une métrique suivie, ou toute opération
+en erreur, fait échouer la commande (code de sortie 1).
+
+Attention : les tables de la base configurée sont recréées ; la couche
+``uvicorn`` demande une base fichier (pas ``:memory:``).
+"""
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import (
+    ClientPatch, ClientPost, ClientRepository, ClientService, SessionLocal,
+    app, client_cache, client_reads, client_writer
+)
+from benchmarks.bench_admission import free_port, start_server
+from benchmarks.bench_api_modes import percentile, seed
+
+LAYERS = ("repository", "service", "http", "uvicorn")
+SCENARIOS = ("create", "get", "update", "list", "mixed", "delete")
+DEFAULT_SIZES = (1000, 100_000, 1_000_000)
+PAGE_SIZE = 100
+
+# Métriques comparées à la référence : +1 si une hausse est une
+# dégradation (latence), -1 si c’est une baisse (débit)
+METRIC_DIRECTIONS = {
+    "p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "ops_per_sec": -1,
+}
+DEFAULT_METRICS = ("p95_ms", "ops_per_sec")
+
+# Répartition du scénario mixte (opération, poids)
+MIXED_WORKLOAD = (("get", 70), ("list", 15), ("update", 10), ("create", 5))
+
+
+def new_client(i: int) -> dict:
+    """Données d’un client créé pendant la mesure."""
+    return {
+        "nom": f"Bench{i}", "prenom": "Prenom", "genre": None,
+        "adresse": "Adresse", "complement_adresse": None, "tel": None,
+        "email": None, "newsletter": i % 2
+    }
+
+
+class RepositoryLayer:
+    """Opérations sur ClientRepository, une session par opération."""
+
+    name = "repository"
+
+    def _run(self, operation: Callable[[ClientRepository], object]):
+        with SessionLocal() as session:
+            return operation(ClientRepository(session))
+
+    def create(self, i: int):
+        self._run(lambda repo: repo.create_client(new_client(i)))
+
+    def get(self, client_id: int):
+        self._run(lambda repo: repo.get_client_by_id(client_id))
+
+    def update(self, client_id: int, i: int):
+        self._run(lambda repo: repo.patch_client(
+            client_id, {"nom": f"Modifie{i}"}
+        ))
+
+    def delete(self, client_id: int):
+        self._run(lambda repo: repo.delete_client(client_id))
+
+    def list(self, after: int):
+        self._run(lambda repo: repo.get_clients_page(after, PAGE_SIZE))
+
+    def close(self):
+        pass
+
+
+class ServiceLayer(RepositoryLayer):
+    """Opérations sur ClientService, configuré comme dans l’application."""
+
+    name = "service"
+
+    def _run(self, operation: Callable[[ClientService], object]):
+        with SessionLocal() as session:
+            return operation(ClientService(
+                ClientRepository(session), cache=client_cache,
+                writer=client_writer, reads=client_reads
+            ))
+
+    def create(self, i: int):
+        self._run(lambda service: service.create_client(
+            ClientPost(**new_client(i))
+        ))
+
+    def update(self, client_id: int, i: int):
+        self._run(lambda service: service.patch_client(
+            client_id, ClientPatch(nom=f"Modifie{i}")
+        ))
+
+    def list(self, after: int):
+        self._run(lambda service: service.get_clients_page(after, PAGE_SIZE))
+
+
+class HttpLayer:
+    """Opérations sur les routes client, par un client HTTP synchrone."""
+
+    def __init__(self, name: str, client, close: Callable[[], None]):
+        self.name = name
+        self.client = client
+        self._close = close
+
+    def _check(self, response):
+        response.raise_for_status()
+
+    def create(self, i: int):
+        self._check(self.client.post("/api/v1/client/", json=new_client(i)))
+
+    def get(self, client_id: int):
+        self._check(self.client.get(f"/api/v1/client/{client_id}"))
+
+    def update(self, client_id: int, i: int):
+        self._check(self.client.patch(
+            f"/api/v1/client/{client_id}", json={"nom": f"Modifie{i}"}
+        ))
+
+    def delete(self, client_id: int):
+        self._check(self.client.delete(f"/api/v1/client/{client_id}"))
+
+    def list(self, after: int):
+        self._check(self.client.get(
+            "/api/v1/client/", params={"after": after, "limit": PAGE_SIZE}
+        ))
+
+    def close(self):
+        self._close()
+
+
+def open_layer(name: str, concurrency: int):
+    """Prépare une couche à mesurer."""
+    if name == "repository":
+        return RepositoryLayer()
+    if name == "service":
+        return ServiceLayer()
+    if name == "http":
+        client = TestClient(app)
+        client.__enter__()
+        return HttpLayer(
+            name, client, lambda: client.__exit__(None, None, None)
+        )
+    port = free_port()
+    server = start_server(port, None)
+    client = httpx.Client(
+        base_url=f"http://127.0.0.1:{port}",
+        limits=httpx.Limits(max_connections=concurrency),
+        timeout=60
+    )
+
+    def close():
+        client.close()
+        server.terminate()
+        server.wait()
+
+    return HttpLayer(name, client, close)
+
+
+def measure(
+    operation: Callable[[int], None],
+    operations: int,
+    concurrency: int = 1
+) -> dict:
+    """
+    Exécute ``operations`` fois l’opération (avec ``concurrency``
+    threads) et résume débit et latences ; une exception compte comme
+    une erreur, exclue du débit et des latences.
+    """
+    def timed(i: int) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            operation(i)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        timings = [timed(i) for i in range(operations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(timed, range(operations)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [timing for timing in timings if timing is not None]
+    succeeded = len(latencies)
+    if not latencies:
+        latencies = [0.0]
+    return {
+        "operations": operations,
+        "concurrency": concurrency,
+        "errors": operations - succeeded,
+        "ops_per_sec": round(succeeded / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def scenario_operation(
+    scenario: str,
+    layer,
+    ids: List[int],
+    deletable: List[int],
+    rng: random.Random
+) -> Callable[[int], None]:
+    """
+    Retourne l’opération n° ``i`` d’un scénario.
+
+    Les suppressions consomment ``deletable`` (clients qui ne sont plus
+    lus ensuite) ; les autres opérations visent des clients tirés dans
+    ``ids``. Les tirages sont faits d’avance, avec une graine fixe.
+    """
+    if scenario == "create":
+        return layer.create
+    if scenario == "delete":
+        return lambda i: layer.delete(deletable.pop())
+
+    draws = [rng.choice(ids) for _ in range(4096)]
+    if scenario == "get":
+        return lambda i: layer.get(draws[i % len(draws)])
+    if scenario == "update":
+        return lambda i: layer.update(draws[i % len(draws)], i)
+    if scenario == "list":
+        return lambda i: layer.list(draws[i % len(draws)])
+
+    weights = [weight for _, weight in MIXED_WORKLOAD]
+    kinds = rng.choices(
+        [kind for kind, _ in MIXED_WORKLOAD], weights, k=len(draws)
+    )
+
+    def mixed(i: int):
+        kind, client_id = kinds[i % len(kinds)], draws[i % len(draws)]
+        if kind == "create":
+            layer.create(i)
+        elif kind == "update":
+            layer.update(client_id, i)
+        else:
+            getattr(layer, kind)(client_id)
+
+    return mixed
+
+
+def run_suite(
+    sizes: Iterable[int],
+    layers: Iterable[str] = LAYERS,
+    scenarios: Iterable[str] = SCENARIOS,
+    operations: int = 1000,
+    concurrency: int = 8,
+    seed_value: int = 0,
+    progress: Callable[[str], None] = lambda message: None
+) -> List[dict]:
+    """Exécute la suite et retourne un résultat par mesure."""
+    layers, results = list(layers), []
+    for rows in sizes:
+        progress(f"Chargement de {rows} clients")
+        ids = seed(rows, seed_value)
+        if client_cache is not None:
+            client_cache.clear()
+        rng = random.Random(seed_value)
+        # Moitié de la table réservée aux scénarios delete (jamais relue),
+        # partagée entre les couches
+        half = len(ids) // 2
+        quota = half // len(layers)
+        for index, layer_name in enumerate(layers):
+            deletable = ids[half + index * quota:half + (index + 1) * quota]
+            layer = open_layer(layer_name, concurrency)
+            try:
+                for scenario in scenarios:
+                    count = operations
+                    if scenario == "delete":
+                        count = min(operations, len(deletable))
+                    if not count:
+                        continue
+                    progress(f"{layer_name} / {scenario} / {rows} lignes")
+                    operation = scenario_operation(
+                        scenario, layer, ids[:half] or ids, deletable, rng
+                    )
+                    results.append({
+                        "layer": layer_name,
+                        "scenario": scenario,
+                        "rows": rows,
+                        **measure(
+                            operation, count,
+                            concurrency if scenario == "mixed" else 1
+                        ),
+                    })
+            finally:
+                layer.close()
+    return results
+
+
+def result_key(result: dict) -> tuple:
+    """Identifie une mesure pour la comparer à la référence."""
+    return (
+        result["layer"], result["scenario"], result["rows"],
+        result["concurrency"]
+    )
+
+
+def compare(
+    results: List[dict],
+    baseline: List[dict],
+    threshold: float,
+    metrics: Iterable[str] = DEFAULT_METRICS
+) -> List[dict]:
+    """
+    Retourne les dégradations de plus de ``threshold`` (fraction) par
+    rapport aux mesures de même clé de la référence.
+
+    Une mesure en erreur est toujours une régression, quel que soit le
+    seuil : sa variation est la part d’opérations en échec.
+    """
+    reference = {result_key(result): result for result in baseline}
+    regressions = []
+
+    def regression(result, metric, before, after, change):
+        regressions.append({
+            "layer": result["layer"],
+            "scenario": result["scenario"],
+            "rows": result["rows"],
+            "concurrency": result["concurrency"],
+            "metric": metric,
+            "baseline": before,
+            "current": after,
+            "change": round(change, 3),
+        })
+
+    for result in results:
+        previous = reference.get(result_key(result))
+        if result["errors"]:
+            before = previous["errors"] if previous is not None else 0
+            regression(
+                result, "errors", before, result["errors"],
+                result["errors"] / result["operations"]
+            )
+        if previous is None:
+            continue
+        for metric in metrics:
+            before, after = previous[metric], result[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            if change * METRIC_DIRECTIONS[metric] > threshold:
+                regression(result, metric, before, after, change)
+    return regressions
+
+
+def environment() -> dict:
+    """Décrit la machine et les versions de la mesure."""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def csv_values(value: str, cast=str) -> list:
+    """Découpe une option ``a,b,c``."""
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=lambda value: csv_values(value, int),
+        default=list(DEFAULT_SIZES), help="tailles de table (1000,100000)"
+    )
+    parser.add_argument(
+        "--layers", type=csv_values, default=list(LAYERS),
+        help=f"couches mesurées parmi {','.join(LAYERS)}"
+    )
+    parser.add_argument(
+        "--scenarios", type=csv_values, default=list(SCENARIOS),
+        help=f"scénarios parmi {','.join(SCENARIOS)}"
+    )
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--baseline", help="fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument(
+        "--metrics", type=csv_values, default=list(DEFAULT_METRICS),
+        help=f"métriques comparées parmi {','.join(METRIC_DIRECTIONS)}"
+    )
+    args = parser.parse_args(argv)
+    for name, values, allowed in (
+        ("--layers", args.layers, LAYERS),
+        ("--scenarios", args.scenarios, SCENARIOS),
+        ("--metrics", args.metrics, METRIC_DIRECTIONS),
+    ):
+        unknown = set(values) - set(allowed)
+        if unknown:
+            parser.error(f"{name} : inconnu(s) {', '.join(sorted(unknown))}")
+
+    document = {
+        "environment": environment(),
+        "results": run_suite(
+            args.sizes, args.layers, args.scenarios, args.operations,
+            args.concurrency, args.seed,
+            progress=lambda message: print(message, file=sys.stderr)
+        ),
+    }
+    output = json.dumps(document, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(
+        document["results"], baseline, args.threshold, args.metrics
+    )
+    for regression in regressions:
+        print(
+            "Régression {layer}/{scenario}/{rows} lignes/x{concurrency} : "
+            "{metric} {baseline} -> {current} ({change:+.1%})".format(
+                **regression
+            ),
+            file=sys.stderr
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
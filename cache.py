@@ -0,0 +1,553 @@
+"""
+Cache des lectures client.
+
+``ReadThroughCache`` sert les lectures au travers d’un stockage
+interchangeable (``CacheBackend``) :
+
+- ``MemoryCacheBackend`` : LRU borné avec durée de vie, propre au processus ;
+- ``SQLiteCacheBackend`` : fichier SQLite partagé par tous les workers d’un
+  même hôte.
+
+Les invalidations sont publiées par un compteur de version : chaque
+écriture incrémente le compteur et marque la clé. Une lecture commencée
+avant l’écriture ne peut plus enregistrer la valeur qu’elle a lue, quel
+que soit le worker qui l’a lancée.
+
+``SingleFlight`` regroupe les lectures identiques simultanées : une seule
+exécution par clé, dont le résultat est partagé par toutes les requêtes
+arrivées pendant qu’elle s’exécutait.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class CacheBackend:
+    """Interface d’un stockage de cache versionné."""
+
+    # Vrai si le stockage est commun à tous les processus de l’hôte
+    shared = False
+
+    def get(self, key: Hashable) -> Any:
+        """Retourne la valeur valide associée à la clé, ou None."""
+        raise NotImplementedError
+
+    def version(self, key: Hashable) -> int:
+        """Retourne la version à relever avant de charger une valeur."""
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, version: int) -> bool:
+        """
+        Enregistre une valeur chargée à partir de ``version``.
+
+        La valeur est refusée (False) si la clé a été invalidée depuis.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, key: Hashable):
+        """Retire la clé et publie l’invalidation."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Vide le cache et invalide toutes les clés."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du stockage."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Stockage LRU en mémoire, borné en nombre d’entrées, avec TTL.
+
+    Les marques d’invalidation sont elles aussi bornées : la plus ancienne
+    éliminée relève un plancher sous lequel toute écriture est refusée.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialise un cache de ``max_entries`` entrées vivant ``ttl`` s."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._version = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Retourne la valeur en cache, ou None si absente ou expirée."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def version(self, key: Hashable) -> int:
+        """Retourne la version courante du cache."""
+        with self._lock:
+            return self._version
+
+    def set(self, key: Hashable, value: Any, version: int) -> bool:
+        """Enregistre la valeur si la clé n’a pas été invalidée depuis."""
+        with self._lock:
+            if max(self._floor, self._invalidated.get(key, 0)) > version:
+                return False
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key: Hashable):
+        """Retire la clé et marque son invalidation."""
+        with self._lock:
+            self.invalidations += 1
+            self._version += 1
+            self._entries.pop(key, None)
+            self._invalidated[key] = self._version
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.max_entries:
+                _, stamp = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, stamp)
+
+    def clear(self):
+        """Vide le cache et invalide toutes les clés."""
+        with self._lock:
+            self.invalidations += 1
+            self._version += 1
+            self._floor = self._version
+            self._entries.clear()
+            self._invalidated.clear()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du stockage."""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
+
+
+class SQLiteConnections:
+    """
+    Connexions SQLite d’un fichier partagé, une par thread et par processus.
+
+    Une connexion héritée d’un ``fork`` n’est jamais réutilisée : le
+    processus enfant ouvre la sienne au premier accès.
+    """
+
+    def __init__(self, path: str):
+        """Prépare l’accès au fichier ``path`` (ouvert à la demande)."""
+        self.path = path
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (ouverte à la demande)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Stockage partagé dans un fichier SQLite, commun aux workers d’un hôte.
+
+    Les valeurs sont sérialisées en JSON. Le compteur de version et les
+    marques d’invalidation vivent dans le même fichier : une écriture faite
+    par un worker périme les lectures en cours dans tous les autres.
+    """
+
+    CLEANUP_EVERY = 100
+    shared = True
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10_000,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """Ouvre (ou crée) le cache partagé stocké dans ``path``."""
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._connections = SQLiteConnections(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.evictions = 0
+        self.invalidations = 0
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at
+                    ON cache_entries (expires_at);
+                CREATE TABLE IF NOT EXISTS cache_invalidations (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL,
+                    floor INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO cache_version VALUES (0, 0, 0);
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (ouverte à la demande)."""
+        return self._connections.get()
+
+    def get(self, key: Hashable) -> Any:
+        """Retourne la valeur partagée, ou None si absente ou expirée."""
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (str(key), self._clock())
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def version(self, key: Hashable) -> int:
+        """Retourne la version courante du cache partagé."""
+        return self._connection().execute(
+            "SELECT version FROM cache_version"
+        ).fetchone()[0]
+
+    def set(self, key: Hashable, value: Any, version: int) -> bool:
+        """Enregistre la valeur si aucune invalidation n’est survenue."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stamp = conn.execute(
+                "SELECT max(v.floor, coalesce(i.version, 0)) "
+                "FROM cache_version v LEFT JOIN cache_invalidations i "
+                "ON i.key = ?",
+                (str(key),)
+            ).fetchone()[0]
+            if stamp > version:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)",
+                (str(key), json.dumps(value), self._clock() + self.ttl)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._writes += 1
+            cleanup = self._writes % self.CLEANUP_EVERY == 0
+        if cleanup:
+            self.cleanup()
+        return True
+
+    def invalidate(self, key: Hashable):
+        """Retire la clé et publie l’invalidation à tous les workers."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE cache_version SET version = version + 1")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_invalidations "
+                "SELECT ?, version FROM cache_version",
+                (str(key),)
+            )
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ?", (str(key),)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self):
+        """Vide le cache partagé et invalide toutes les clés."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE cache_version SET version = version + 1, "
+                "floor = version + 1"
+            )
+            conn.execute("DELETE FROM cache_invalidations")
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.invalidations += 1
+
+    def cleanup(self):
+        """
+        Supprime les entrées expirées puis les plus proches de l’expiration
+        au-delà de ``max_entries`` ; borne aussi les marques d’invalidation.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?",
+                (self._clock(),)
+            )
+            evicted = conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY expires_at "
+                "LIMIT max(0, (SELECT count(*) FROM cache_entries) - ?))",
+                (self.max_entries,)
+            ).rowcount
+            # Les marques éliminées relèvent le plancher de version
+            excess = conn.execute(
+                "SELECT count(*) FROM cache_invalidations"
+            ).fetchone()[0] - self.max_entries
+            if excess > 0:
+                floor = conn.execute(
+                    "SELECT version FROM cache_invalidations "
+                    "ORDER BY version LIMIT 1 OFFSET ?",
+                    (excess - 1,)
+                ).fetchone()[0]
+                conn.execute(
+                    "UPDATE cache_version SET floor = max(floor, ?)", (floor,)
+                )
+                conn.execute(
+                    "DELETE FROM cache_invalidations WHERE version <= ?",
+                    (floor,)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.evictions += evicted
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du stockage partagé."""
+        conn = self._connection()
+        entries = conn.execute(
+            "SELECT count(*) FROM cache_entries"
+        ).fetchone()[0]
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "version": self.version(None),
+            }
+
+
+# Valeur par défaut de SingleFlight.forget : toutes les clés
+_ALL_KEYS = object()
+
+
+class _Flight:
+    """Exécution en cours d’une clé, partagée par les appels concurrents."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Regroupement des exécutions identiques simultanées (single-flight).
+
+    Les appels de ``do`` avec une clé déjà en cours d’exécution attendent
+    cette exécution et en reçoivent le résultat (ou l’exception) au lieu
+    de lancer la leur. Rien n’est conservé une fois l’exécution terminée.
+    """
+
+    def __init__(self):
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Exécute ``fn`` pour ``key`` ou attend l’exécution en cours."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def forget(self, key: Hashable = _ALL_KEYS):
+        """
+        Détache les exécutions en cours (toutes, ou celle de ``key``) :
+        les appels suivants en lancent de nouvelles (à appeler après une
+        écriture, pour qu’une lecture ne reçoive pas un résultat lu avant
+        celle-ci).
+        """
+        with self._lock:
+            if key is _ALL_KEYS:
+                self._flights.clear()
+            else:
+                self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        """Retourne les compteurs d’exécutions et d’appels regroupés."""
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+class ReadThroughCache:
+    """
+    Lecture au travers d’un ``CacheBackend``.
+
+    En cas d’absence, un seul chargement est lancé par clé dans le
+    processus et les lectures concurrentes de la même clé en attendent le
+    résultat (protection contre l’effet de ruée).
+    """
+
+    def __init__(self, backend: CacheBackend):
+        """Initialise le cache sur le stockage fourni."""
+        self.backend = backend
+        self._loads = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self) -> int:
+        """Taille maximale du stockage."""
+        return self.backend.max_entries
+
+    @property
+    def shared(self) -> bool:
+        """Indique si le stockage est partagé entre processus."""
+        return self.backend.shared
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retourne la valeur en cache ou la charge avec ``loader``.
+
+        Une valeur None (client inexistant) n’est pas mise en cache.
+        """
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        return self._loads.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Charge une clé et l’enregistre si aucune écriture n’a eu lieu."""
+        version = self.backend.version(key)
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value, version)
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        """Retourne la valeur en cache sans la charger ni compter d’accès."""
+        return self.backend.get(key)
+
+    def invalidate(self, key: Hashable):
+        """
+        Retire une clé du cache.
+
+        Le chargement en cours de la clé est détaché : lu avant
+        l’écriture, il ne doit pas servir une lecture lancée après.
+        """
+        self.backend.invalidate(key)
+        self._loads.forget(key)
+
+    def clear(self):
+        """Vide le cache et détache les chargements en cours."""
+        self.backend.clear()
+        self._loads.forget()
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du processus et du stockage."""
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses}
+        counters["coalesced"] = self._loads.stats()["coalesced"]
+        return {**self.backend.stats(), **counters}
+
+
+def create_cache_backend(
+    kind: str,
+    max_entries: int,
+    ttl: float,
+    path: Optional[str] = None
+) -> CacheBackend:
+    """Construit le stockage de cache demandé (``memory`` ou ``sqlite``)."""
+    if kind == "memory":
+        return MemoryCacheBackend(max_entries, ttl)
+    if kind == "sqlite":
+        return SQLiteCacheBackend(
+            path or "./client_cache.db", max_entries, ttl
+        )
+    raise ValueError(f"Stockage de cache inconnu : {kind}")
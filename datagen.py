@@ -0,0 +1,327 @@
+"""
+Génération déterministe de clients synthétiques et chargement en masse.
+
+``ClientGenerator`` produit, pour une graine donnée, toujours la même
+suite de clients : les ``n`` premiers clients d’un jeu de ``m > n``
+clients sont ceux d’un jeu de ``n`` clients. Les valeurs respectent la
+largeur des colonnes du modèle ``Client`` ; la répartition des noms
+(loi de Zipf), des genres et des champs facultatifs se règle par une
+``ClientDistribution``.
+
+``load_clients`` insère les lignes par lots (executemany) dans une seule
+transaction. Sous SQLite, les index secondaires et les triggers de
+t_client sont retirés pendant le chargement puis recréés ; l’index plein
+texte et les compteurs de statistiques sont ensuite reconstruits.
+
+Usage : python manage.py seed-clients --count 1000000 --seed 42
+"""
+
+import random
+import unicodedata
+from itertools import accumulate, islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app import (
+    Base, client_table, install_client_search, new_row_version,
+    reconcile_client_stats
+)
+
+# Colonnes chargées, dans l’ordre des tuples produits par le générateur
+LOAD_COLUMNS = (
+    "nom", "prenom", "genre", "adresse", "complement_adresse", "tel",
+    "email", "newsletter", "version",
+)
+# Largeur maximale des colonnes texte, lue sur le modèle
+COLUMN_WIDTHS = {
+    column.name: column.type.length
+    for column in client_table.columns
+    if getattr(column.type, "length", None)
+}
+
+# Clients générés par bloc : le tirage ne dépend pas de la taille des
+# lots d’insertion
+GENERATION_BLOCK = 4096
+# Tirages uniformes par client
+DRAWS_PER_CLIENT = 8
+DEFAULT_BATCH_SIZE = 10_000
+
+SURNAMES = (
+    "Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand",
+    "Dubois", "Moreau", "Laurent", "Simon", "Michel", "Lefèvre", "Leroy",
+    "Roux", "David", "Bertrand", "Morel", "Fournier", "Girard", "Bonnet",
+    "Dupont", "Lambert", "Fontaine", "Rousseau", "Vincent", "Muller",
+    "Lefebvre", "Faure", "André", "Mercier", "Blanc", "Guérin", "Boyer",
+    "Garnier", "Chevalier", "François", "Legrand", "Gauthier", "Garcia",
+    "Perrin", "Robin", "Clément", "Morin", "Nicolas", "Henry", "Roussel",
+    "Mathieu", "Gautier", "Masson",
+)
+# Noms composés : longue traîne après les noms simples
+NAMES = tuple(
+    name[:COLUMN_WIDTHS["nom"]]
+    for name in SURNAMES + tuple(
+        f"{first}-{second}"
+        for first in SURNAMES for second in SURNAMES if first != second
+    )
+)
+FIRST_NAMES = {
+    "F": (
+        "Marie", "Nathalie", "Isabelle", "Sylvie", "Catherine", "Camille",
+        "Léa", "Manon", "Chloé", "Emma", "Inès", "Julie", "Sophie",
+        "Hélène", "Céline", "Anne", "Claire", "Élodie", "Laura", "Zoé",
+    ),
+    "M": (
+        "Jean", "Pierre", "Michel", "Philippe", "Alain", "Nicolas", "Thomas",
+        "Lucas", "Hugo", "Louis", "Gabriel", "Jules", "Antoine", "Julien",
+        "François", "Éric", "Olivier", "Sébastien", "Mathis", "Théo",
+    ),
+}
+FIRST_NAMES[None] = FIRST_NAMES["F"] + FIRST_NAMES["M"]
+FIRST_NAMES = {
+    genre: tuple(name[:COLUMN_WIDTHS["prenom"]] for name in names)
+    for genre, names in FIRST_NAMES.items()
+}
+STREET_TYPES = ("rue", "avenue", "boulevard", "place", "impasse", "chemin")
+STREET_NAMES = (
+    "de la République", "Victor Hugo", "Jean Jaurès", "de la Paix",
+    "des Lilas", "du Général de Gaulle", "Pasteur", "de la Gare",
+    "des Écoles", "du Moulin", "de l’Église", "Gambetta", "Voltaire",
+    "des Acacias", "du Château", "Jean Moulin", "de Verdun", "Carnot",
+)
+COMPLEMENTS = (
+    "Bâtiment {}", "Appartement {}", "Résidence les Tilleuls, entrée {}",
+    "Étage {}", "Boîte postale {}",
+)
+EMAIL_DOMAINS = (
+    "gmail.com", "orange.fr", "free.fr", "yahoo.fr", "hotmail.fr",
+    "laposte.net", "sfr.fr", "outlook.fr",
+)
+
+
+class ClientDistribution(NamedTuple):
+    """
+    Répartition des valeurs générées.
+
+    Les champs ``newsletter``, ``email``, ``tel`` et
+    ``complement_adresse`` sont des probabilités (abonnement, champ
+    renseigné) ; ``name_skew`` est l’exposant de la loi de Zipf des noms
+    (0 : uniforme).
+    """
+
+    newsletter: float = 0.3
+    email: float = 0.7
+    tel: float = 0.8
+    complement_adresse: float = 0.2
+    genres: Tuple[Tuple[Optional[str], float], ...] = (
+        ("F", 0.48), ("M", 0.48), (None, 0.04)
+    )
+    name_skew: float = 1.0
+
+
+def ascii_slug(value: str) -> str:
+    """Forme ASCII minuscule d’un nom, pour les adresses e-mail."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(
+        char for char in decomposed if char.isascii() and char.isalnum()
+    ).lower()
+
+
+class ClientGenerator:
+    """Générateur déterministe de clients synthétiques."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        distribution: ClientDistribution = ClientDistribution()
+    ):
+        self.seed = seed
+        self.distribution = distribution
+        self._genres = [genre for genre, _ in distribution.genres]
+        self._genres_cumulative = list(accumulate(
+            weight for _, weight in distribution.genres
+        ))
+        self._names_cumulative = list(accumulate(
+            1 / (rank + 1) ** distribution.name_skew
+            for rank in range(len(NAMES))
+        ))
+        # Valeurs composées calculées une fois, à la largeur des colonnes
+        self._addresses = [
+            f"{number} {street_type} {street}"[:COLUMN_WIDTHS["adresse"]]
+            for number in range(1, 200)
+            for street_type in STREET_TYPES
+            for street in STREET_NAMES
+        ]
+        self._complements = [
+            complement.format(number)[:COLUMN_WIDTHS["complement_adresse"]]
+            for complement in COMPLEMENTS
+            for number in range(1, 21)
+        ]
+        self._slugs = {
+            name: ascii_slug(name)
+            for name in NAMES + FIRST_NAMES[None]
+        }
+
+    def _block(
+        self,
+        rng: random.Random,
+        first: int,
+        version: int
+    ) -> List[tuple]:
+        """
+        Génère un bloc de clients numérotés à partir de ``first``.
+
+        Les tirages uniformes sont faits d’un coup (``random()`` est bien
+        moins coûteux que ``randrange`` ou ``choice``) ; seuls le genre
+        et le nom, pondérés, passent par ``choices``. Les adresses et
+        compléments sont pris dans des listes calculées d’avance.
+        """
+        size, law = GENERATION_BLOCK, self.distribution
+        genres = rng.choices(
+            self._genres, cum_weights=self._genres_cumulative, k=size
+        )
+        names = rng.choices(NAMES, cum_weights=self._names_cumulative, k=size)
+        draws = [rng.random() for _ in range(DRAWS_PER_CLIENT * size)]
+
+        slugs, rows = self._slugs, []
+        addresses, complements = self._addresses, self._complements
+        email_width = COLUMN_WIDTHS["email"]
+        for i in range(size):
+            (newsletter, email, tel, complement, first_name, address,
+             domain, phone) = draws[
+                DRAWS_PER_CLIENT * i:DRAWS_PER_CLIENT * (i + 1)
+            ]
+            nom, first_names = names[i], FIRST_NAMES[genres[i]]
+            prenom = first_names[int(first_name * len(first_names))]
+            rows.append((
+                nom,
+                prenom,
+                genres[i],
+                addresses[int(address * len(addresses))],
+                complements[int(
+                    complement / law.complement_adresse * len(complements)
+                )] if complement < law.complement_adresse else None,
+                f"0{100_000_000 + int(phone * 700_000_000)}"
+                if tel < law.tel else None,
+                f"{slugs[prenom]}.{slugs[nom]}{first + i}@"
+                f"{EMAIL_DOMAINS[int(domain * len(EMAIL_DOMAINS))]}"
+                [:email_width]
+                if email < law.email else None,
+                int(newsletter < law.newsletter),
+                version,
+            ))
+        return rows
+
+    def rows(self, count: int, version: int = 1) -> Iterator[tuple]:
+        """
+        Produit ``count`` clients sous forme de tuples (ordre de
+        ``LOAD_COLUMNS``), tous à la version ``version``.
+        """
+        rng = random.Random(self.seed)
+        first = 0
+        while first < count:
+            block = self._block(rng, first, version)
+            yield from islice(block, count - first)
+            first += len(block)
+
+    def clients(self, count: int) -> Iterator[dict]:
+        """Produit ``count`` clients sous forme de dictionnaires."""
+        fields = LOAD_COLUMNS[:-1]
+        for row in self.rows(count):
+            yield dict(zip(fields, row))
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    """Découpe un flux de lignes en lots de ``size`` lignes."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _schema_objects(conn, kind: str) -> List[Tuple[str, str]]:
+    """Nom et DDL des index (hors clé primaire) ou triggers de t_client."""
+    return list(conn.execute(text(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = :kind AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"kind": kind, "table": client_table.name}))
+
+
+def load_clients(
+    bind: Engine,
+    rows: Iterable[tuple],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Insère des clients (tuples de ``LOAD_COLUMNS``) dans une seule
+    transaction et retourne leur nombre.
+
+    Sous SQLite, les index secondaires et les triggers sont retirés
+    pendant l’insertion puis recréés dans la même transaction ; l’index
+    plein texte et les compteurs de statistiques sont reconstruits
+    ensuite.
+    """
+    sqlite = bind.dialect.name == "sqlite"
+    loaded = 0
+    with bind.begin() as conn:
+        if sqlite:
+            indexes = _schema_objects(conn, "index")
+            triggers = _schema_objects(conn, "trigger")
+            for name, _ in indexes:
+                conn.exec_driver_sql(f'DROP INDEX "{name}"')
+            for name, _ in triggers:
+                conn.exec_driver_sql(f'DROP TRIGGER "{name}"')
+            statement = (
+                f"INSERT INTO {client_table.name} ({', '.join(LOAD_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(LOAD_COLUMNS))})"
+            )
+            for batch in _batches(rows, batch_size):
+                conn.exec_driver_sql(statement, batch)
+                loaded += len(batch)
+            for _, ddl in indexes + triggers:
+                conn.exec_driver_sql(ddl)
+        else:
+            for batch in _batches(rows, batch_size):
+                conn.execute(insert(client_table), [
+                    dict(zip(LOAD_COLUMNS, row)) for row in batch
+                ])
+                loaded += len(batch)
+    if sqlite:
+        install_client_search(bind, rebuild=True)
+        reconcile_client_stats(bind)
+    return loaded
+
+
+def seed_clients(
+    bind: Engine,
+    count: int,
+    seed: int = 0,
+    distribution: ClientDistribution = ClientDistribution(),
+    replace: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[int]:
+    """
+    Charge ``count`` clients générés avec la graine ``seed`` et retourne
+    les codcli des clients chargés.
+
+    Avec ``replace``, les tables sont d’abord recréées ; sinon les
+    clients sont ajoutés à ceux de la table.
+    """
+    if replace:
+        Base.metadata.drop_all(bind=bind)
+        Base.metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        previous = conn.scalar(
+            select(func.coalesce(func.max(client_table.c.codcli), 0))
+        )
+    generator = ClientGenerator(seed, distribution)
+    load_clients(bind, generator.rows(count, new_row_version()), batch_size)
+    with bind.connect() as conn:
+        return list(conn.scalars(
+            select(client_table.c.codcli)
+            .where(client_table.c.codcli > previous)
+            .order_by(client_table.c.codcli)
+        ))
@@ -0,0 +1,326 @@
+"""
+Clés d’idempotence des requêtes d’écriture.
+
+Une requête portant un en-tête ``Idempotency-Key`` réserve la clé avant de
+s’exécuter, puis y enregistre sa réponse. Une répétition de la même
+requête est servie depuis la réponse enregistrée, sans nouvelle écriture ;
+une requête concurrente avec la même clé attend la fin de la première.
+
+Deux stockages sont disponibles :
+
+- ``MemoryIdempotencyStore`` : propre au processus, borné et avec TTL ;
+- ``SQLiteIdempotencyStore`` : fichier SQLite partagé par les workers d’un
+  même hôte (une requête rejouée peut arriver sur un autre worker).
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from cache import SQLiteConnections
+
+
+class StoredResponse(NamedTuple):
+    """Réponse enregistrée pour une clé d’idempotence."""
+
+    status: int
+    body: bytes
+    etag: Optional[str] = None
+
+
+class IdempotencyConflict(Exception):
+    """La clé a déjà servi pour une requête différente."""
+
+
+class IdempotencyPending(Exception):
+    """La requête qui détient la clé ne s’est pas terminée à temps."""
+
+
+class IdempotencyStore:
+    """Interface d’un stockage de clés d’idempotence."""
+
+    def begin(
+        self,
+        key: str,
+        fingerprint: str,
+        wait: float
+    ) -> Optional[StoredResponse]:
+        """
+        Réserve la clé, ou retourne la réponse déjà enregistrée.
+
+        Retourne None si l’appelant détient désormais la clé et doit
+        exécuter la requête. Attend au plus ``wait`` secondes une requête
+        concurrente (IdempotencyPending au-delà) ; lève IdempotencyConflict
+        si la clé a servi pour une autre requête (``fingerprint``).
+        """
+        raise NotImplementedError
+
+    def complete(self, key: str, response: StoredResponse):
+        """Enregistre la réponse de la requête qui détient la clé."""
+        raise NotImplementedError
+
+    def release(self, key: str):
+        """Libère une clé réservée sans réponse (échec de la requête)."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du stockage."""
+        raise NotImplementedError
+
+
+class _Entry:
+    """Clé réservée ou terminée dans le stockage en mémoire."""
+
+    __slots__ = ("fingerprint", "response", "expires_at")
+
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.response = None
+        self.expires_at = expires_at
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Stockage en mémoire, borné en nombre de clés, avec TTL.
+
+    Une clé réservée expire après ``pending_ttl`` secondes : une requête
+    interrompue ne bloque pas sa clé indéfiniment.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 86_400.0,
+        max_entries: int = 100_000,
+        pending_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pending_ttl = pending_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._changed = threading.Condition()
+        self.replays = 0
+        self.waits = 0
+
+    def begin(self, key, fingerprint, wait):
+        deadline = self._clock() + wait
+        with self._changed:
+            while True:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at <= self._clock():
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    self._entries[key] = _Entry(
+                        fingerprint, self._clock() + self.pending_ttl
+                    )
+                    self._evict()
+                    return None
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyConflict(key)
+                if entry.response is not None:
+                    self.replays += 1
+                    return entry.response
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    raise IdempotencyPending(key)
+                self.waits += 1
+                self._changed.wait(min(remaining, entry.expires_at
+                                       - self._clock()))
+
+    def complete(self, key, response):
+        with self._changed:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.response = response
+                entry.expires_at = self._clock() + self.ttl
+                self._entries.move_to_end(key)
+            self._changed.notify_all()
+
+    def release(self, key):
+        with self._changed:
+            entry = self._entries.get(key)
+            if entry is not None and entry.response is None:
+                del self._entries[key]
+            self._changed.notify_all()
+
+    def _evict(self):
+        """Retire les clés les plus anciennes au-delà de la taille max."""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._changed:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "replays": self.replays,
+                "waits": self.waits,
+            }
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Stockage partagé dans un fichier SQLite, commun aux workers d’un hôte.
+
+    Une clé réservée a un statut NULL jusqu’à l’enregistrement de sa
+    réponse ; les workers concurrents interrogent la ligne jusqu’à ce
+    qu’elle soit terminée, libérée ou expirée.
+    """
+
+    POLL_INTERVAL = 0.01
+    CLEANUP_EVERY = 100
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 86_400.0,
+        max_entries: int = 100_000,
+        pending_ttl: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """Ouvre (ou crée) le stockage partagé dans ``path``."""
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pending_ttl = pending_ttl
+        self._clock = clock
+        self._connections = SQLiteConnections(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.replays = 0
+        self.waits = 0
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status INTEGER,
+                body BLOB,
+                etag TEXT,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at
+                ON idempotency_keys (expires_at);
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (ouverte à la demande)."""
+        return self._connections.get()
+
+    def _try_begin(self, key, fingerprint):
+        """
+        Une tentative de réservation : retourne (réservée, réponse).
+
+        La réponse est None tant que la clé est détenue par une autre
+        requête.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = self._clock()
+            row = conn.execute(
+                "SELECT fingerprint, status, body, etag FROM idempotency_keys "
+                "WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency_keys "
+                    "(key, fingerprint, expires_at) VALUES (?, ?, ?)",
+                    (key, fingerprint, now + self.pending_ttl)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return True, None
+        if row[0] != fingerprint:
+            raise IdempotencyConflict(key)
+        if row[1] is None:
+            return False, None
+        return False, StoredResponse(row[1], bytes(row[2]), row[3])
+
+    def begin(self, key, fingerprint, wait):
+        deadline = self._clock() + wait
+        waited = False
+        while True:
+            reserved, response = self._try_begin(key, fingerprint)
+            if reserved:
+                return None
+            if response is not None:
+                with self._lock:
+                    self.replays += 1
+                return response
+            if self._clock() >= deadline:
+                raise IdempotencyPending(key)
+            if not waited:
+                waited = True
+                with self._lock:
+                    self.waits += 1
+            time.sleep(self.POLL_INTERVAL)
+
+    def complete(self, key, response):
+        self._connection().execute(
+            "UPDATE idempotency_keys SET status = ?, body = ?, etag = ?, "
+            "expires_at = ? WHERE key = ? AND status IS NULL",
+            (response.status, response.body, response.etag,
+             self._clock() + self.ttl, key)
+        )
+        with self._lock:
+            self._writes += 1
+            cleanup = self._writes % self.CLEANUP_EVERY == 0
+        if cleanup:
+            self.cleanup()
+
+    def release(self, key):
+        self._connection().execute(
+            "DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL",
+            (key,)
+        )
+
+    def cleanup(self):
+        """Supprime les clés expirées puis les plus anciennes en excès."""
+        conn = self._connection()
+        conn.execute(
+            "DELETE FROM idempotency_keys WHERE expires_at <= ?",
+            (self._clock(),)
+        )
+        conn.execute(
+            "DELETE FROM idempotency_keys WHERE key IN ("
+            "SELECT key FROM idempotency_keys "
+            "ORDER BY expires_at DESC, rowid DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def stats(self):
+        entries = self._connection().execute(
+            "SELECT count(*) FROM idempotency_keys"
+        ).fetchone()[0]
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "entries": entries,
+                "replays": self.replays,
+                "waits": self.waits,
+            }
+
+
+def create_idempotency_store(
+    kind: str,
+    ttl: float,
+    max_entries: int,
+    path: Optional[str] = None
+) -> IdempotencyStore:
+    """Construit le stockage demandé (``memory`` ou ``sqlite``)."""
+    if kind == "memory":
+        return MemoryIdempotencyStore(ttl, max_entries)
+    if kind == "sqlite":
+        return SQLiteIdempotencyStore(
+            path or "./idempotency.db", ttl, max_entries
+        )
+    raise ValueError(f"Stockage d’idempotence inconnu : {kind}")
@@ -0,0 +1,126 @@
+"""
+Commandes d’administration de la base client.
+
+Usage : python manage.py rebuild-search
+        python manage.py reconcile-stats
+        python manage.py seed-clients --count 1000000 --seed 42
+
+La base visée est celle de DATABASE_URL, comme pour l’application.
+"""
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import func, select
+
+import datagen
+from app import (
+    CLIENT_SEARCH_TABLE, engine, install_client_search, reconcile_client_stats,
+    sql
+)
+
+
+def rebuild_search(args):
+    """Crée si besoin l’index plein texte et le réindexe entièrement."""
+    install_client_search(engine, rebuild=True)
+    with engine.connect() as conn:
+        indexed = conn.scalar(
+            select(func.count()).select_from(sql.table(CLIENT_SEARCH_TABLE))
+        )
+    print(f"Index de recherche reconstruit : {indexed} clients")
+
+
+def reconcile_stats(args):
+    """Recalcule les compteurs de statistiques et affiche leur dérive."""
+    drift = reconcile_client_stats(engine)
+    for gap in drift:
+        print(
+            f"{gap['dimension']}={gap['value']!r} : "
+            f"{gap['stored']} -> {gap['actual']}"
+        )
+    print(f"Statistiques réconciliées : {len(drift)} écart(s)")
+    return 1 if drift and args.fail_on_drift else 0
+
+
+def seed_clients(args):
+    """Charge des clients synthétiques déterministes."""
+    distribution = datagen.ClientDistribution(
+        newsletter=args.newsletter_rate,
+        email=args.email_rate,
+        tel=args.tel_rate,
+        complement_adresse=args.complement_rate,
+        name_skew=args.name_skew
+    )
+    start = time.perf_counter()
+    loaded = len(datagen.seed_clients(
+        engine, args.count, args.seed, distribution=distribution,
+        replace=args.replace, batch_size=args.batch_size
+    ))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{loaded} clients chargés en {elapsed:.1f} s "
+        f"({loaded / elapsed:.0f} lignes/s)"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit l’analyseur des sous-commandes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "rebuild-search",
+        help="(re)construit l’index FTS5 à partir de t_client"
+    )
+    command.set_defaults(handler=rebuild_search)
+
+    command = commands.add_parser(
+        "reconcile-stats",
+        help="recalcule les compteurs de /stats et signale leur dérive"
+    )
+    command.add_argument(
+        "--fail-on-drift", action="store_true",
+        help="code de sortie 1 si un écart est constaté (supervision)"
+    )
+    command.set_defaults(handler=reconcile_stats)
+
+    command = commands.add_parser(
+        "seed-clients",
+        help="charge des clients synthétiques déterministes dans t_client"
+    )
+    command.add_argument("--count", type=int, required=True)
+    command.add_argument("--seed", type=int, default=0)
+    command.add_argument(
+        "--replace", action="store_true",
+        help="recrée les tables avant le chargement (sinon : ajout)"
+    )
+    command.add_argument(
+        "--batch-size", type=int, default=datagen.DEFAULT_BATCH_SIZE,
+        help="lignes par executemany"
+    )
+    defaults = datagen.ClientDistribution()
+    for option, field, description in (
+        ("--newsletter-rate", "newsletter", "part des abonnés"),
+        ("--email-rate", "email", "part des e-mails renseignés"),
+        ("--tel-rate", "tel", "part des téléphones renseignés"),
+        ("--complement-rate", "complement_adresse",
+         "part des compléments d’adresse renseignés"),
+        ("--name-skew", "name_skew",
+         "exposant de Zipf des noms (0 : uniforme)"),
+    ):
+        command.add_argument(
+            option, type=float, default=getattr(defaults, field),
+            help=description
+        )
+    command.set_defaults(handler=seed_clients)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Métriques de l’API au format d’exposition texte de Prometheus.
+
+- ``MetricsMiddleware`` compte les requêtes HTTP par route (gabarit de
+  chemin, pas l’URL), méthode et statut, mesure leur durée dans un
+  histogramme et suit les requêtes en cours ;
+- ``install_statement_metrics`` mesure chaque requête SQL d’un moteur
+  (événements ``before/after_cursor_execute``), par type d’instruction ;
+- ``TimedQueuePool`` mesure l’attente d’une connexion dans le pool ;
+- les limites d’admission passées au rendu exposent leur charge et leurs
+  refus (``admission_*``, par limite).
+
+Les histogrammes ont des seuils fixes et leurs compteurs sont alloués à
+la création : une observation ne fait qu’incrémenter des entiers.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Seuils des histogrammes, en secondes
+REQUEST_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0
+)
+STATEMENT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 1.0
+)
+POOL_WAIT_BUCKETS = (
+    0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0
+)
+
+# Types d’instruction SQL suivis (les autres sont comptés sous OTHER)
+STATEMENT_OPERATIONS = frozenset((
+    "SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "BEGIN",
+    "COMMIT", "ROLLBACK", "CREATE", "DROP", "ALTER"
+))
+
+# Route des requêtes qui n’ont atteint aucune route (404, refus 503...)
+UNROUTED = "<unrouted>"
+
+
+class Histogram:
+    """Histogramme cumulatif à seuils fixes."""
+
+    __slots__ = ("bounds", "counts", "total", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Enregistre une observation."""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[list, float, int]:
+        """Retourne les compteurs cumulés par seuil, la somme et le total."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.total, self.count
+        cumulative, running = [], 0
+        for value in counts[:-1]:
+            running += value
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` qui mesure l’attente de chaque emprunt de connexion."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait = Histogram(POOL_WAIT_BUCKETS)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait.observe(time.perf_counter() - start)
+
+
+def _labels(**labels) -> str:
+    """Formate des étiquettes Prometheus (valeurs échappées)."""
+    return ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in labels.items()
+    )
+
+
+def _render_histogram(lines: list, name: str, labels: str, hist: Histogram):
+    """Ajoute les séries d’un histogramme (buckets, somme, total)."""
+    cumulative, total, count = hist.snapshot()
+    prefix = labels + "," if labels else ""
+    for bound, value in zip(hist.bounds, cumulative):
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {value}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {count}')
+    suffix = "{" + labels + "}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {total}")
+    lines.append(f"{name}_count{suffix} {count}")
+
+
+class _RouteSeries:
+    """Compteurs d’une route pour une méthode."""
+
+    __slots__ = ("statuses", "duration")
+
+    def __init__(self):
+        self.statuses = {}
+        self.duration = Histogram(REQUEST_BUCKETS)
+
+
+class Metrics:
+    """Registre des métriques HTTP et SQL d’un processus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._in_flight = {}
+        self._statements = {
+            operation: Histogram(STATEMENT_BUCKETS)
+            for operation in STATEMENT_OPERATIONS | {"OTHER"}
+        }
+
+    def register_routes(self, routes: Iterable, prefix: str):
+        """
+        Crée d’avance les séries des routes dont le chemin commence par
+        ``prefix``.
+        """
+        for route in routes:
+            path = getattr(route, "path", "")
+            if not path.startswith(prefix):
+                continue
+            for method in getattr(route, "methods", None) or ():
+                self._series(method, path)
+
+    def _series(self, method: str, route: str) -> _RouteSeries:
+        """Retourne (en la créant au besoin) la série d’une route."""
+        key = (method, route)
+        series = self._routes.get(key)
+        if series is None:
+            with self._lock:
+                series = self._routes.setdefault(key, _RouteSeries())
+                self._in_flight.setdefault(method, 0)
+        return series
+
+    def request_started(self, method: str):
+        """Compte une requête en cours."""
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def request_finished(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        duration: float
+    ):
+        """Enregistre une requête terminée."""
+        series = self._series(method, route)
+        series.duration.observe(duration)
+        with self._lock:
+            self._in_flight[method] -= 1
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def observe_statement(self, statement: str, duration: float):
+        """Enregistre la durée d’une requête SQL selon son type."""
+        operation = statement.lstrip()[:8].split(None, 1)
+        operation = operation[0].upper() if operation else "OTHER"
+        histogram = self._statements.get(operation)
+        if histogram is None:
+            histogram = self._statements["OTHER"]
+        histogram.observe(duration)
+
+    def render(
+        self,
+        pools: Iterable[Tuple[str, object]] = (),
+        limiters: Iterable[Tuple[str, object]] = ()
+    ) -> str:
+        """
+        Retourne toutes les métriques au format texte Prometheus, avec les
+        jauges des pools et les compteurs des limites d’admission.
+        """
+        with self._lock:
+            routes = sorted(self._routes.items())
+            statuses = {
+                key: sorted(series.statuses.items()) for key, series in routes
+            }
+            in_flight = sorted(self._in_flight.items())
+
+        lines = [
+            "# HELP http_requests_total Requêtes HTTP traitées.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), _ in routes:
+            for status, count in statuses[(method, route)]:
+                labels = _labels(method=method, route=route, status=status)
+                lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Durée des requêtes HTTP.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), series in routes:
+            _render_histogram(
+                lines, "http_request_duration_seconds",
+                _labels(method=method, route=route), series.duration
+            )
+
+        lines += [
+            "# HELP http_requests_in_flight Requêtes HTTP en cours.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for method, count in in_flight:
+            lines.append(
+                f"http_requests_in_flight{{{_labels(method=method)}}} {count}"
+            )
+
+        lines += [
+            "# HELP db_statement_duration_seconds Durée des requêtes SQL.",
+            "# TYPE db_statement_duration_seconds histogram",
+        ]
+        for operation, histogram in sorted(self._statements.items()):
+            _render_histogram(
+                lines, "db_statement_duration_seconds",
+                _labels(operation=operation), histogram
+            )
+
+        for name, pool in pools:
+            _render_pool(lines, name, pool)
+        _render_admission(lines, limiters)
+        return "\n".join(lines) + "\n"
+
+
+# Jauges du pool : (métrique, méthode du pool, description)
+POOL_GAUGES = (
+    ("db_pool_size", "size", "Taille du pool de connexions."),
+    ("db_pool_checked_out", "checkedout", "Connexions empruntées."),
+    ("db_pool_checked_in", "checkedin", "Connexions libres dans le pool."),
+    ("db_pool_overflow", "overflow", "Connexions ouvertes au-delà de la "
+                                     "taille du pool (négatif : places "
+                                     "encore libres)."),
+)
+
+
+def _render_pool(lines: list, name: str, pool):
+    """Ajoute les jauges d’un pool et l’histogramme de son attente."""
+    labels = _labels(pool=name)
+    for metric, method, description in POOL_GAUGES:
+        if hasattr(pool, method):
+            lines += [
+                f"# HELP {metric} {description}",
+                f"# TYPE {metric} gauge",
+                f"{metric}{{{labels}}} {getattr(pool, method)()}",
+            ]
+    wait = getattr(pool, "wait", None)
+    if wait is not None:
+        lines += [
+            "# HELP db_pool_wait_seconds Attente d’une connexion du pool.",
+            "# TYPE db_pool_wait_seconds histogram",
+        ]
+        _render_histogram(lines, "db_pool_wait_seconds", labels, wait)
+
+
+# Métriques d’admission : (métrique, clé de stats(), type, description)
+ADMISSION_METRICS = (
+    ("admission_concurrency_limit", "max_concurrent", "gauge",
+     "Requêtes admises simultanément au plus."),
+    ("admission_queue_limit", "max_queue", "gauge",
+     "Requêtes en attente au plus."),
+    ("admission_active", "active", "gauge", "Requêtes admises en cours."),
+    ("admission_queue_depth", "queue_depth", "gauge",
+     "Requêtes en attente d’admission."),
+    ("admission_max_queue_depth", "max_queue_depth", "gauge",
+     "Plus longue file d’attente observée."),
+    ("admission_admitted_total", "admitted", "counter", "Requêtes admises."),
+    ("admission_queued_total", "queued", "counter",
+     "Requêtes passées par la file d’attente."),
+    ("admission_rejected_total", "rejected", "counter",
+     "Requêtes refusées en 503 (file pleine ou délai dépassé)."),
+    ("admission_timeouts_total", "timeouts", "counter",
+     "Requêtes refusées après le délai d’attente."),
+    ("admission_queue_wait_seconds_total", "queue_wait_seconds", "counter",
+     "Temps cumulé passé dans la file d’attente."),
+)
+
+
+def _render_admission(lines: list, limiters: Iterable[Tuple[str, object]]):
+    """Ajoute les jauges et compteurs des limites d’admission."""
+    stats = [(name, limiter.stats()) for name, limiter in limiters]
+    if not stats:
+        return
+    for metric, key, kind, description in ADMISSION_METRICS:
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        lines += [
+            f"{metric}{{{_labels(limiter=name)}}} {values[key]}"
+            for name, values in stats
+        ]
+
+
+def install_statement_metrics(sync_engine: Engine, metrics: Metrics):
+    """
+    Mesure chaque requête SQL exécutée par le moteur.
+
+    Le départ est rangé sur le contexte d’exécution, propre à
+    l’instruction : une requête en échec ne laisse rien sur la connexion.
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context,
+                    executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context,
+                   executemany):
+        metrics.observe_statement(
+            statement, time.perf_counter() - context._metrics_start
+        )
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mesurant les requêtes dont le chemin commence par
+    ``prefix``.
+
+    La route est le gabarit choisi par le routeur (ex.
+    ``/api/v1/client/{client_id}``) : le nombre de séries reste borné.
+    """
+
+    def __init__(self, app, metrics: Metrics, prefix: str = ""):
+        self.app = app
+        self.metrics = metrics
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        self.metrics.request_started(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.metrics.request_finished(
+                method,
+                getattr(route, "path", UNROUTED),
+                status,
+                time.perf_counter() - start
+            )
@@ -0,0 +1,275 @@
+"""
+Profilage par échantillonnage du processus en production.
+
+Un ``SamplingProfiler`` relève à intervalle régulier la pile d’appels de
+tous les threads (``sys._current_frames``) depuis un thread dédié, sans
+instrumenter le code profilé. Le résultat est au format « collapsed
+stacks » (une ligne ``thread;appelant;...;appelé N`` par pile), lisible
+par flamegraph.pl, speedscope ou inferno.
+
+- ``ProfilingMiddleware`` profile une requête ciblée (en-tête
+  ``X-Profile``) et range son profil dans un ``ProfileStore`` ;
+- ``install_signal_handler`` déclenche un profil écrit sur disque à la
+  réception d’un signal (ex. ``kill -USR2 <pid>``).
+
+Au repos, aucun thread ne tourne et aucun hook n’est installé : le coût
+se limite à la lecture de l’en-tête par le middleware.
+"""
+
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Profondeur maximale d’une pile relevée
+MAX_STACK_DEPTH = 128
+
+# Fonctions dans lesquelles un thread attend sans travailler (fichier,
+# nom court : ``co_qualname`` n’existe qu’à partir de Python 3.11) : ses
+# piles sont ignorées sauf demande explicite
+IDLE_FUNCTIONS = frozenset((
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+))
+
+
+class ProfilerBusy(Exception):
+    """Un profilage est déjà en cours dans le processus."""
+
+
+def token_matches(expected: str, supplied: Optional[str]) -> bool:
+    """Compare un jeton d’administration en temps constant."""
+    return bool(expected) and supplied is not None and hmac.compare_digest(
+        expected.encode(), supplied.encode()
+    )
+
+
+def _frame_label(code) -> str:
+    """Nom d’une fonction dans une pile : ``nom (fichier:ligne)``."""
+    return (
+        f"{getattr(code, 'co_qualname', code.co_name)} "
+        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def collapse_stack(frame, include_idle: bool = False) -> Optional[str]:
+    """
+    Retourne la pile d’un thread, de la racine à la fonction en cours,
+    ou None si le thread attend et que ``include_idle`` est faux.
+    """
+    code = frame.f_code
+    if not include_idle and (
+        (os.path.basename(code.co_filename), code.co_name)
+        in IDLE_FUNCTIONS
+    ):
+        return None
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def render_collapsed(counts: Counter) -> str:
+    """Formate des piles comptées au format « collapsed stacks »."""
+    return "".join(
+        f"{stack} {count}\n" for stack, count in sorted(counts.items())
+    )
+
+
+class ProfileSession:
+    """Échantillonnage en cours, dans un thread dédié."""
+
+    def __init__(self, profiler: "SamplingProfiler", include_idle: bool):
+        self.counts = Counter()
+        self.samples = 0
+        self._profiler = profiler
+        self._include_idle = include_idle
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            names = {thread.ident: thread.name for thread in
+                     threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = collapse_stack(frame, self._include_idle)
+                if stack is not None:
+                    self.counts[f"{names.get(ident, ident)};{stack}"] += 1
+            self.samples += 1
+            if self._stop.wait(self._profiler.interval):
+                return
+
+    def stop(self) -> Counter:
+        """Arrête l’échantillonnage et retourne les piles comptées."""
+        self._stop.set()
+        self._thread.join()
+        self._profiler._finished(self)
+        return self.counts
+
+
+class SamplingProfiler:
+    """
+    Profileur par échantillonnage de tous les threads du processus.
+
+    Une seule session à la fois : une seconde demande lève
+    ``ProfilerBusy``.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active = None
+
+    def start(self, include_idle: bool = False) -> ProfileSession:
+        """Démarre une session d’échantillonnage."""
+        with self._lock:
+            if self._active is not None:
+                raise ProfilerBusy()
+            session = self._active = ProfileSession(self, include_idle)
+        session._thread.start()
+        return session
+
+    def _finished(self, session: ProfileSession):
+        with self._lock:
+            if self._active is session:
+                self._active = None
+
+    def profile(self, seconds: float, include_idle: bool = False) -> Counter:
+        """Échantillonne pendant ``seconds`` secondes (appel bloquant)."""
+        session = self.start(include_idle)
+        try:
+            time.sleep(seconds)
+        finally:
+            counts = session.stop()
+        return counts
+
+    @property
+    def active(self) -> bool:
+        """Indique si une session est en cours."""
+        return self._active is not None
+
+
+class ProfileStore:
+    """Derniers profils de requêtes ciblées, par identifiant."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profile_id: str, collapsed: str):
+        """Enregistre un profil, en évinçant le plus ancien si plein."""
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Retourne un profil, ou None s’il est inconnu ou évincé."""
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI profilant les requêtes qui portent l’en-tête
+    ``X-Profile`` avec le jeton d’administration.
+
+    La réponse indique l’identifiant du profil (``X-Profile-Id``), lisible
+    une fois la requête terminée. Les piles relevées sont celles des
+    threads actifs pendant la requête : pour isoler une requête, la
+    cibler quand le processus est peu chargé.
+    """
+
+    def __init__(
+        self,
+        app,
+        profiler: SamplingProfiler,
+        store: ProfileStore,
+        token: str
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.store = store
+        self.token = token
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return token_matches(self.token, value.decode("latin-1"))
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            session = self.profiler.start()
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
+            return
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            self.store.put(profile_id, render_collapsed(session.stop()))
+
+
+def install_signal_handler(
+    profiler: SamplingProfiler,
+    signum: int,
+    seconds: float,
+    directory: str
+):
+    """
+    À la réception de ``signum``, profile le processus pendant
+    ``seconds`` secondes et écrit le résultat dans ``directory``.
+    """
+    def write_profile():
+        try:
+            counts = profiler.profile(seconds)
+        except ProfilerBusy:
+            logger.warning("Profilage déjà en cours : signal ignoré")
+            return
+        path = os.path.join(
+            directory,
+            f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+            ".collapsed"
+        )
+        # Écriture puis renommage : le fichier n’apparaît que complet
+        with open(path + ".tmp", "w", encoding="utf-8") as output:
+            output.write(render_collapsed(counts))
+        os.replace(path + ".tmp", path)
+        logger.warning("Profil écrit dans %s", path)
+
+    def handler(received, frame):
+        threading.Thread(
+            target=write_profile, name="sampling-profiler-signal",
+            daemon=True
+        ).start()
+
+    signal.signal(signum, handler)
@@ -0,0 +1,165 @@
+"""
+Instrumentation SQL par requête HTTP.
+
+- ``QueryTrackingMiddleware`` compte les instructions SQL et le temps
+  passé en base pendant chaque requête ; en mode debug, il les renvoie
+  dans les en-têtes ``X-DB-Queries`` et ``Server-Timing`` ;
+- ``install_query_log`` branche le comptage sur un moteur et journalise
+  toute instruction plus lente qu’un seuil, avec son plan d’exécution
+  (``EXPLAIN QUERY PLAN`` sous SQLite) ;
+- ``count_queries`` enregistre les instructions exécutées dans un bloc
+  (tests de budget SQL par endpoint).
+
+Le compteur de la requête passe par une ContextVar : il suit la requête
+dans les threads du pool où s’exécutent les routes synchrones. Les
+écritures regroupées, exécutées par le thread du WriteBatcher, ne sont
+pas comptées dans la requête qui les a soumises.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Instructions dont le plan d’exécution est journalisé
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+class QueryStats:
+    """Instructions SQL et temps passé en base d’une requête."""
+
+    __slots__ = ("label", "count", "duration")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def explain_query_plan(conn, statement, parameters, executemany) -> List[str]:
+    """
+    Retourne le plan d’exécution d’une instruction (SQLite seulement).
+
+    Le plan est lu sur un curseur distinct de la même connexion, sans
+    passer par les événements du moteur.
+    """
+    if conn.dialect.name != "sqlite":
+        return []
+    if not statement.lstrip()[:6].upper().startswith(EXPLAINABLE):
+        return []
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    cursor = conn.connection.cursor()
+    try:
+        rows = cursor.execute(
+            "EXPLAIN QUERY PLAN " + statement, parameters or ()
+        ).fetchall()
+    except Exception:
+        return []
+    finally:
+        cursor.close()
+    return [row[-1] for row in rows]
+
+
+def install_query_log(
+    sync_engine: Engine,
+    slow_threshold: float = 0.0,
+    slow_logger: logging.Logger = logger
+):
+    """
+    Compte les instructions du moteur dans la requête en cours et
+    journalise celles qui durent au moins ``slow_threshold`` secondes
+    (0 : pas de journal).
+
+    Le départ est rangé sur le contexte d’exécution de l’instruction :
+    une requête en échec ne laisse rien sur la connexion.
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context,
+                    executemany):
+        context._querylog_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context,
+                   executemany):
+        duration = time.perf_counter() - context._querylog_start
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += duration
+        if slow_threshold and duration >= slow_threshold:
+            plan = explain_query_plan(
+                conn, statement, parameters, executemany
+            )
+            slow_logger.warning(
+                "Requête SQL lente (%.1f ms)%s : %s\nPlan : %s",
+                duration * 1000,
+                f" pendant {stats.label}" if stats is not None else "",
+                statement,
+                " | ".join(plan) or "indisponible"
+            )
+
+
+class QueryTrackingMiddleware:
+    """
+    Middleware ASGI ouvrant un compteur SQL par requête HTTP.
+
+    Avec ``debug``, la réponse porte ``X-DB-Queries`` (nombre
+    d’instructions) et ``Server-Timing`` (temps passé en base, en ms).
+    """
+
+    def __init__(self, app, debug: bool = False):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = current_query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"server-timing",
+                     f"db;dur={stats.duration * 1000:.3f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(
+                scope, receive, send_with_headers if self.debug else send
+            )
+        finally:
+            current_query_stats.reset(token)
+
+
+@contextmanager
+def count_queries(sync_engine: Engine) -> Iterator[List[str]]:
+    """Enregistre les instructions exécutées par le moteur dans le bloc."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(
+            sync_engine, "before_cursor_execute", before_cursor_execute
+        )
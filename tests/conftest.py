@@ -0,0 +1,86 @@
+# ============================================
+# ./tests/conftest.py
+# ============================================
+
+import os
+import tempfile
+
+# Les tests travaillent sur une base temporaire plutôt que sur ./test.db :
+# la variable doit être posée avant le premier import de app.
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}"
+)
+# Le cache des lectures, désactivé par défaut, est testé activé
+os.environ.setdefault("CLIENT_CACHE_MAX_ENTRIES", "10000")
+
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    """Vide le cache des lectures : les tests recréent la base entre eux."""
+    from app import client_cache
+    if client_cache is not None:
+        client_cache.clear()
+    yield
+
+
+@pytest.fixture
+def max_queries():
+    """
+    Vérifie qu’un bloc exécute au plus ``maximum`` instructions SQL :
+
+        with max_queries(1):
+            client.delete(f"/api/v1/client/{cid}")
+
+    Le bloc reçoit la liste des instructions exécutées.
+    """
+    from app import engine
+    from querylog import count_queries
+
+    @contextmanager
+    def check(maximum):
+        with count_queries(engine) as executed:
+            yield executed
+        assert len(executed) <= maximum, (
+            f"{len(executed)} instructions SQL (maximum {maximum}) :\n"
+            + "\n".join(executed)
+        )
+
+    return check
+
+
+@pytest.fixture
+def query_engine():
+    """Moteur observé par ``statements`` (redéfini par certains modules)."""
+    from app import engine
+    return engine
+
+
+@pytest.fixture
+def statements(query_engine):
+    """Enregistre les instructions SQL exécutées pendant le test."""
+    from querylog import count_queries
+
+    with count_queries(query_engine) as executed:
+        yield executed
+
+
+@pytest.fixture
+def generated_clients():
+    """
+    Charge des clients synthétiques déterministes dans la base de test et
+    retourne leurs codcli :
+
+        ids = generated_clients(500, seed=1)
+    """
+    from app import engine
+    from datagen import seed_clients
+
+    def load(count, seed=0, **options):
+        return seed_clients(engine, count, seed, **options)
+
+    return load
@@ -0,0 +1,224 @@
+# ============================================
+# ./tests/test_admission.py
+# ============================================
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as module_app
+from app import app, Base, engine, ClientRepository
+from admission import AdmissionLimiter
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(module_app, "client_cache", None)
+    monkeypatch.setattr(module_app, "client_reads", None)
+    return TestClient(app)
+
+
+def limiter_lectures(monkeypatch, max_concurrent, max_queue, timeout=5.0):
+    limiter = AdmissionLimiter("read", max_concurrent, max_queue, timeout)
+    monkeypatch.setattr(module_app, "read_admission", limiter)
+    return limiter
+
+
+def creer_client(client):
+    return client.post("/api/v1/client/", json={
+        "nom": "Dupont", "prenom": "Jean", "adresse": "1 rue de Paris"
+    }).json()["codcli"]
+
+
+def ralentir_lectures(monkeypatch, duree=0.2):
+    originale = ClientRepository.get_client_by_id
+
+    def lente(self, client_id):
+        threading.Event().wait(duree)
+        return originale(self, client_id)
+
+    monkeypatch.setattr(ClientRepository, "get_client_by_id", lente)
+
+
+def en_rafale(fonction, nombre):
+    depart = threading.Barrier(nombre)
+
+    def appeler(_):
+        depart.wait()
+        return fonction()
+
+    with ThreadPoolExecutor(max_workers=nombre) as pool:
+        return list(pool.map(appeler, range(nombre)))
+
+
+# --------------------------------------------------------------------
+# LIMITE
+# --------------------------------------------------------------------
+
+def test_concurrence_bornee():
+    limiter = AdmissionLimiter("test", 2, 10)
+    actives, maximum = [0], [0]
+
+    async def requete():
+        assert await limiter.acquire()
+        actives[0] += 1
+        maximum[0] = max(maximum[0], actives[0])
+        await asyncio.sleep(0.01)
+        actives[0] -= 1
+        limiter.release()
+
+    async def scenario():
+        await asyncio.gather(*(requete() for _ in range(8)))
+
+    asyncio.run(scenario())
+    assert maximum[0] == 2
+    stats = limiter.stats()
+    assert stats["admitted"] == 8 and stats["active"] == 0
+    assert stats["max_queue_depth"] == 6
+
+
+def test_file_pleine_refusee():
+    limiter = AdmissionLimiter("test", 1, 1)
+
+    async def scenario():
+        assert await limiter.acquire()
+        en_attente = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await en_attente
+        limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter.stats()["rejected"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+def test_delai_d_attente_depasse():
+    limiter = AdmissionLimiter("test", 1, 5, queue_timeout=0.05)
+
+    async def scenario():
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        limiter.release()
+        assert await limiter.acquire()
+
+    asyncio.run(scenario())
+    stats = limiter.stats()
+    assert stats["timeouts"] == 1 and stats["queue_depth"] == 0
+
+
+def test_ordre_d_arrivee():
+    limiter = AdmissionLimiter("test", 1, 5)
+    ordre = []
+
+    async def requete(i):
+        await limiter.acquire()
+        ordre.append(i)
+        await asyncio.sleep(0.001)
+        limiter.release()
+
+    async def scenario():
+        await limiter.acquire()
+        taches = [asyncio.ensure_future(requete(i)) for i in range(4)]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*taches)
+
+    asyncio.run(scenario())
+    assert ordre == [0, 1, 2, 3]
+
+
+def test_annulation_en_attente():
+    limiter = AdmissionLimiter("test", 1, 5)
+
+    async def scenario():
+        await limiter.acquire()
+        tache = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        tache.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tache
+        limiter.release()
+
+    asyncio.run(scenario())
+    stats = limiter.stats()
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+# --------------------------------------------------------------------
+# ROUTES CLIENT
+# --------------------------------------------------------------------
+
+def test_surcharge_refusee_en_503(client, monkeypatch):
+    cid = creer_client(client)
+    limiter = limiter_lectures(monkeypatch, 1, 0)
+    ralentir_lectures(monkeypatch)
+
+    reponses = en_rafale(lambda: client.get(f"/api/v1/client/{cid}"), 4)
+
+    statuts = sorted(r.status_code for r in reponses)
+    assert statuts == [200, 503, 503, 503]
+    refus = [r for r in reponses if r.status_code == 503]
+    assert all(r.headers["Retry-After"] == "1" for r in refus)
+    assert refus[0].json()["detail"]
+    assert limiter.stats()["rejected"] == 3
+    assert limiter.stats()["active"] == 0
+
+
+def test_file_d_attente_absorbe_la_rafale(client, monkeypatch):
+    cid = creer_client(client)
+    limiter = limiter_lectures(monkeypatch, 2, 8)
+    ralentir_lectures(monkeypatch, 0.05)
+
+    reponses = en_rafale(lambda: client.get(f"/api/v1/client/{cid}"), 6)
+
+    assert all(r.status_code == 200 for r in reponses)
+    stats = limiter.stats()
+    assert stats["admitted"] == 6 and stats["rejected"] == 0
+    assert stats["max_queue_depth"] >= 1
+
+
+def test_ecritures_hors_budget_des_lectures(client, monkeypatch):
+    cid = creer_client(client)
+    limiter_lectures(monkeypatch, 1, 0)
+    ralentir_lectures(monkeypatch, 0.3)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        lecture = pool.submit(client.get, f"/api/v1/client/{cid}")
+        threading.Event().wait(0.1)
+        response = client.patch(
+            f"/api/v1/client/{cid}", json={"nom": "Martin"}
+        )
+        assert response.status_code == 200
+        assert client.get(f"/api/v1/client/{cid}").status_code == 503
+        assert lecture.result().status_code == 200
+
+
+def test_routes_hors_client_non_limitees(client, monkeypatch):
+    limiter = limiter_lectures(monkeypatch, 1, 0)
+    assert client.get("/").status_code == 200
+    assert client.get("/api/v1/admin/admission").status_code == 200
+    assert limiter.stats()["admitted"] == 0
+
+
+def test_statistiques(client, monkeypatch):
+    limiter_lectures(monkeypatch, 4, 16)
+    client.get("/api/v1/client/")
+    stats = client.get("/api/v1/admin/admission").json()
+    assert stats["write"] == {"enabled": False}
+    assert stats["read"]["enabled"]
+    assert stats["read"]["max_concurrent"] == 4
+    assert stats["read"]["admitted"] == 1
@@ -0,0 +1,146 @@
+# ============================================
+# ./tests/test_async.py
+# ============================================
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app as module_app
+from app import Base, engine, build_client_router, router
+from idempotency import MemoryIdempotencyStore
+
+pytest.importorskip("aiosqlite")
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    async_app = FastAPI()
+    async_app.include_router(build_client_router("async"))
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+# --------------------------------------------------------------------
+# MODE ASYNCHRONE
+# --------------------------------------------------------------------
+
+def test_crud_asynchrone(client):
+    created = client.post("/api/v1/client/", json={
+        "nom": "Async",
+        "prenom": "Test",
+        "adresse": "Adresse"
+    })
+    assert created.status_code == 200
+    cid = created.json()["codcli"]
+
+    response = client.get(f"/api/v1/client/{cid}")
+    assert response.json()["nom"] == "Async"
+
+    response = client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+    assert response.json()["nom"] == "Modif"
+
+    assert client.delete(f"/api/v1/client/{cid}").status_code == 200
+    assert client.get(f"/api/v1/client/{cid}").status_code == 404
+    assert client.delete(f"/api/v1/client/{cid}").status_code == 404
+
+
+def test_ecritures_conditionnelles_asynchrones(client):
+    cid = client.post("/api/v1/client/", json={
+        "nom": "Async", "prenom": "Test", "adresse": "Adresse"
+    }).json()["codcli"]
+    etag = client.get(f"/api/v1/client/{cid}").headers["ETag"]
+
+    response = client.patch(
+        f"/api/v1/client/{cid}", json={"nom": "Modif"},
+        headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    nouvel_etag = response.headers["ETag"]
+    assert nouvel_etag != etag
+
+    # L’ancien ETag est périmé : ni modification ni suppression
+    assert client.patch(
+        f"/api/v1/client/{cid}", json={"nom": "Perdu"},
+        headers={"If-Match": etag}
+    ).status_code == 412
+    assert client.patch(
+        f"/api/v1/client/{cid}", json={}, headers={"If-Match": etag}
+    ).status_code == 412
+    assert client.delete(
+        f"/api/v1/client/{cid}", headers={"If-Match": etag}
+    ).status_code == 412
+    assert client.get(f"/api/v1/client/{cid}").json()["nom"] == "Modif"
+
+    assert client.delete(
+        f"/api/v1/client/{cid}", headers={"If-Match": nouvel_etag}
+    ).status_code == 200
+    assert client.delete(
+        f"/api/v1/client/{cid}", headers={"If-Match": nouvel_etag}
+    ).status_code == 404
+
+
+def test_creation_idempotente_asynchrone(client, monkeypatch):
+    monkeypatch.setattr(
+        module_app, "idempotency_store",
+        MemoryIdempotencyStore(ttl=60, max_entries=100)
+    )
+    donnees = {"nom": "Async", "prenom": "Test", "adresse": "Adresse"}
+    en_tete = {"Idempotency-Key": "creation-1"}
+
+    premiere = client.post("/api/v1/client/", json=donnees, headers=en_tete)
+    repetee = client.post("/api/v1/client/", json=donnees, headers=en_tete)
+    assert premiere.status_code == repetee.status_code == 200
+    assert repetee.json() == premiere.json()
+    assert repetee.headers["ETag"] == premiere.headers["ETag"]
+    assert len(client.get("/api/v1/client/").json()) == 1
+
+    assert client.post(
+        "/api/v1/client/", json=dict(donnees, nom="Autre"), headers=en_tete
+    ).status_code == 422
+
+
+def test_creation_sans_cle_hors_pool_de_threads(client, monkeypatch):
+    async def interdit(*args, **kwargs):
+        raise AssertionError("pool de threads sollicité")
+
+    monkeypatch.setattr(module_app, "run_in_threadpool", interdit)
+    response = client.post("/api/v1/client/", json={
+        "nom": "Async", "prenom": "Test", "adresse": "Adresse"
+    })
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+
+
+def test_pagination_asynchrone(client):
+    for i in range(3):
+        client.post("/api/v1/client/", json={
+            "nom": f"Nom{i}", "prenom": "P", "adresse": "A"
+        })
+
+    response = client.get("/api/v1/client/?limit=2")
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/v1/client/?cursor={cursor}")
+    assert [c["nom"] for c in response.json()] == ["Nom2"]
+
+
+def test_routes_synchrones_conservees(client):
+    # L’export reste servi par la route synchrone, avant /{client_id}
+    assert client.get("/api/v1/client/export").status_code == 200
+
+
+def test_mode_synchrone_et_inconnu():
+    assert build_client_router("sync") is router
+    with pytest.raises(ValueError):
+        build_client_router("threads")
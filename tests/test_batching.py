@@ -0,0 +1,186 @@
+# ============================================
+# ./tests/test_batching.py
+# ============================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import app as module_app
+from app import app, Base, engine, SessionLocal, ClientRepository
+from batching import WriteBatcher
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def writer():
+    batcher = WriteBatcher(
+        SessionLocal,
+        lambda session: ClientRepository(session, autocommit=False),
+        max_operations=8,
+        max_delay=0.05
+    )
+    yield batcher
+    batcher.close()
+
+
+@pytest.fixture
+def client(writer, monkeypatch):
+    monkeypatch.setattr(module_app, "client_writer", writer)
+    return TestClient(app)
+
+
+def nouveau_client(i):
+    return {
+        "nom": f"Nom{i}", "prenom": "Prenom", "genre": None,
+        "adresse": "Adresse", "complement_adresse": None,
+        "tel": None, "email": None, "newsletter": 0
+    }
+
+
+def soumettre_creation(writer, i):
+    return writer.submit(lambda repo: repo.create_client(nouveau_client(i)))
+
+
+def compter_clients():
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM t_client")).scalar()
+
+
+# --------------------------------------------------------------------
+# REGROUPEMENT
+# --------------------------------------------------------------------
+
+def test_ecritures_concurrentes_en_un_lot(writer):
+    depart = threading.Barrier(5)
+
+    def creer(i):
+        depart.wait()
+        return soumettre_creation(writer, i)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        clients = list(pool.map(creer, range(5)))
+
+    assert sorted(c.nom for c in clients) == [f"Nom{i}" for i in range(5)]
+    assert len({c.codcli for c in clients}) == 5
+    assert writer.stats()["operations"] == 5
+    assert writer.stats()["batches"] < 5
+
+
+def test_resultat_rendu_apres_validation(writer):
+    client = soumettre_creation(writer, 0)
+
+    # Visible depuis une autre connexion dès le retour de submit
+    assert compter_clients() == 1
+    assert client.codcli is not None
+
+
+def test_taille_maximale_du_lot(writer):
+    writer.max_operations = 2
+    depart = threading.Barrier(4)
+
+    def creer(i):
+        depart.wait()
+        return soumettre_creation(writer, i)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(creer, range(4)))
+    assert writer.stats()["batches"] >= 2
+
+
+def test_erreur_isolee_dans_le_lot(writer):
+    depart = threading.Barrier(3)
+
+    def ecrire(i):
+        depart.wait()
+        if i == 1:
+            return writer.submit(lambda repo: repo.db.execute(
+                text("INSERT INTO table_inconnue VALUES (1)")
+            ))
+        return soumettre_creation(writer, i)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(ecrire, i) for i in range(3)]
+
+    assert futures[0].result().nom == "Nom0"
+    assert futures[2].result().nom == "Nom2"
+    with pytest.raises(Exception, match="table_inconnue"):
+        futures[1].result()
+    assert compter_clients() == 2
+    assert writer.stats()["fallbacks"] >= 1
+
+
+def test_session_indisponible(writer):
+    def panne():
+        raise RuntimeError("base indisponible")
+
+    writer.session_factory = panne
+    with pytest.raises(RuntimeError, match="base indisponible"):
+        soumettre_creation(writer, 0)
+
+    # Le thread de validation sert toujours les écritures suivantes
+    writer.session_factory = SessionLocal
+    assert soumettre_creation(writer, 1).nom == "Nom1"
+
+
+def test_thread_arrete_relance(writer, monkeypatch):
+    def arret(self, batch):
+        raise SystemExit()
+
+    # Arrêt imprévu du thread pendant un lot
+    monkeypatch.setattr(WriteBatcher, "_flush", arret)
+    soumettre_creation(writer, 0)
+    writer._thread.join()
+
+    monkeypatch.undo()
+    assert soumettre_creation(writer, 1).nom == "Nom1"
+
+
+# --------------------------------------------------------------------
+# ENDPOINTS EN MODE REGROUPÉ
+# --------------------------------------------------------------------
+
+def test_crud_regroupe(client, writer):
+    created = client.post("/api/v1/client/", json=nouveau_client(0))
+    assert created.status_code == 200
+    cid = created.json()["codcli"]
+
+    response = client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+    assert response.json()["nom"] == "Modif"
+
+    response = client.patch(
+        f"/api/v1/client/{cid}", json={"nom": "Refus"},
+        headers={"If-Match": created.headers["ETag"]}
+    )
+    assert response.status_code == 412
+
+    assert client.delete(f"/api/v1/client/{cid}").status_code == 200
+    assert client.delete(f"/api/v1/client/{cid}").status_code == 404
+    assert writer.stats()["operations"] == 5
+
+    stats = client.get("/api/v1/admin/writes").json()
+    assert stats["enabled"] and stats["operations"] == 5
+
+
+def test_post_concurrents_regroupes(client, writer):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        reponses = list(pool.map(
+            lambda i: client.post("/api/v1/client/", json=nouveau_client(i)),
+            range(16)
+        ))
+
+    assert all(r.status_code == 200 for r in reponses)
+    assert len({r.json()["codcli"] for r in reponses}) == 16
+    assert compter_clients() == 16
+    assert writer.stats()["batches"] < 16
@@ -0,0 +1,143 @@
+# ============================================
+# ./tests/test_benchmarks.py
+# ============================================
+
+import json
+
+import pytest
+
+from app import Base, engine
+from benchmarks.suite import compare, main, measure, run_suite
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+def resultat(**valeurs):
+    base = {
+        "layer": "repository", "scenario": "get", "rows": 1000,
+        "concurrency": 1, "operations": 100, "errors": 0,
+        "ops_per_sec": 1000.0, "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0,
+    }
+    base.update(valeurs)
+    return base
+
+
+# --------------------------------------------------------------------
+# MESURE
+# --------------------------------------------------------------------
+
+def test_mesure_compte_les_erreurs():
+    def operation(i):
+        if i % 4 == 0:
+            raise RuntimeError("échec")
+
+    mesure = measure(operation, 20, concurrency=2)
+    assert mesure["operations"] == 20
+    assert mesure["errors"] == 5
+    assert mesure["ops_per_sec"] > 0
+    assert mesure["p50_ms"] <= mesure["p95_ms"] <= mesure["p99_ms"]
+
+
+def test_debit_des_seules_operations_reussies():
+    def echec(i):
+        raise RuntimeError("échec")
+
+    mesure = measure(echec, 10)
+    assert mesure["errors"] == 10
+    assert mesure["ops_per_sec"] == 0
+
+
+def test_suite_en_memoire():
+    resultats = run_suite(
+        [40], layers=("repository", "service", "http"), operations=10,
+        concurrency=2
+    )
+    cles = {(r["layer"], r["scenario"]) for r in resultats}
+    assert ("repository", "create") in cles
+    assert ("http", "mixed") in cles
+    assert all(r["errors"] == 0 for r in resultats)
+    assert all(r["rows"] == 40 for r in resultats)
+    mixte = [r for r in resultats if r["scenario"] == "mixed"]
+    assert all(r["concurrency"] == 2 for r in mixte)
+    # 20 clients à supprimer, répartis entre les 3 couches
+    suppressions = [r for r in resultats if r["scenario"] == "delete"]
+    assert [r["operations"] for r in suppressions] == [6, 6, 6]
+
+
+# --------------------------------------------------------------------
+# COMPARAISON À LA RÉFÉRENCE
+# --------------------------------------------------------------------
+
+def test_regression_de_latence_et_de_debit():
+    reference = [resultat()]
+    actuel = [resultat(p95_ms=2.6, ops_per_sec=700.0)]
+    regressions = compare(actuel, reference, 0.2)
+    assert {(r["metric"], r["change"]) for r in regressions} == {
+        ("p95_ms", 0.3), ("ops_per_sec", -0.3)
+    }
+
+
+def test_erreurs_toujours_en_regression():
+    def echec(i):
+        raise RuntimeError("échec")
+
+    # Échouer vite ne doit pas passer pour un gain de latence
+    actuel = [resultat(**measure(echec, 100))]
+    regressions = compare(actuel, [resultat()], 0.2)
+    assert ("errors", 1.0) in {
+        (r["metric"], r["change"]) for r in regressions
+    }
+    # Sans référence ni hausse, une erreur reste une régression
+    assert compare([resultat(errors=1)], [], 0.2)[0]["metric"] == "errors"
+    assert compare(
+        [resultat(errors=2)], [resultat(errors=2)], 0.2
+    )[0]["change"] == 0.02
+
+
+def test_amelioration_et_bruit_toleres():
+    reference = [resultat()]
+    assert compare([resultat(p95_ms=2.3, ops_per_sec=900.0)], reference,
+                   0.2) == []
+    assert compare([resultat(p95_ms=1.0, ops_per_sec=5000.0)], reference,
+                   0.2) == []
+
+
+def test_comparaison_par_cle():
+    reference = [resultat(rows=1000)]
+    assert compare([resultat(rows=100_000, p95_ms=50.0)], reference,
+                   0.2) == []
+    assert compare(
+        [resultat(p99_ms=10.0)], reference, 0.2, metrics=("p99_ms",)
+    )[0]["metric"] == "p99_ms"
+
+
+def test_commande_avec_reference(tmp_path, capsys):
+    sortie = tmp_path / "bench.json"
+    options = [
+        "--sizes", "20", "--layers", "repository", "--scenarios", "get,list",
+        "--operations", "5",
+    ]
+    assert main(options + ["--output", str(sortie)]) == 0
+    document = json.loads(sortie.read_text(encoding="utf-8"))
+    assert document["environment"]["sqlite"]
+    assert len(document["results"]) == 2
+
+    # Référence irréaliste : tout est une régression
+    for mesure in document["results"]:
+        mesure["p95_ms"] = mesure["p95_ms"] / 100
+    reference = tmp_path / "reference.json"
+    reference.write_text(json.dumps(document), encoding="utf-8")
+    assert main(options + ["--baseline", str(reference)]) == 1
+    assert "Régression repository/get/20 lignes" in capsys.readouterr().err
+
+
+def test_option_inconnue():
+    with pytest.raises(SystemExit):
+        main(["--layers", "inconnue"])
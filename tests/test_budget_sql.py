@@ -0,0 +1,201 @@
+# ============================================
+# ./tests/test_budget_sql.py
+# ============================================
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import app, Base, engine, build_client_router
+from querylog import (
+    QueryStats, QueryTrackingMiddleware, current_query_stats,
+    install_query_log
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def client_debug():
+    api = FastAPI()
+    api.include_router(build_client_router("sync"))
+    api.add_middleware(QueryTrackingMiddleware, debug=True)
+    return TestClient(api)
+
+
+def nouveau_client(nom="Dupont"):
+    return {"nom": nom, "prenom": "Jean", "adresse": "1 rue de Paris"}
+
+
+def creer_client(client):
+    return client.post("/api/v1/client/", json=nouveau_client()).json()[
+        "codcli"
+    ]
+
+
+# --------------------------------------------------------------------
+# BUDGET SQL PAR ENDPOINT
+# --------------------------------------------------------------------
+
+BUDGETS = [
+    ("GET", "/api/v1/client/{cid}", None, 1),
+    ("GET", "/api/v1/client/{cid}?fields=nom", None, 1),
+    ("GET", "/api/v1/client/", None, 1),
+    ("GET", "/api/v1/client/?nom_prefix=Du&newsletter=0", None, 1),
+    ("GET", "/api/v1/client/search?q=dupont", None, 1),
+    ("GET", "/api/v1/client/stats", None, 1),
+    ("GET", "/api/v1/client/export?format=csv", None, 1),
+    ("POST", "/api/v1/client/", nouveau_client(), 1),
+    ("PATCH", "/api/v1/client/{cid}", {"nom": "Martin"}, 1),
+    ("PATCH", "/api/v1/client/bulk",
+     {"ids": ["{cid}"], "patch": {"nom": "Martin"}}, 1),
+    ("DELETE", "/api/v1/client/{cid}", None, 1),
+    ("DELETE", "/api/v1/client/bulk", {"filter": {"newsletter": 0}}, 1),
+    ("POST", "/api/v1/client/bulk", [nouveau_client()] * 3, 1),
+]
+
+
+def remplacer(valeur, cid):
+    if isinstance(valeur, str):
+        return int(cid) if valeur == "{cid}" else valeur.format(cid=cid)
+    if isinstance(valeur, list):
+        return [remplacer(element, cid) for element in valeur]
+    if isinstance(valeur, dict):
+        return {cle: remplacer(v, cid) for cle, v in valeur.items()}
+    return valeur
+
+
+@pytest.mark.parametrize(
+    "method,url,body,maximum", BUDGETS,
+    ids=[f"{method} {url}" for method, url, _, _ in BUDGETS]
+)
+def test_budget_par_endpoint(client, max_queries, method, url, body,
+                             maximum):
+    cid = creer_client(client)
+    with max_queries(maximum) as executees:
+        response = client.request(
+            method, remplacer(url, cid), json=remplacer(body, cid)
+        )
+    assert response.status_code == 200
+    assert executees
+
+
+def test_budget_depasse(client, max_queries):
+    creer_client(client)
+    with pytest.raises(AssertionError, match="2 instructions SQL"):
+        with max_queries(1):
+            creer_client(client)
+            creer_client(client)
+
+
+def test_suppression_inexistante_une_instruction(client, max_queries):
+    with max_queries(1):
+        assert client.delete("/api/v1/client/9999").status_code == 404
+
+
+# --------------------------------------------------------------------
+# EN-TÊTES DE DEBUG
+# --------------------------------------------------------------------
+
+def test_en_tetes_de_debug(client_debug):
+    cid = creer_client(client_debug)
+    response = client_debug.patch(
+        f"/api/v1/client/{cid}", json={"nom": "Martin"}
+    )
+    assert response.headers["X-DB-Queries"] == "1"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert float(response.headers["Server-Timing"][len("db;dur="):]) > 0
+
+
+def test_en_tetes_sans_requete_sql(client_debug):
+    response = client_debug.get("/api/v1/client/stats?format=inconnu")
+    assert response.headers["X-DB-Queries"] == "1"
+    response = client_debug.get("/api/v1/client/abc")
+    assert response.status_code == 422
+    assert response.headers["X-DB-Queries"] == "0"
+
+
+def test_sans_debug_pas_d_en_tetes(client):
+    response = client.get("/api/v1/client/")
+    assert "X-DB-Queries" not in response.headers
+    assert "Server-Timing" not in response.headers
+
+
+# --------------------------------------------------------------------
+# JOURNAL DES REQUÊTES LENTES
+# --------------------------------------------------------------------
+
+@pytest.fixture
+def moteur_lent(tmp_path):
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'lent.db'}")
+    journal = logging.getLogger("tests.requetes_lentes")
+    install_query_log(db_engine, 1e-9, journal)
+    with db_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)"))
+        conn.execute(text("CREATE INDEX ix_t_v ON t (v)"))
+    yield db_engine
+    db_engine.dispose()
+
+
+def test_requete_lente_journalisee_avec_plan(moteur_lent, caplog):
+    caplog.set_level(logging.WARNING, "tests.requetes_lentes")
+    with moteur_lent.connect() as conn:
+        lignes = conn.execute(
+            text("SELECT id FROM t WHERE v = :v"), {"v": "x"}
+        ).all()
+    assert lignes == []
+
+    message = caplog.records[-1].getMessage()
+    assert "Requête SQL lente" in message
+    assert "SELECT id FROM t WHERE v = ?" in message
+    assert "USING COVERING INDEX ix_t_v" in message
+
+
+def test_requete_lente_dans_une_requete_http(moteur_lent, caplog):
+    caplog.set_level(logging.WARNING, "tests.requetes_lentes")
+    token = current_query_stats.set(QueryStats("GET /api/v1/client/"))
+    try:
+        with moteur_lent.begin() as conn:
+            conn.execute(text("INSERT INTO t (v) VALUES ('a')"))
+        stats = current_query_stats.get()
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.count >= 1 and stats.duration > 0
+    assert "pendant GET /api/v1/client/" in caplog.records[-1].getMessage()
+
+
+def test_requete_en_echec_sans_reste(moteur_lent):
+    with moteur_lent.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM absente"))
+        # Aucun chronomètre laissé sur la connexion, rendue au pool
+        assert conn.info == {}
+
+
+def test_seuil_nul_sans_journal(tmp_path, caplog):
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'rapide.db'}")
+    journal = logging.getLogger("tests.requetes_rapides")
+    install_query_log(db_engine, 0, journal)
+    caplog.set_level(logging.WARNING, "tests.requetes_rapides")
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert caplog.records == []
+    db_engine.dispose()
@@ -0,0 +1,204 @@
+# ============================================
+# ./tests/test_bulk.py
+# ============================================
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app, Base, engine, SessionLocal, ClientRepository
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def nouveau_client(i):
+    return {"nom": f"Nom{i}", "prenom": "Prenom", "adresse": "Adresse"}
+
+
+# --------------------------------------------------------------------
+# CRÉATION EN MASSE
+# --------------------------------------------------------------------
+
+def test_bulk_tableau_json(client):
+    items = [nouveau_client(i) for i in range(3)]
+
+    response = client.post("/api/v1/client/bulk", json=items)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"] == []
+    assert len(body["codcli"]) == 3
+
+    for i, cid in enumerate(body["codcli"]):
+        assert client.get(f"/api/v1/client/{cid}").json()["nom"] == f"Nom{i}"
+
+
+def test_bulk_ndjson(client):
+    contenu = "\n".join(json.dumps(nouveau_client(i)) for i in range(2))
+
+    response = client.post(
+        "/api/v1/client/bulk",
+        content=contenu,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["codcli"]) == 2
+
+
+def test_bulk_plusieurs_lots(client):
+    db = SessionLocal()
+    try:
+        repo = ClientRepository(db)
+        rows = [dict(nouveau_client(i), newsletter=0) for i in range(5)]
+        codcli = repo.create_clients(rows, chunk_size=2)
+    finally:
+        db.close()
+
+    assert len(codcli) == 5
+    assert codcli == sorted(codcli)
+    noms = [c["nom"] for c in client.get("/api/v1/client/").json()]
+    assert noms == [f"Nom{i}" for i in range(5)]
+
+
+def test_bulk_atomique_rejette_tout(client):
+    items = [nouveau_client(0), {"nom": "Incomplet"}, nouveau_client(2)]
+
+    response = client.post("/api/v1/client/bulk", json=items)
+    assert response.status_code == 422
+    erreurs = response.json()["detail"]
+    assert [e["index"] for e in erreurs] == [1]
+    assert client.get("/api/v1/client/").json() == []
+
+
+def test_bulk_partiel(client):
+    items = [nouveau_client(0), {"nom": "Incomplet"}, nouveau_client(2)]
+
+    response = client.post("/api/v1/client/bulk?mode=partial", json=items)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["codcli"][1] is None
+    assert None not in (body["codcli"][0], body["codcli"][2])
+    assert [e["index"] for e in body["errors"]] == [1]
+    assert len(client.get("/api/v1/client/").json()) == 2
+
+
+def test_bulk_corps_invalide(client):
+    response = client.post("/api/v1/client/bulk", content="{pas du json")
+    assert response.status_code == 400
+
+    response = client.post("/api/v1/client/bulk", json=nouveau_client(0))
+    assert response.status_code == 422
+
+
+def test_bulk_trop_d_elements(client, monkeypatch):
+    monkeypatch.setattr("app.MAX_BULK_ITEMS", 2)
+    items = [nouveau_client(i) for i in range(3)]
+
+    response = client.post("/api/v1/client/bulk", json=items)
+    assert response.status_code == 413
+
+
+# --------------------------------------------------------------------
+# MISE À JOUR ET SUPPRESSION EN MASSE
+# --------------------------------------------------------------------
+
+def creer_lot(client, newsletters):
+    items = [
+        dict(nouveau_client(i), newsletter=flag)
+        for i, flag in enumerate(newsletters)
+    ]
+    return client.post("/api/v1/client/bulk", json=items).json()["codcli"]
+
+
+def test_bulk_patch_par_ids(client):
+    ids = creer_lot(client, [0, 0, 0])
+
+    response = client.patch("/api/v1/client/bulk", json={
+        "ids": ids[:2],
+        "patch": {"prenom": "Modifié"}
+    })
+    assert response.status_code == 200
+    assert response.json() == {"affected": 2}
+
+    prenoms = [c["prenom"] for c in client.get("/api/v1/client/").json()]
+    assert prenoms == ["Modifié", "Modifié", "Prenom"]
+
+
+def test_bulk_patch_par_filtre(client):
+    creer_lot(client, [0, 1, 0])
+
+    response = client.patch("/api/v1/client/bulk", json={
+        "filter": {"newsletter": 0},
+        "patch": {"newsletter": 1}
+    })
+    assert response.json() == {"affected": 2}
+
+    flags = [c["newsletter"] for c in client.get("/api/v1/client/").json()]
+    assert flags == [1, 1, 1]
+
+
+def test_bulk_patch_ids_et_filtre_combines(client):
+    ids = creer_lot(client, [0, 1, 0])
+
+    response = client.patch("/api/v1/client/bulk", json={
+        "ids": ids[:2],
+        "filter": {"newsletter": 1},
+        "patch": {"nom": "Abonné"}
+    })
+    assert response.json() == {"affected": 1}
+
+
+def test_bulk_selection_vide_refusee(client):
+    creer_lot(client, [0])
+
+    response = client.patch("/api/v1/client/bulk", json={
+        "filter": {},
+        "patch": {"nom": "Tous"}
+    })
+    assert response.status_code == 422
+
+    response = client.request("DELETE", "/api/v1/client/bulk", json={})
+    assert response.status_code == 422
+
+
+def test_bulk_delete_par_ids(client):
+    ids = creer_lot(client, [0, 0, 0])
+
+    response = client.request(
+        "DELETE", "/api/v1/client/bulk", json={"ids": ids[1:] + [9999]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 2}
+    assert [c["codcli"] for c in client.get("/api/v1/client/").json()] == \
+        ids[:1]
+
+
+def test_bulk_delete_par_filtre(client):
+    creer_lot(client, [0, 1, 1])
+
+    response = client.request(
+        "DELETE", "/api/v1/client/bulk", json={"filter": {"newsletter": 1}}
+    )
+    assert response.json() == {"affected": 2}
+    assert len(client.get("/api/v1/client/").json()) == 1
+
+
+def test_bulk_delete_liste_vide(client):
+    creer_lot(client, [0])
+
+    response = client.request("DELETE", "/api/v1/client/bulk", json={
+        "ids": []
+    })
+    assert response.json() == {"affected": 0}
@@ -0,0 +1,323 @@
+# ============================================
+# ./tests/test_cache.py
+# ============================================
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import (
+    app, Base, engine, client_cache, SessionLocal, ClientRepository,
+    ClientService, ClientPatch
+)
+from cache import (
+    MemoryCacheBackend, ReadThroughCache, SQLiteCacheBackend,
+    create_cache_backend
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def creer_client(client, nom="Nom"):
+    return client.post("/api/v1/client/", json={
+        "nom": nom, "prenom": "Prenom", "adresse": "Adresse"
+    }).json()["codcli"]
+
+
+# --------------------------------------------------------------------
+# STOCKAGE EN MÉMOIRE
+# --------------------------------------------------------------------
+
+def test_lru_eviction():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set(1, "a", 0)
+    backend.set(2, "b", 0)
+    assert backend.get(1) == "a"    # 1 devient le plus récent
+    backend.set(3, "c", 0)
+
+    assert backend.get(2) is None
+    assert backend.get(1) == "a"
+    assert backend.stats()["evictions"] == 1
+
+
+def test_lru_expiration():
+    clock = FakeClock()
+    backend = MemoryCacheBackend(ttl=10, clock=clock)
+    backend.set(1, "a", 0)
+
+    clock.now = 9.9
+    assert backend.get(1) == "a"
+    clock.now = 10
+    assert backend.get(1) is None
+    assert backend.stats()["expirations"] == 1
+
+
+def test_version_refuse_ecriture_perimee():
+    backend = MemoryCacheBackend()
+    version = backend.version(1)
+    backend.invalidate(1)
+
+    assert backend.set(1, "ancienne", version) is False
+    assert backend.set(2, "autre", version) is True
+    assert backend.set(1, "nouvelle", backend.version(1)) is True
+
+
+def test_marques_bornees_par_plancher():
+    backend = MemoryCacheBackend(max_entries=2)
+    version = backend.version(1)
+    for key in (1, 2, 3):
+        backend.invalidate(key)
+
+    # La marque de 1 a été éliminée : le plancher refuse encore l’écriture
+    assert backend.set(1, "ancienne", version) is False
+
+
+# --------------------------------------------------------------------
+# LECTURE AU TRAVERS DU CACHE
+# --------------------------------------------------------------------
+
+def test_get_or_load_compteurs():
+    cache = ReadThroughCache(MemoryCacheBackend())
+    assert cache.get_or_load(1, lambda: "a") == "a"
+    assert cache.get_or_load(1, lambda: "autre") == "a"
+    assert cache.get_or_load(2, lambda: None) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_get_or_load_erreur_non_cachee():
+    cache = ReadThroughCache(MemoryCacheBackend())
+
+    def echec():
+        raise RuntimeError("DB")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(1, echec)
+    assert cache.get_or_load(1, lambda: "a") == "a"
+
+
+def test_ruee_un_seul_chargement():
+    cache = ReadThroughCache(MemoryCacheBackend())
+    chargements = []
+    depart = threading.Event()
+
+    def loader():
+        chargements.append(1)
+        depart.wait(1)
+        return "valeur"
+
+    resultats = []
+    threads = [
+        threading.Thread(
+            target=lambda: resultats.append(cache.get_or_load(1, loader))
+        )
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    depart.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(chargements) == 1
+    assert resultats == ["valeur"] * 10
+
+
+def test_invalidation_pendant_chargement():
+    cache = ReadThroughCache(MemoryCacheBackend())
+
+    def loader():
+        cache.invalidate(1)     # une écriture survient pendant la lecture
+        return "ancienne"
+
+    assert cache.get_or_load(1, loader) == "ancienne"
+    assert cache.get_or_load(1, lambda: "nouvelle") == "nouvelle"
+
+
+@pytest.mark.parametrize("ecriture", ["invalidate", "clear"])
+def test_lecture_apres_ecriture_ne_rejoint_pas_l_ancien_chargement(ecriture):
+    cache = ReadThroughCache(MemoryCacheBackend())
+    en_cours, liberer = threading.Event(), threading.Event()
+
+    def ancien_chargement():
+        en_cours.set()
+        liberer.wait(5)
+        return "ancienne"
+
+    lecteur = threading.Thread(
+        target=cache.get_or_load, args=(1, ancien_chargement)
+    )
+    lecteur.start()
+    en_cours.wait(5)
+    # Écriture validée pendant que le chargement reste ouvert
+    if ecriture == "invalidate":
+        cache.invalidate(1)
+    else:
+        cache.clear()
+    try:
+        assert cache.get_or_load(1, lambda: "nouvelle") == "nouvelle"
+    finally:
+        liberer.set()
+        lecteur.join()
+    assert cache.get_or_load(1, lambda: "autre") == "nouvelle"
+
+
+# --------------------------------------------------------------------
+# STOCKAGE SQLITE PARTAGÉ ENTRE WORKERS
+# --------------------------------------------------------------------
+
+@pytest.fixture
+def workers(tmp_path):
+    """Deux stockages sur le même fichier, comme deux workers uvicorn."""
+    path = str(tmp_path / "cache.db")
+    return SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+
+
+def test_sqlite_valeur_partagee(workers):
+    worker_a, worker_b = workers
+    worker_a.set(1, {"nom": "Nom"}, worker_a.version(1))
+
+    assert worker_b.get(1) == {"nom": "Nom"}
+
+
+def test_sqlite_invalidation_publiee(workers):
+    worker_a, worker_b = workers
+    worker_a.set(1, {"nom": "Ancien"}, worker_a.version(1))
+
+    worker_b.invalidate(1)
+    assert worker_a.get(1) is None
+
+
+def test_sqlite_lecture_concurrente_perimee(workers):
+    worker_a, worker_b = workers
+    version = worker_a.version(1)   # A commence à lire le client 1
+    worker_b.invalidate(1)          # B le modifie entre-temps
+
+    assert worker_a.set(1, {"nom": "Ancien"}, version) is False
+    assert worker_b.get(1) is None
+
+
+def test_sqlite_clear_et_expiration(tmp_path):
+    clock = FakeClock()
+    backend = SQLiteCacheBackend(str(tmp_path / "c.db"), ttl=5, clock=clock)
+    backend.set(1, "a", backend.version(1))
+    version = backend.version(2)
+
+    clock.now = 5
+    assert backend.get(1) is None
+    backend.clear()
+    assert backend.set(2, "b", version) is False
+
+
+def test_sqlite_eviction(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "c.db"), max_entries=2)
+    for key in range(4):
+        backend.set(key, key, backend.version(key))
+        backend.invalidate(key + 10)
+    backend.cleanup()
+
+    stats = backend.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 2
+    assert backend.get(3) == 3
+
+
+def test_services_coherents_entre_workers(client, workers):
+    cid = creer_client(client)
+    db = SessionLocal()
+    try:
+        repo = ClientRepository(db)
+        worker_a = ClientService(repo, cache=ReadThroughCache(workers[0]))
+        worker_b = ClientService(repo, cache=ReadThroughCache(workers[1]))
+
+        assert worker_a.get_client_by_id(cid)["nom"] == "Nom"
+        worker_b.patch_client(cid, ClientPatch(nom="Modif"))
+        assert worker_a.get_client_by_id(cid)["nom"] == "Modif"
+    finally:
+        db.close()
+
+
+def test_stockage_inconnu():
+    with pytest.raises(ValueError):
+        create_cache_backend("redis", 10, 1)
+
+
+# --------------------------------------------------------------------
+# CACHE DU SERVICE CLIENT
+# --------------------------------------------------------------------
+
+def test_lecture_servie_par_le_cache(client, statements):
+    cid = creer_client(client)
+    assert client.get(f"/api/v1/client/{cid}").status_code == 200
+    statements.clear()
+
+    response = client.get(f"/api/v1/client/{cid}")
+    assert response.json()["nom"] == "Nom"
+    assert statements == []
+
+
+def test_patch_invalide(client):
+    cid = creer_client(client)
+    client.get(f"/api/v1/client/{cid}")
+
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+    assert client.get(f"/api/v1/client/{cid}").json()["nom"] == "Modif"
+
+
+def test_delete_invalide(client):
+    cid = creer_client(client)
+    client.get(f"/api/v1/client/{cid}")
+
+    client.delete(f"/api/v1/client/{cid}")
+    assert client.get(f"/api/v1/client/{cid}").status_code == 404
+
+
+def test_operations_en_masse_invalident(client):
+    ids = [creer_client(client, f"Nom{i}") for i in range(2)]
+    for cid in ids:
+        client.get(f"/api/v1/client/{cid}")
+
+    client.patch("/api/v1/client/bulk", json={
+        "filter": {"newsletter": 0}, "patch": {"nom": "Filtre"}
+    })
+    assert client.get(f"/api/v1/client/{ids[0]}").json()["nom"] == "Filtre"
+
+    client.request("DELETE", "/api/v1/client/bulk", json={"ids": ids[1:]})
+    assert client.get(f"/api/v1/client/{ids[1]}").status_code == 404
+
+
+def test_statistiques_du_cache(client):
+    avant = client.get("/api/v1/admin/cache").json()
+    cid = creer_client(client)
+    client.get(f"/api/v1/client/{cid}")
+    client.get(f"/api/v1/client/{cid}")
+
+    apres = client.get("/api/v1/admin/cache").json()
+    assert apres["enabled"] is True
+    assert apres["hits"] == avant["hits"] + 1
+    assert apres["misses"] == avant["misses"] + 1
+    assert apres["max_entries"] == client_cache.max_entries
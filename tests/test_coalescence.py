@@ -0,0 +1,251 @@
+# ============================================
+# ./tests/test_coalescence.py
+# ============================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as module_app
+from app import app, Base, engine, ClientRepository
+from cache import SingleFlight
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    lectures = SingleFlight()
+    monkeypatch.setattr(module_app, "client_reads", lectures)
+    monkeypatch.setattr(module_app, "client_cache", None)
+    return lectures
+
+
+@pytest.fixture
+def client(reads):
+    return TestClient(app)
+
+
+def creer_client(client, nom="Dupont"):
+    return client.post("/api/v1/client/", json={
+        "nom": nom, "prenom": "Jean", "adresse": "1 rue de Paris"
+    }).json()["codcli"]
+
+
+def ralentir(monkeypatch, methode):
+    """Ralentit une lecture du repository et compte ses exécutions."""
+    appels = []
+    originale = getattr(ClientRepository, methode)
+
+    def lente(self, *args, **kwargs):
+        appels.append(args)
+        threading.Event().wait(0.2)
+        return originale(self, *args, **kwargs)
+
+    monkeypatch.setattr(ClientRepository, methode, lente)
+    return appels
+
+
+def en_rafale(fonction, nombre=8):
+    depart = threading.Barrier(nombre)
+
+    def appeler(_):
+        depart.wait()
+        return fonction()
+
+    with ThreadPoolExecutor(max_workers=nombre) as pool:
+        return list(pool.map(appeler, range(nombre)))
+
+
+# --------------------------------------------------------------------
+# SINGLE-FLIGHT
+# --------------------------------------------------------------------
+
+def test_une_seule_execution_par_cle():
+    lectures = SingleFlight()
+    executions = []
+
+    def charger():
+        executions.append(1)
+        threading.Event().wait(0.1)
+        return {"valeur": 1}
+
+    resultats = en_rafale(lambda: lectures.do("cle", charger))
+
+    assert len(executions) == 1
+    assert all(r is resultats[0] for r in resultats)
+    assert lectures.stats() == {
+        "executions": 1, "coalesced": 7, "in_flight": 0
+    }
+
+
+def test_cles_distinctes_non_regroupees():
+    lectures = SingleFlight()
+    assert lectures.do("a", lambda: 1) == 1
+    assert lectures.do("b", lambda: 2) == 2
+    assert lectures.stats()["executions"] == 2
+
+
+def test_erreur_partagee():
+    lectures = SingleFlight()
+
+    def echouer():
+        threading.Event().wait(0.1)
+        raise ValueError("lecture impossible")
+
+    def appeler():
+        try:
+            lectures.do("cle", echouer)
+        except ValueError as exc:
+            return str(exc)
+
+    assert en_rafale(appeler, 4) == ["lecture impossible"] * 4
+    assert lectures.do("cle", lambda: "ok") == "ok"
+
+
+def test_forget_detache_l_execution_en_cours():
+    lectures = SingleFlight()
+    en_cours, liberer = threading.Event(), threading.Event()
+
+    def bloquer():
+        en_cours.set()
+        liberer.wait()
+        return "ancienne"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ancienne = pool.submit(lectures.do, "cle", bloquer)
+        en_cours.wait()
+        lectures.forget()
+        assert lectures.do("cle", lambda: "nouvelle") == "nouvelle"
+        liberer.set()
+        assert ancienne.result() == "ancienne"
+
+
+# --------------------------------------------------------------------
+# LECTURES DU SERVICE
+# --------------------------------------------------------------------
+
+def test_lecture_par_id_regroupee(client, reads, monkeypatch):
+    cid = creer_client(client)
+    appels = ralentir(monkeypatch, "get_client_by_id")
+
+    reponses = en_rafale(lambda: client.get(f"/api/v1/client/{cid}"))
+
+    assert all(r.status_code == 200 for r in reponses)
+    assert {r.json()["nom"] for r in reponses} == {"Dupont"}
+    assert len(appels) == 1
+    assert reads.stats()["coalesced"] == 7
+
+
+def test_page_regroupee(client, monkeypatch):
+    for i in range(3):
+        creer_client(client, f"Nom{i}")
+    appels = ralentir(monkeypatch, "get_clients_page")
+
+    reponses = en_rafale(lambda: client.get("/api/v1/client/?limit=2"))
+
+    assert len(appels) == 1
+    assert len({r.content for r in reponses}) == 1
+    assert len({r.headers["X-Next-Cursor"] for r in reponses}) == 1
+
+
+def test_page_json_encodee_une_fois(client, monkeypatch):
+    creer_client(client)
+    monkeypatch.setattr(module_app, "CLIENT_FAST_JSON", True)
+    appels = ralentir(monkeypatch, "get_client_rows_page")
+    encodages = []
+    encoder = module_app.rows_to_json
+
+    def rows_to_json(rows, fields):
+        encodages.append(fields)
+        return encoder(rows, fields)
+
+    monkeypatch.setattr(module_app, "rows_to_json", rows_to_json)
+    reponses = en_rafale(lambda: client.get("/api/v1/client/"))
+
+    assert len(appels) == 1
+    assert len(encodages) == 1
+    assert len({r.content for r in reponses}) == 1
+    assert len({r.headers["ETag"] for r in reponses}) == 1
+
+
+def test_filtres_distincts_non_regroupes(client, monkeypatch):
+    creer_client(client)
+    appels = ralentir(monkeypatch, "get_clients_page")
+
+    en_rafale(lambda: client.get("/api/v1/client/?nom=Dupont"), 2)
+    en_rafale(lambda: client.get("/api/v1/client/?nom=Martin"), 2)
+
+    assert len(appels) == 2
+
+
+def test_ecriture_detache_les_lectures_en_cours(client, monkeypatch):
+    cid = creer_client(client)
+    en_cours, liberer = threading.Event(), threading.Event()
+    originale = ClientRepository.get_client_by_id
+
+    def bloquer_la_premiere(self, client_id):
+        client = originale(self, client_id)
+        if not en_cours.is_set():
+            en_cours.set()
+            liberer.wait()
+        return client
+
+    monkeypatch.setattr(
+        ClientRepository, "get_client_by_id", bloquer_la_premiere
+    )
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ancienne = pool.submit(client.get, f"/api/v1/client/{cid}")
+        en_cours.wait()
+        client.patch(f"/api/v1/client/{cid}", json={"nom": "Martin"})
+
+        # Lancée après l’écriture : ne reçoit pas la lecture en cours
+        assert client.get(f"/api/v1/client/{cid}").json()["nom"] == "Martin"
+        liberer.set()
+        assert ancienne.result().json()["nom"] == "Dupont"
+
+
+def test_creation_en_masse_detache_les_lectures_en_cours(
+    client, monkeypatch
+):
+    creer_client(client)
+    en_cours, liberer = threading.Event(), threading.Event()
+    originale = ClientRepository.get_stats
+
+    def bloquer_la_premiere(self):
+        compteurs = originale(self)
+        if not en_cours.is_set():
+            en_cours.set()
+            liberer.wait(5)    # sans détachement, la lecture suivante attend
+        return compteurs
+
+    monkeypatch.setattr(ClientRepository, "get_stats", bloquer_la_premiere)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ancienne = pool.submit(client.get, "/api/v1/client/stats")
+        en_cours.wait()
+        assert client.post("/api/v1/client/bulk", json=[
+            {"nom": f"Nom{i}", "prenom": "Jean", "adresse": "Adresse"}
+            for i in range(2)
+        ]).status_code == 200
+
+        # Lancée après la création : compte les nouveaux clients
+        assert client.get("/api/v1/client/stats").json()["total"] == 3
+        liberer.set()
+        assert ancienne.result().json()["total"] == 1
+
+
+def test_statistiques(client, reads):
+    cid = creer_client(client)
+    client.get(f"/api/v1/client/{cid}")
+    stats = client.get("/api/v1/admin/reads").json()
+    assert stats["enabled"] and stats["executions"] == 1
+    assert stats["coalesced"] == 0
@@ -0,0 +1,81 @@
+# ============================================
+# ./tests/test_config_sqlite.py
+# ============================================
+
+import pytest
+from sqlalchemy import text
+
+from app import create_db_engine, pool_options, sqlite_pragmas
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'profil.db'}"
+
+
+def pragma(db_engine, name):
+    with db_engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+# --------------------------------------------------------------------
+# PROFIL DE PRODUCTION
+# --------------------------------------------------------------------
+
+def test_profil_production_pragmas(db_url):
+    db_engine = create_db_engine(db_url, "production")
+
+    assert pragma(db_engine, "journal_mode") == "wal"
+    assert pragma(db_engine, "synchronous") == 1      # NORMAL
+    assert pragma(db_engine, "busy_timeout") == 5000
+    assert pragma(db_engine, "cache_size") == -64000
+    assert pragma(db_engine, "temp_store") == 2       # MEMORY
+    db_engine.dispose()
+
+
+def test_profil_production_pool(db_url):
+    db_engine = create_db_engine(db_url, "production")
+
+    assert db_engine.pool.size() == 20
+    assert db_engine.pool._pre_ping is True
+    db_engine.dispose()
+
+
+def test_profil_par_defaut_inchange(db_url):
+    db_engine = create_db_engine(db_url, "default")
+
+    assert pragma(db_engine, "journal_mode") == "delete"
+    assert pragma(db_engine, "synchronous") == 2      # FULL
+    db_engine.dispose()
+
+
+def test_profil_inconnu(db_url):
+    with pytest.raises(ValueError):
+        create_db_engine(db_url, "turbo")
+
+
+# --------------------------------------------------------------------
+# SURCHARGES PAR VARIABLES D’ENVIRONNEMENT
+# --------------------------------------------------------------------
+
+def test_surcharge_pragmas(monkeypatch):
+    monkeypatch.setenv("SQLITE_PRAGMAS", "busy_timeout=100, foreign_keys=ON")
+
+    pragmas = sqlite_pragmas("production")
+    assert pragmas["busy_timeout"] == "100"
+    assert pragmas["foreign_keys"] == "ON"
+    assert pragmas["journal_mode"] == "WAL"
+
+
+def test_surcharge_pool(monkeypatch, db_url):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+
+    options = pool_options(db_url, "production")
+    assert options["pool_size"] == 3
+    assert options["pool_pre_ping"] is False
+    assert options["max_overflow"] == 20
+
+
+def test_pool_base_en_memoire():
+    assert pool_options("sqlite://", "production") == {}
@@ -0,0 +1,252 @@
+# ============================================
+# ./tests/test_etag.py
+# ============================================
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+
+import app as module_app
+from app import app, Base, build_client_router, engine, init_db
+from cache import ReadThroughCache, SQLiteCacheBackend
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client_sync():
+    # Les instructions comptées sont celles du moteur synchrone
+    return TestClient(app)
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request):
+    if request.param == "sync":
+        yield TestClient(app)
+        return
+    pytest.importorskip("aiosqlite")
+    async_app = FastAPI()
+    async_app.include_router(build_client_router("async"))
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+def creer_client(client):
+    response = client.post("/api/v1/client/", json={
+        "nom": "Nom", "prenom": "Prenom", "adresse": "Adresse"
+    })
+    return response.json()["codcli"], response.headers["ETag"]
+
+
+# --------------------------------------------------------------------
+# GET CONDITIONNEL
+# --------------------------------------------------------------------
+
+def test_get_renvoie_etag(client):
+    cid, etag = creer_client(client)
+
+    response = client.get(f"/api/v1/client/{cid}")
+    assert response.headers["ETag"] == etag
+    assert response.json()["version"] > 0
+
+
+def test_get_304_si_version_inchangee(client):
+    cid, etag = creer_client(client)
+
+    response = client.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_get_304_sans_lire_le_client(client_sync, statements):
+    cid, etag = creer_client(client_sync)
+    statements.clear()
+
+    response = client_sync.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # Seule la version est lue
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT t_client.version")
+
+
+def test_get_304_depuis_le_cache_partage(
+    client_sync, statements, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(module_app, "client_cache", ReadThroughCache(
+        SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    ))
+    cid, etag = creer_client(client_sync)
+    client_sync.get(f"/api/v1/client/{cid}")
+    statements.clear()
+
+    response = client_sync.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": f'W/{etag}'}
+    )
+    assert response.status_code == 304
+    assert statements == []
+
+
+def test_get_304_sans_cache_propre_au_processus(client_sync, statements):
+    # Un cache en mémoire ignore les écritures des autres workers :
+    # la version est relue en base
+    cid, etag = creer_client(client_sync)
+    client_sync.get(f"/api/v1/client/{cid}")
+    statements.clear()
+
+    response = client_sync.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT t_client.version")
+
+
+def test_get_200_apres_modification(client):
+    cid, etag = creer_client(client)
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+
+    response = client.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_liste_conditionnelle(client):
+    creer_client(client)
+    etag = client.get("/api/v1/client/").headers["ETag"]
+
+    response = client.get("/api/v1/client/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    creer_client(client)
+    response = client.get("/api/v1/client/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+# --------------------------------------------------------------------
+# ÉCRITURES CONDITIONNELLES (If-Match)
+# --------------------------------------------------------------------
+
+def test_patch_incremente_la_version(client):
+    cid, _ = creer_client(client)
+    version = client.get(f"/api/v1/client/{cid}").json()["version"]
+
+    response = client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+    assert response.json()["version"] == version + 1
+
+
+def test_patch_if_match(client):
+    cid, etag = creer_client(client)
+
+    response = client.patch(
+        f"/api/v1/client/{cid}",
+        json={"nom": "Premier"},
+        headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    nouvel_etag = response.headers["ETag"]
+    assert nouvel_etag != etag
+
+    # Un second écrivain qui part de l’ancienne version est refusé
+    response = client.patch(
+        f"/api/v1/client/{cid}",
+        json={"nom": "Second"},
+        headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/client/{cid}").json()["nom"] == "Premier"
+
+
+def test_patch_vide_if_match_perime(client):
+    cid, etag = creer_client(client)
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+
+    response = client.patch(
+        f"/api/v1/client/{cid}", json={}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+
+def test_delete_if_match(client):
+    cid, etag = creer_client(client)
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+
+    response = client.delete(
+        f"/api/v1/client/{cid}", headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+    etag = client.get(f"/api/v1/client/{cid}").headers["ETag"]
+    response = client.delete(
+        f"/api/v1/client/{cid}", headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_if_match_client_inexistant(client):
+    response = client.delete(
+        "/api/v1/client/9999", headers={"If-Match": '"9999-1"'}
+    )
+    assert response.status_code == 404
+
+
+def test_patch_en_masse_incremente_la_version(client):
+    cid, etag = creer_client(client)
+    client.patch("/api/v1/client/bulk", json={
+        "ids": [cid], "patch": {"nom": "Masse"}
+    })
+
+    response = client.get(
+        f"/api/v1/client/{cid}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_codcli_reattribue_nouvel_etag(client):
+    cid, etag = creer_client(client)
+    client.delete(f"/api/v1/client/{cid}")
+
+    nouveau_cid, nouvel_etag = creer_client(client)
+    assert nouveau_cid == cid       # SQLite réattribue le plus grand rowid
+    assert nouvel_etag != etag
+
+
+# --------------------------------------------------------------------
+# MISE À NIVEAU D’UNE BASE EXISTANTE
+# --------------------------------------------------------------------
+
+def test_init_db_ajoute_la_colonne_version(tmp_path):
+    ancien = create_engine(f"sqlite:///{tmp_path / 'ancienne.db'}")
+    with ancien.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE t_client (codcli INTEGER PRIMARY KEY, "
+            "nom VARCHAR(40), prenom VARCHAR(30), genre VARCHAR(8), "
+            "adresse VARCHAR(50), complement_adresse VARCHAR(50), "
+            "tel VARCHAR(10), email VARCHAR(255), newsletter INTEGER)"
+        ))
+        conn.execute(text("INSERT INTO t_client (nom) VALUES ('Ancien')"))
+
+    init_db(ancien)
+
+    colonnes = {c["name"] for c in inspect(ancien).get_columns("t_client")}
+    assert "version" in colonnes
+    with ancien.connect() as conn:
+        assert conn.execute(text("SELECT version FROM t_client")).scalar() == 1
+    ancien.dispose()
@@ -0,0 +1,96 @@
+# ============================================
+# ./tests/test_export.py
+# ============================================
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import (
+    app, Base, engine, SessionLocal, ClientRepository, ClientService,
+    CLIENT_FIELDS
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_clients(client, nombre):
+    for i in range(nombre):
+        client.post("/api/v1/client/", json={
+            "nom": f"Nom{i}",
+            "prenom": "Prénom",
+            "adresse": "1, rue \"Test\"",
+            "newsletter": i % 2
+        })
+
+
+# --------------------------------------------------------------------
+# EXPORT EN FLUX
+# --------------------------------------------------------------------
+
+def test_export_ndjson(client):
+    creer_clients(client, 3)
+
+    response = client.get("/api/v1/client/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lignes = [json.loads(ligne) for ligne in response.text.splitlines()]
+    assert [ligne["nom"] for ligne in lignes] == ["Nom0", "Nom1", "Nom2"]
+    assert lignes[0]["prenom"] == "Prénom"
+    assert tuple(lignes[0]) == CLIENT_FIELDS
+
+
+def test_export_csv(client):
+    creer_clients(client, 2)
+
+    response = client.get("/api/v1/client/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "clients.csv" in response.headers["content-disposition"]
+
+    lignes = list(csv.DictReader(io.StringIO(response.text)))
+    assert [ligne["nom"] for ligne in lignes] == ["Nom0", "Nom1"]
+    assert lignes[1]["adresse"] == "1, rue \"Test\""
+    assert lignes[1]["newsletter"] == "1"
+
+
+def test_export_table_vide(client):
+    assert client.get("/api/v1/client/export").text == ""
+    response = client.get("/api/v1/client/export?format=csv")
+    assert response.text.strip() == ",".join(CLIENT_FIELDS)
+
+
+def test_export_format_inconnu(client):
+    response = client.get("/api/v1/client/export?format=xml")
+    assert response.status_code == 422
+
+
+def test_export_par_lots(client):
+    creer_clients(client, 5)
+
+    db = SessionLocal()
+    try:
+        service = ClientService(ClientRepository(db))
+        blocs = list(service.export_clients("ndjson", batch_size=2))
+    finally:
+        db.close()
+
+    # 5 lignes par lots de 2 : 3 blocs envoyés au fil de l’eau
+    assert len(blocs) == 3
+    assert sum(bloc.count(b"\n") for bloc in blocs) == 5
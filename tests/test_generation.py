@@ -0,0 +1,161 @@
+# ============================================
+# ./tests/test_generation.py
+# ============================================
+
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import manage
+from app import app, Base, engine, reconcile_client_stats
+from datagen import (
+    COLUMN_WIDTHS, LOAD_COLUMNS, NAMES, ClientDistribution, ClientGenerator,
+    load_clients
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def schema_t_client():
+    with engine.connect() as conn:
+        return sorted(conn.execute(text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE tbl_name = 't_client'"
+        )))
+
+
+def proportion(lignes, colonne, condition):
+    index = LOAD_COLUMNS.index(colonne)
+    return sum(condition(ligne[index]) for ligne in lignes) / len(lignes)
+
+
+# --------------------------------------------------------------------
+# GÉNÉRATEUR
+# --------------------------------------------------------------------
+
+def test_generation_deterministe():
+    premiers = list(ClientGenerator(seed=7).rows(100))
+    assert list(ClientGenerator(seed=7).rows(100)) == premiers
+    # Les n premiers clients ne dépendent pas du nombre demandé
+    assert list(ClientGenerator(seed=7).rows(5000))[:100] == premiers
+    assert list(ClientGenerator(seed=8).rows(100)) != premiers
+
+
+def test_largeur_des_colonnes():
+    for ligne in ClientGenerator(seed=1).rows(5000):
+        for colonne, valeur in zip(LOAD_COLUMNS, ligne):
+            if isinstance(valeur, str):
+                assert len(valeur) <= COLUMN_WIDTHS[colonne], colonne
+    assert COLUMN_WIDTHS["nom"] == 40 and COLUMN_WIDTHS["tel"] == 10
+    assert max(len(nom) for nom in NAMES) <= 40
+
+
+def test_formats_generes():
+    clients = list(ClientGenerator(seed=2).clients(2000))
+    assert set(clients[0]) == set(LOAD_COLUMNS) - {"version"}
+    telephones = [c["tel"] for c in clients if c["tel"]]
+    assert all(len(tel) == 10 and tel.startswith("0") for tel in telephones)
+    emails = [c["email"] for c in clients if c["email"]]
+    assert all(email.isascii() and "@" in email for email in emails)
+    assert len(set(emails)) == len(emails)
+    assert {c["genre"] for c in clients} == {"F", "M", None}
+
+
+def test_repartitions_configurables():
+    loi = ClientDistribution(
+        newsletter=0.9, email=0.1, tel=0.5, complement_adresse=0.0,
+        genres=(("F", 1.0),)
+    )
+    lignes = list(ClientGenerator(seed=3, distribution=loi).rows(20000))
+    assert proportion(lignes, "newsletter", bool) == pytest.approx(0.9, 0.05)
+    assert proportion(
+        lignes, "email", lambda v: v is not None
+    ) == pytest.approx(0.1, abs=0.02)
+    assert proportion(
+        lignes, "tel", lambda v: v is not None
+    ) == pytest.approx(0.5, abs=0.02)
+    assert proportion(lignes, "complement_adresse", bool) == 0
+    assert proportion(lignes, "genre", lambda v: v == "F") == 1
+
+
+def test_loi_de_zipf_des_noms():
+    def frequences(skew):
+        generateur = ClientGenerator(
+            seed=4, distribution=ClientDistribution(name_skew=skew)
+        )
+        return Counter(ligne[0] for ligne in generateur.rows(20000))
+
+    concentre, uniforme = frequences(1.5), frequences(0)
+    assert concentre.most_common(1)[0][0] == NAMES[0]
+    assert concentre[NAMES[0]] > 20 * uniforme[NAMES[0]]
+    assert len(uniforme) > len(concentre)
+
+
+# --------------------------------------------------------------------
+# CHARGEMENT
+# --------------------------------------------------------------------
+
+def test_chargement_conserve_index_et_triggers(client):
+    schema = schema_t_client()
+    lignes = list(ClientGenerator(seed=5).rows(1200, version=42))
+    assert load_clients(engine, lignes, batch_size=500) == 1200
+    assert schema_t_client() == schema
+
+    # Les triggers recréés suivent les écritures suivantes
+    client.post("/api/v1/client/", json={
+        "nom": "Zébulon", "prenom": "Jean", "adresse": "1 rue de Paris"
+    })
+    assert client.get("/api/v1/client/stats").json()["total"] == 1201
+    assert reconcile_client_stats(engine) == []
+
+    nom = lignes[0][0]
+    trouves = client.get(
+        "/api/v1/client/search", params={"q": nom, "limit": 1000}
+    ).json()
+    assert trouves and all(nom in c["nom"] for c in trouves)
+    assert client.get(
+        "/api/v1/client/search", params={"q": "Zébulon"}
+    ).json()[0]["nom"] == "Zébulon"
+
+    with engine.connect() as conn:
+        assert conn.scalar(text(
+            "SELECT count(*) FROM t_client WHERE version = 42"
+        )) == 1200
+
+
+def test_fixture_partagee(generated_clients, client):
+    ids = generated_clients(300, seed=6)
+    assert ids == list(range(1, 301))
+    premier = client.get(f"/api/v1/client/{ids[0]}").json()
+    attendu = next(ClientGenerator(seed=6).clients(1))
+    assert {champ: premier[champ] for champ in attendu} == attendu
+
+
+def test_commande_seed_clients(capsys):
+    assert manage.main([
+        "seed-clients", "--count", "250", "--seed", "9", "--replace",
+        "--batch-size", "100", "--email-rate", "0",
+    ]) == 0
+    assert "250 clients chargés" in capsys.readouterr().out
+    assert manage.main(["seed-clients", "--count", "50"]) == 0
+    assert "50 clients chargés" in capsys.readouterr().out
+
+    with engine.connect() as conn:
+        assert conn.scalar(text("SELECT count(*) FROM t_client")) == 300
+        assert conn.scalar(text(
+            "SELECT count(email) FROM t_client WHERE codcli <= 250"
+        )) == 0
@@ -0,0 +1,281 @@
+# ============================================
+# ./tests/test_idempotence.py
+# ============================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+import app as module_app
+from app import app, Base, engine, ClientService
+from idempotency import (
+    IdempotencyConflict, IdempotencyPending, MemoryIdempotencyStore,
+    SQLiteIdempotencyStore, StoredResponse
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def store(monkeypatch):
+    stockage = MemoryIdempotencyStore(ttl=60, max_entries=100)
+    monkeypatch.setattr(module_app, "idempotency_store", stockage)
+    return stockage
+
+
+@pytest.fixture
+def client(store):
+    return TestClient(app)
+
+
+def nouveau_client(nom="Dupont"):
+    return {"nom": nom, "prenom": "Jean", "adresse": "1 rue de Paris"}
+
+
+def creer(client, cle, donnees=None):
+    return client.post(
+        "/api/v1/client/", json=donnees or nouveau_client(),
+        headers={"Idempotency-Key": cle}
+    )
+
+
+def compter_clients():
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM t_client")).scalar()
+
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+
+# --------------------------------------------------------------------
+# CRÉATION UNITAIRE
+# --------------------------------------------------------------------
+
+def test_repetition_servie_sans_ecriture(client):
+    premiere = creer(client, "cle-1")
+    assert premiere.status_code == 200
+    assert "Idempotent-Replayed" not in premiere.headers
+
+    executees = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executees.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        seconde = creer(client, "cle-1")
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert executees == []
+    assert seconde.status_code == 200
+    assert seconde.headers["Idempotent-Replayed"] == "true"
+    assert seconde.content == premiere.content
+    assert seconde.headers["ETag"] == premiere.headers["ETag"]
+    assert compter_clients() == 1
+
+
+def test_reponse_identique_sans_cle(client):
+    avec_cle = creer(client, "cle-1").json()
+    sans_cle = client.post("/api/v1/client/", json=nouveau_client()).json()
+    assert sans_cle.keys() == avec_cle.keys()
+    assert sans_cle["codcli"] != avec_cle["codcli"]
+    assert compter_clients() == 2
+
+
+def test_cles_differentes_creations_distinctes(client):
+    creer(client, "cle-1")
+    creer(client, "cle-2")
+    assert compter_clients() == 2
+
+
+def test_cle_reutilisee_pour_autre_requete(client):
+    creer(client, "cle-1")
+    response = creer(client, "cle-1", nouveau_client("Martin"))
+    assert response.status_code == 422
+    assert compter_clients() == 1
+
+
+def test_cle_invalide(client):
+    response = creer(client, "x" * 256)
+    assert response.status_code == 400
+    assert compter_clients() == 0
+
+
+def test_requetes_concurrentes_attendent_la_premiere(client, monkeypatch):
+    depart = threading.Barrier(8)
+    creation = ClientService.create_client
+
+    def creation_lente(self, new_client):
+        threading.Event().wait(0.05)
+        return creation(self, new_client)
+
+    monkeypatch.setattr(ClientService, "create_client", creation_lente)
+
+    def envoyer(_):
+        depart.wait()
+        return creer(client, "cle-concurrente")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        reponses = list(pool.map(envoyer, range(8)))
+
+    assert all(r.status_code == 200 for r in reponses)
+    assert len({r.json()["codcli"] for r in reponses}) == 1
+    assert compter_clients() == 1
+    rejouees = [r for r in reponses if "Idempotent-Replayed" in r.headers]
+    assert len(rejouees) == 7
+
+
+def test_echec_serveur_libere_la_cle(client, monkeypatch):
+    def panne(self, new_client):
+        raise RuntimeError("panne")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ClientService, "create_client", panne)
+        with pytest.raises(RuntimeError):
+            creer(client, "cle-1")
+
+    assert creer(client, "cle-1").status_code == 200
+    assert compter_clients() == 1
+
+
+def test_statistiques(client):
+    creer(client, "cle-1")
+    creer(client, "cle-1")
+    stats = client.get("/api/v1/admin/idempotency").json()
+    assert stats["enabled"] and stats["entries"] == 1
+    assert stats["replays"] == 1
+
+
+# --------------------------------------------------------------------
+# ÉCRITURES EN MASSE
+# --------------------------------------------------------------------
+
+def test_creation_en_masse_idempotente(client):
+    items = [nouveau_client(f"Nom{i}") for i in range(3)]
+    en_tete = {"Idempotency-Key": "lot-1"}
+    premiere = client.post("/api/v1/client/bulk", json=items, headers=en_tete)
+    seconde = client.post("/api/v1/client/bulk", json=items, headers=en_tete)
+
+    assert premiere.status_code == 200
+    assert seconde.json() == premiere.json()
+    assert seconde.headers["Idempotent-Replayed"] == "true"
+    assert compter_clients() == 3
+
+
+def test_erreur_de_lot_rejouee(client):
+    items = [nouveau_client(), {"nom": "Incomplet"}]
+    en_tete = {"Idempotency-Key": "lot-1"}
+    premiere = client.post("/api/v1/client/bulk", json=items, headers=en_tete)
+    seconde = client.post("/api/v1/client/bulk", json=items, headers=en_tete)
+
+    assert premiere.status_code == seconde.status_code == 422
+    assert seconde.json() == premiere.json()
+    assert compter_clients() == 0
+
+
+def test_mode_du_lot_dans_l_empreinte(client):
+    items = [nouveau_client()]
+    en_tete = {"Idempotency-Key": "lot-1"}
+    client.post("/api/v1/client/bulk", json=items, headers=en_tete)
+    response = client.post(
+        "/api/v1/client/bulk?mode=partial", json=items, headers=en_tete
+    )
+    assert response.status_code == 422
+
+
+def test_modification_et_suppression_en_masse(client):
+    items = [nouveau_client() for _ in range(4)]
+    client.post("/api/v1/client/bulk", json=items)
+
+    modification = {"filter": {"newsletter": 0}, "patch": {"genre": "F"}}
+    for _ in range(2):
+        response = client.patch(
+            "/api/v1/client/bulk", json=modification,
+            headers={"Idempotency-Key": "maj-1"}
+        )
+        assert response.json() == {"affected": 4}
+
+    client.post("/api/v1/client/", json=nouveau_client())
+    for _ in range(2):
+        response = client.request(
+            "DELETE", "/api/v1/client/bulk",
+            json={"filter": {"newsletter": 0}},
+            headers={"Idempotency-Key": "sup-1"}
+        )
+        assert response.json() == {"affected": 5}
+    assert compter_clients() == 0
+
+
+# --------------------------------------------------------------------
+# STOCKAGES
+# --------------------------------------------------------------------
+
+@pytest.fixture(params=["memory", "sqlite"])
+def stockage(request, tmp_path):
+    horloge = Horloge()
+    if request.param == "memory":
+        return MemoryIdempotencyStore(
+            ttl=10, max_entries=2, pending_ttl=5, clock=horloge
+        ), horloge
+    return SQLiteIdempotencyStore(
+        str(tmp_path / "cles.db"), ttl=10, max_entries=2, pending_ttl=5,
+        clock=horloge
+    ), horloge
+
+
+def test_stockage_enregistre_et_rejoue(stockage):
+    cles, _ = stockage
+    assert cles.begin("k", "f", 0) is None
+    cles.complete("k", StoredResponse(200, b"{}", '"1-1"'))
+    assert cles.begin("k", "f", 0) == StoredResponse(200, b"{}", '"1-1"')
+    with pytest.raises(IdempotencyConflict):
+        cles.begin("k", "autre", 0)
+
+
+def test_stockage_cle_en_cours(stockage):
+    cles, _ = stockage
+    assert cles.begin("k", "f", 0) is None
+    with pytest.raises(IdempotencyPending):
+        cles.begin("k", "f", 0)
+    cles.release("k")
+    assert cles.begin("k", "f", 0) is None
+
+
+def test_stockage_expiration(stockage):
+    cles, horloge = stockage
+    assert cles.begin("k", "f", 0) is None
+    horloge.maintenant = 6
+    # Réservation abandonnée : la clé redevient disponible
+    assert cles.begin("k", "f", 0) is None
+    cles.complete("k", StoredResponse(200, b"{}"))
+    horloge.maintenant = 15
+    assert cles.begin("k", "f", 0) is not None
+    horloge.maintenant = 17
+    assert cles.begin("k", "autre", 0) is None
+
+
+def test_stockage_borne(stockage):
+    cles, _ = stockage
+    for cle in ("a", "b", "c"):
+        assert cles.begin(cle, "f", 0) is None
+        cles.complete(cle, StoredResponse(200, b"{}"))
+    if isinstance(cles, SQLiteIdempotencyStore):
+        cles.cleanup()
+    assert cles.stats()["entries"] == 2
+    assert cles.begin("a", "autre", 0) is None
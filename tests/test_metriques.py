@@ -0,0 +1,244 @@
+# ============================================
+# ./tests/test_metriques.py
+# ============================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import app as module_app
+from app import app, Base, engine, create_db_engine, ClientRepository
+from admission import AdmissionLimiter
+from metrics import (
+    Histogram, Metrics, TimedQueuePool, install_statement_metrics
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def metriques(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return response.text
+
+
+def valeur(texte, serie):
+    """Valeur d’une série exacte (nom et étiquettes), 0 si absente."""
+    for ligne in texte.splitlines():
+        nom, _, nombre = ligne.rpartition(" ")
+        if nom == serie:
+            return float(nombre)
+    return 0.0
+
+
+def serie_http(method, route, status):
+    return (
+        f'http_requests_total{{method="{method}",route="{route}",'
+        f'status="{status}"}}'
+    )
+
+
+def creer_client(client):
+    return client.post("/api/v1/client/", json={
+        "nom": "Dupont", "prenom": "Jean", "adresse": "1 rue de Paris"
+    }).json()["codcli"]
+
+
+# --------------------------------------------------------------------
+# HISTOGRAMMES
+# --------------------------------------------------------------------
+
+def test_histogramme_cumulatif():
+    histogramme = Histogram((0.1, 1.0))
+    for valeur_observee in (0.05, 0.1, 0.5, 3.0):
+        histogramme.observe(valeur_observee)
+
+    cumuls, somme, total = histogramme.snapshot()
+    assert cumuls == [2, 3]
+    assert total == 4
+    assert somme == pytest.approx(3.65)
+
+
+def test_rendu_prometheus():
+    registre = Metrics()
+    registre.request_started("GET")
+    registre.request_finished("GET", "/api/v1/client/{client_id}", 200, 0.02)
+    texte = registre.render()
+
+    assert "# TYPE http_request_duration_seconds histogram" in texte
+    prefixe = (
+        'http_request_duration_seconds_bucket{method="GET",'
+        'route="/api/v1/client/{client_id}",le='
+    )
+    assert valeur(texte, prefixe + '"0.01"}') == 0
+    assert valeur(texte, prefixe + '"0.025"}') == 1
+    assert valeur(texte, prefixe + '"+Inf"}') == 1
+    assert valeur(texte, 'http_requests_in_flight{method="GET"}') == 0
+
+
+def test_routes_pre_enregistrees(client):
+    texte = metriques(client)
+    assert (
+        'http_request_duration_seconds_count{method="DELETE",'
+        'route="/api/v1/client/{client_id}"}'
+    ) in texte
+
+
+# --------------------------------------------------------------------
+# REQUÊTES HTTP
+# --------------------------------------------------------------------
+
+def test_compteurs_par_gabarit_de_route(client):
+    route = "/api/v1/client/{client_id}"
+    avant = metriques(client)
+    cid = creer_client(client)
+    client.get(f"/api/v1/client/{cid}")
+    client.get(f"/api/v1/client/{cid + 1}")
+    client.get("/api/v1/client/inconnu/chemin")
+    apres = metriques(client)
+
+    def ecart(serie):
+        return valeur(apres, serie) - valeur(avant, serie)
+
+    assert ecart(serie_http("GET", route, 200)) == 1
+    assert ecart(serie_http("GET", route, 404)) == 1
+    assert ecart(serie_http("POST", "/api/v1/client/", 200)) == 1
+    assert ecart(serie_http("GET", "<unrouted>", 404)) == 1
+    assert f"/api/v1/client/{cid}\"" not in apres
+
+
+def test_routes_hors_client_non_mesurees(client):
+    client.get("/")
+    assert 'route="/"' not in metriques(client)
+    assert 'route="/metrics"' not in metriques(client)
+
+
+def test_requetes_en_cours(client, monkeypatch):
+    cid = creer_client(client)
+    en_cours, liberer = threading.Event(), threading.Event()
+    originale = ClientRepository.get_client_by_id
+    monkeypatch.setattr(module_app, "client_cache", None)
+    monkeypatch.setattr(module_app, "client_reads", None)
+
+    def bloquer(self, client_id):
+        en_cours.set()
+        liberer.wait()
+        return originale(self, client_id)
+
+    monkeypatch.setattr(ClientRepository, "get_client_by_id", bloquer)
+    serie = 'http_requests_in_flight{method="GET"}'
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        lecture = pool.submit(client.get, f"/api/v1/client/{cid}")
+        en_cours.wait()
+        pendant = valeur(metriques(client), serie)
+        liberer.set()
+        lecture.result()
+    assert pendant == 1
+    assert valeur(metriques(client), serie) == 0
+
+
+def test_refus_d_admission_comptes(client, monkeypatch):
+    limiter = AdmissionLimiter("read", 0, 0)
+    monkeypatch.setattr(module_app, "read_admission", limiter)
+    serie = serie_http("GET", "<unrouted>", 503)
+    avant = valeur(metriques(client), serie)
+    assert client.get("/api/v1/client/").status_code == 503
+    texte = metriques(client)
+    assert valeur(texte, serie) == avant + 1
+    assert valeur(texte, 'admission_rejected_total{limiter="read"}') == 1
+    assert 'limiter="write"' not in texte
+
+
+def test_charge_d_admission_exposee(client, monkeypatch):
+    limiter = AdmissionLimiter("write", 4, 8)
+    monkeypatch.setattr(module_app, "write_admission", limiter)
+    creer_client(client)
+    texte = metriques(client)
+    for serie, attendu in (
+        ("admission_concurrency_limit", 4),
+        ("admission_queue_limit", 8),
+        ("admission_active", 0),
+        ("admission_queue_depth", 0),
+        ("admission_admitted_total", 1),
+        ("admission_queued_total", 0),
+        ("admission_rejected_total", 0),
+    ):
+        assert valeur(texte, f'{serie}{{limiter="write"}}') == attendu
+    assert "# TYPE admission_rejected_total counter" in texte
+
+
+def test_metriques_desactivees(client, monkeypatch):
+    monkeypatch.setattr(module_app, "metrics", None)
+    assert client.get("/metrics").status_code == 404
+
+
+# --------------------------------------------------------------------
+# BASE DE DONNÉES
+# --------------------------------------------------------------------
+
+def test_duree_des_requetes_sql(client):
+    serie = 'db_statement_duration_seconds_count{operation="INSERT"}'
+    avant = valeur(metriques(client), serie)
+    creer_client(client)
+    assert valeur(metriques(client), serie) == avant + 1
+
+    serie = 'db_statement_duration_seconds_count{operation="OTHER"}'
+    avant = valeur(metriques(client), serie)
+    with engine.connect() as conn:
+        conn.execute(text("VALUES (1)"))
+    assert valeur(metriques(client), serie) == avant + 1
+
+
+def test_requete_sql_en_echec(tmp_path):
+    db_engine = create_engine(f"sqlite:///{tmp_path / 'echec.db'}")
+    mesures = Metrics()
+    install_statement_metrics(db_engine, mesures)
+    with db_engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM absente"))
+        # Aucun chronomètre laissé sur la connexion, rendue au pool
+        assert conn.info == {}
+        conn.execute(text("SELECT 1"))
+    serie = 'db_statement_duration_seconds_count{operation="SELECT"}'
+    assert valeur(mesures.render(), serie) == 1
+    db_engine.dispose()
+
+
+def test_statistiques_du_pool(client):
+    texte = metriques(client)
+    assert 'db_pool_checked_out{pool="sync"} 0' in texte
+    assert valeur(texte, 'db_pool_size{pool="sync"}') >= 1
+    assert 'db_pool_overflow{pool="sync"}' in texte
+    assert valeur(texte, 'db_pool_wait_seconds_count{pool="sync"}') > 0
+
+
+def test_attente_du_pool_mesuree(tmp_path):
+    db_engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", "default"
+    )
+    assert isinstance(db_engine.pool, TimedQueuePool)
+
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    rendu = Metrics().render([("test", db_engine.pool)])
+    assert valeur(rendu, 'db_pool_wait_seconds_count{pool="test"}') == 1
+    assert valeur(rendu, 'db_pool_checked_in{pool="test"}') == 1
+    db_engine.dispose()
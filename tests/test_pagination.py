@@ -0,0 +1,91 @@
+# ============================================
+# ./tests/test_pagination.py
+# ============================================
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app, Base, engine, MAX_PAGE_SIZE, encode_cursor
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_clients(client, nombre):
+    ids = []
+    for i in range(nombre):
+        response = client.post("/api/v1/client/", json={
+            "nom": f"Nom{i}",
+            "prenom": "Prenom",
+            "adresse": "Adresse"
+        })
+        ids.append(response.json()["codcli"])
+    return ids
+
+
+# --------------------------------------------------------------------
+# PAGINATION PAR CURSEUR
+# --------------------------------------------------------------------
+
+def test_premiere_page_et_curseur(client):
+    ids = creer_clients(client, 5)
+
+    response = client.get("/api/v1/client/?limit=2")
+    assert response.status_code == 200
+    assert [c["codcli"] for c in response.json()] == ids[:2]
+    assert response.headers["X-Next-Cursor"] == encode_cursor(ids[1])
+    assert 'rel="next"' in response.headers["Link"]
+
+
+def test_parcours_complet_par_curseur(client):
+    ids = creer_clients(client, 5)
+
+    vus = []
+    url = "/api/v1/client/?limit=2"
+    while True:
+        response = client.get(url)
+        vus.extend(c["codcli"] for c in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        url = f"/api/v1/client/?limit=2&cursor={cursor}"
+
+    assert vus == ids
+
+
+def test_parametre_after(client):
+    ids = creer_clients(client, 4)
+
+    response = client.get(f"/api/v1/client/?after={ids[1]}")
+    assert [c["codcli"] for c in response.json()] == ids[2:]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_derniere_page_exacte_sans_curseur(client):
+    creer_clients(client, 2)
+
+    response = client.get("/api/v1/client/?limit=2")
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_taille_de_page_maximale(client):
+    response = client.get(f"/api/v1/client/?limit={MAX_PAGE_SIZE + 1}")
+    assert response.status_code == 422
+
+
+def test_curseur_invalide(client):
+    response = client.get("/api/v1/client/?cursor=pas-un-curseur")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Curseur invalide"
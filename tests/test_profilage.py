@@ -0,0 +1,256 @@
+# ============================================
+# ./tests/test_profilage.py
+# ============================================
+
+import os
+import signal
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app as module_app
+from app import app, Base, engine
+from profiler import (
+    ProfileStore, ProfilerBusy, ProfilingMiddleware, SamplingProfiler,
+    collapse_stack, install_signal_handler, render_collapsed, token_matches
+)
+
+JETON = "secret-admin"
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(module_app, "PROFILER_TOKEN", JETON)
+    return TestClient(app)
+
+
+@pytest.fixture
+def profileur():
+    return SamplingProfiler(interval=0.001)
+
+
+def calcul_intensif(stop):
+    """Occupe le processeur jusqu’à ``stop``."""
+    total = 0
+    while not stop.is_set():
+        total += sum(range(1000))
+    return total
+
+
+@pytest.fixture
+def thread_occupe():
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=calcul_intensif, args=(stop,), name="occupe"
+    )
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def lignes(collapsed):
+    """Découpe une sortie « collapsed stacks » en (pile, nombre)."""
+    resultat = []
+    for ligne in collapsed.splitlines():
+        pile, _, nombre = ligne.rpartition(" ")
+        resultat.append((pile, int(nombre)))
+    return resultat
+
+
+# --------------------------------------------------------------------
+# PROFILEUR
+# --------------------------------------------------------------------
+
+def test_piles_de_tous_les_threads(profileur, thread_occupe):
+    piles = profileur.profile(0.1)
+    occupe = [pile for pile in piles if pile.startswith("occupe;")]
+    assert occupe
+    assert any("calcul_intensif (test_profilage.py:" in p for p in occupe)
+    assert not any("sampling-profiler" in pile for pile in piles)
+    assert not profileur.active
+
+
+def test_threads_en_attente_ignores(profileur):
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, name="en-attente")
+    thread.start()
+    try:
+        sans = profileur.profile(0.02)
+        avec = profileur.profile(0.02, include_idle=True)
+    finally:
+        stop.set()
+        thread.join()
+    assert not any(pile.startswith("en-attente;") for pile in sans)
+    assert any(
+        pile.startswith("en-attente;") and "wait (threading.py:" in pile
+        for pile in avec
+    )
+
+
+def test_une_seule_session(profileur):
+    session = profileur.start()
+    with pytest.raises(ProfilerBusy):
+        profileur.start()
+    session.stop()
+    profileur.start().stop()
+
+
+def test_format_collapsed():
+    pile = collapse_stack(sys._getframe())
+    assert pile.endswith("test_format_collapsed (test_profilage.py:"
+                         f"{test_format_collapsed.__code__.co_firstlineno})")
+    assert render_collapsed({"a;b": 2, "a": 1}) == "a 1\na;b 2\n"
+
+
+def test_comparaison_du_jeton():
+    assert token_matches("abc", "abc")
+    assert not token_matches("abc", "abd")
+    assert not token_matches("abc", None)
+    assert not token_matches("", "")
+
+
+def test_stockage_borne():
+    store = ProfileStore(max_entries=2)
+    for numero in range(3):
+        store.put(str(numero), f"pile {numero}\n")
+    assert store.get("0") is None
+    assert store.get("2") == "pile 2\n"
+
+
+# --------------------------------------------------------------------
+# ENDPOINT D’ADMINISTRATION
+# --------------------------------------------------------------------
+
+def test_profil_par_endpoint(client, thread_occupe):
+    response = client.get(
+        "/api/v1/admin/profile?seconds=0.1",
+        headers={"X-Admin-Token": JETON}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    piles = lignes(response.text)
+    assert any(pile.startswith("occupe;") for pile, _ in piles)
+    assert all(nombre > 0 for _, nombre in piles)
+
+
+def test_jeton_exige(client):
+    url = "/api/v1/admin/profile?seconds=0.01"
+    assert client.get(url).status_code == 403
+    assert client.get(
+        url, headers={"X-Admin-Token": "faux"}
+    ).status_code == 403
+
+
+def test_profilage_desactive_sans_jeton(monkeypatch):
+    monkeypatch.setattr(module_app, "PROFILER_TOKEN", "")
+    response = TestClient(app).get(
+        "/api/v1/admin/profile", headers={"X-Admin-Token": ""}
+    )
+    assert response.status_code == 404
+
+
+def test_duree_bornee(client):
+    response = client.get(
+        "/api/v1/admin/profile?seconds=3600",
+        headers={"X-Admin-Token": JETON}
+    )
+    assert response.status_code == 422
+
+
+def test_profil_deja_en_cours(client):
+    session = module_app.profiler.start()
+    try:
+        response = client.get(
+            "/api/v1/admin/profile?seconds=0.01",
+            headers={"X-Admin-Token": JETON}
+        )
+    finally:
+        session.stop()
+    assert response.status_code == 409
+
+
+# --------------------------------------------------------------------
+# PROFIL D’UNE REQUÊTE CIBLÉE
+# --------------------------------------------------------------------
+
+def test_profil_d_une_requete(client, monkeypatch):
+    api = FastAPI()
+
+    @api.get("/lent")
+    def route_lente():
+        stop = threading.Event()
+        threading.Timer(0.05, stop.set).start()
+        calcul_intensif(stop)
+        return {}
+
+    store = ProfileStore()
+    api.add_middleware(
+        ProfilingMiddleware, profiler=SamplingProfiler(0.001), store=store,
+        token=JETON
+    )
+    cible = TestClient(api)
+
+    assert "X-Profile-Id" not in cible.get("/lent").headers
+    assert "X-Profile-Id" not in cible.get(
+        "/lent", headers={"X-Profile": "faux"}
+    ).headers
+
+    response = cible.get("/lent", headers={"X-Profile": JETON})
+    profil = store.get(response.headers["X-Profile-Id"])
+    assert "route_lente (test_profilage.py:" in profil
+
+    # Lecture par l’endpoint d’administration
+    monkeypatch.setattr(module_app, "request_profiles", store)
+    lu = client.get(
+        f"/api/v1/admin/profile/{response.headers['X-Profile-Id']}",
+        headers={"X-Admin-Token": JETON}
+    )
+    assert lu.text == profil
+    assert client.get(
+        "/api/v1/admin/profile/inconnu", headers={"X-Admin-Token": JETON}
+    ).status_code == 404
+
+
+def test_middleware_absent_sans_jeton():
+    assert not any(
+        middleware.cls is ProfilingMiddleware
+        for middleware in app.user_middleware
+    )
+
+
+# --------------------------------------------------------------------
+# SIGNAL
+# --------------------------------------------------------------------
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="POSIX seulement")
+def test_profil_par_signal(profileur, tmp_path, thread_occupe):
+    precedent = signal.getsignal(signal.SIGUSR2)
+    try:
+        install_signal_handler(profileur, signal.SIGUSR2, 0.05, tmp_path)
+        os.kill(os.getpid(), signal.SIGUSR2)
+        deadline = time.monotonic() + 5
+        while (
+            not list(tmp_path.glob("*.collapsed"))
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR2, precedent)
+
+    (fichier,) = tmp_path.glob("*.collapsed")
+    assert fichier.name.startswith(f"profile-{os.getpid()}-")
+    assert "occupe;" in fichier.read_text(encoding="utf-8")
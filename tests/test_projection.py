@@ -0,0 +1,180 @@
+# ============================================
+# ./tests/test_projection.py
+# ============================================
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import (
+    app, Base, build_client_router, engine, get_async_session_factory
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture(params=["sync", "async"])
+def mode(request):
+    if request.param == "async":
+        pytest.importorskip("aiosqlite")
+    return request.param
+
+
+@pytest.fixture
+def client(mode):
+    if mode == "sync":
+        yield TestClient(app)
+        return
+    async_app = FastAPI()
+    async_app.include_router(build_client_router("async"))
+    with TestClient(async_app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def query_engine(mode):
+    """Les instructions sont relevées sur le moteur du mode testé."""
+    if mode == "sync":
+        return engine
+    return get_async_session_factory().kw["bind"].sync_engine
+
+
+def creer_clients(client, nombre=3):
+    return [
+        client.post("/api/v1/client/", json={
+            "nom": f"Nom{i}", "prenom": "Prenom", "adresse": "Adresse",
+            "email": f"client{i}@exemple.fr"
+        }).json()["codcli"]
+        for i in range(nombre)
+    ]
+
+
+def selects(statements):
+    return [s for s in statements if s.startswith("SELECT")]
+
+
+def colonnes_lues(statement):
+    return statement.split(" FROM ")[0]
+
+
+# --------------------------------------------------------------------
+# LISTE
+# --------------------------------------------------------------------
+
+def test_liste_projetee(client, statements):
+    ids = creer_clients(client)
+    statements.clear()
+
+    response = client.get("/api/v1/client/?fields=codcli,nom,email")
+    assert response.status_code == 200
+    assert response.json()[0] == {
+        "codcli": ids[0], "nom": "Nom0", "email": "client0@exemple.fr"
+    }
+    # Seules les colonnes utiles sont lues (version pour l’ETag)
+    lues = colonnes_lues(selects(statements)[-1])
+    assert "email" in lues and "version" in lues
+    assert "adresse" not in lues and "prenom" not in lues
+
+
+def test_liste_projetee_ordre_et_pagination(client):
+    creer_clients(client)
+
+    response = client.get("/api/v1/client/?fields=email,nom,email&limit=2")
+    assert list(response.json()[0]) == ["email", "nom"]
+    assert "fields=email%2Cnom" in response.headers["Link"]
+
+    suivante = client.get(
+        "/api/v1/client/?fields=email,nom&limit=2&cursor="
+        + response.headers["X-Next-Cursor"]
+    )
+    assert suivante.json() == [{"email": "client2@exemple.fr", "nom": "Nom2"}]
+
+
+def test_etag_de_page_propre_a_la_projection(client):
+    creer_clients(client)
+
+    complete = client.get("/api/v1/client/")
+    projetee = client.get("/api/v1/client/?fields=nom")
+    assert complete.headers["ETag"] != projetee.headers["ETag"]
+
+    response = client.get(
+        "/api/v1/client/?fields=nom",
+        headers={"If-None-Match": projetee.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+# --------------------------------------------------------------------
+# CLIENT
+# --------------------------------------------------------------------
+
+def test_client_projete(client, statements):
+    cid = creer_clients(client, 1)[0]
+    statements.clear()
+
+    response = client.get(f"/api/v1/client/{cid}?fields=nom,email")
+    assert response.json() == {"nom": "Nom0", "email": "client0@exemple.fr"}
+    assert response.headers["ETag"].startswith("W/")
+    for statement in selects(statements):
+        assert "adresse" not in colonnes_lues(statement)
+
+    response = client.get(
+        f"/api/v1/client/{cid}?fields=nom",
+        headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_client_projete_inexistant(client):
+    response = client.get("/api/v1/client/9999?fields=nom")
+    assert response.status_code == 404
+
+
+def test_etag_faible_refuse_en_if_match(client):
+    cid = creer_clients(client, 1)[0]
+    etag = client.get(f"/api/v1/client/{cid}?fields=nom").headers["ETag"]
+
+    response = client.patch(
+        f"/api/v1/client/{cid}", json={"nom": "Modif"},
+        headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+
+# --------------------------------------------------------------------
+# EXPORT ET ERREURS
+# --------------------------------------------------------------------
+
+def test_export_projete(client):
+    creer_clients(client, 2)
+
+    response = client.get("/api/v1/client/export?fields=codcli,email")
+    lignes = [json.loads(ligne) for ligne in response.text.splitlines()]
+    assert [list(ligne) for ligne in lignes] == [["codcli", "email"]] * 2
+
+    response = client.get("/api/v1/client/export?format=csv&fields=nom")
+    lignes = list(csv.reader(io.StringIO(response.text)))
+    assert lignes == [["nom"], ["Nom0"], ["Nom1"]]
+
+
+@pytest.mark.parametrize("url", [
+    "/api/v1/client/?fields=nom,mot_de_passe",
+    "/api/v1/client/1?fields=inconnu",
+    "/api/v1/client/export?fields=nom,inconnu",
+    "/api/v1/client/?fields=,",
+])
+def test_champ_inconnu(client, url):
+    creer_clients(client, 1)
+    response = client.get(url)
+    assert response.status_code == 400
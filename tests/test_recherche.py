@@ -0,0 +1,176 @@
+# ============================================
+# ./tests/test_recherche.py
+# ============================================
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+
+from app import (
+    app, Base, engine, init_db, prefix_upper_bound, select_clients_page
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+CLIENTS = [
+    ("Dupont", "Jean", "jean.dupont@exemple.fr", "0601020304", 1),
+    ("Durand", "Marie", "marie@exemple.fr", "0611223344", 0),
+    ("Dupuis", "Jeanne", "jeanne@autre.org", "0145678901", 1),
+    ("Martin", "Paul", "paul.martin@exemple.fr", None, 0),
+]
+
+
+def creer_clients(client):
+    for nom, prenom, email, tel, newsletter in CLIENTS:
+        client.post("/api/v1/client/", json={
+            "nom": nom, "prenom": prenom, "adresse": "Adresse",
+            "email": email, "tel": tel, "newsletter": newsletter
+        })
+
+
+def noms(client, query):
+    response = client.get(f"/api/v1/client/?{query}")
+    assert response.status_code == 200
+    return [c["nom"] for c in response.json()]
+
+
+# --------------------------------------------------------------------
+# FILTRES
+# --------------------------------------------------------------------
+
+def test_filtres_exacts(client):
+    creer_clients(client)
+
+    assert noms(client, "nom=Dupont") == ["Dupont"]
+    assert noms(client, "prenom=Jean") == ["Dupont"]
+    assert noms(client, "email=marie@exemple.fr") == ["Durand"]
+    assert noms(client, "tel=0145678901") == ["Dupuis"]
+    assert noms(client, "nom=Dup") == []
+
+
+def test_filtres_par_prefixe(client):
+    creer_clients(client)
+
+    assert noms(client, "nom_prefix=Dup") == ["Dupont", "Dupuis"]
+    assert noms(client, "prenom_prefix=Jean") == ["Dupont", "Dupuis"]
+    assert noms(client, "email_prefix=jean") == ["Dupont", "Dupuis"]
+    assert noms(client, "tel_prefix=06") == ["Dupont", "Durand"]
+    # Comparaison binaire : le préfixe respecte la casse
+    assert noms(client, "nom_prefix=dup") == []
+
+
+def test_filtre_newsletter_et_cumul(client):
+    creer_clients(client)
+
+    assert noms(client, "newsletter=1") == ["Dupont", "Dupuis"]
+    assert noms(client, "newsletter=0&nom_prefix=D") == ["Durand"]
+    assert client.get("/api/v1/client/?newsletter=2").status_code == 422
+    assert client.get("/api/v1/client/?nom_prefix=").status_code == 422
+
+
+def test_pagination_conserve_les_filtres(client):
+    creer_clients(client)
+
+    response = client.get("/api/v1/client/?nom_prefix=D&limit=2")
+    assert [c["nom"] for c in response.json()] == ["Dupont", "Durand"]
+    lien = response.headers["Link"]
+    assert "nom_prefix=D" in lien
+
+    suivant = lien[lien.index("<") + 1:lien.index(">")]
+    assert [c["nom"] for c in client.get(suivant).json()] == ["Dupuis"]
+
+
+def test_borne_superieure_du_prefixe():
+    assert prefix_upper_bound("Dup") == "Duq"
+    assert prefix_upper_bound("a\U0010FFFF") == "b"
+    assert prefix_upper_bound("\U0010FFFF") is None
+    # Les demi-codets ne sont pas des caractères encodables
+    assert prefix_upper_bound("a\ud7ff") == "a\ue000"
+
+
+def test_prefixe_avant_les_demi_codets(client):
+    creer_clients(client)
+    client.post("/api/v1/client/", json={
+        "nom": "\ud7ff\ud7ff", "prenom": "P", "adresse": "A"
+    })
+
+    response = client.get("/api/v1/client/?nom_prefix=\ud7ff")
+    assert response.status_code == 200
+    assert [c["nom"] for c in response.json()] == ["\ud7ff\ud7ff"]
+
+
+# --------------------------------------------------------------------
+# PLANS D’EXÉCUTION
+# --------------------------------------------------------------------
+
+def plan(filters, after=None):
+    statement = select_clients_page(after, 101, filters=filters)
+    sql = str(statement.compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    ))
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("filters, index", [
+    ({"nom": "Dupont"}, "ix_t_client_nom"),
+    ({"nom_prefix": "Dup"}, "ix_t_client_nom"),
+    ({"prenom_prefix": "Je"}, "ix_t_client_prenom"),
+    ({"email": "a@b.fr"}, "ix_t_client_email"),
+    ({"email_prefix": "jean"}, "ix_t_client_email"),
+    ({"tel_prefix": "06"}, "ix_t_client_tel"),
+    ({"newsletter": 1}, "ix_t_client_newsletter"),
+])
+def test_filtre_par_index(filters, index):
+    for after in (None, 42):
+        details = plan(filters, after)
+        assert any(
+            detail.startswith("SEARCH t_client USING")
+            and index in detail
+            for detail in details
+        ), details
+        assert not any(d.startswith("SCAN t_client") for d in details)
+
+
+def test_prefixe_en_parcours_de_plage():
+    details = " ".join(plan({"nom_prefix": "Dup"}))
+    assert "nom>? AND nom<?" in details
+
+
+# --------------------------------------------------------------------
+# MISE À NIVEAU D’UNE BASE EXISTANTE
+# --------------------------------------------------------------------
+
+def test_init_db_cree_les_index(tmp_path):
+    ancien = create_engine(f"sqlite:///{tmp_path / 'ancienne.db'}")
+    with ancien.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE t_client (codcli INTEGER PRIMARY KEY, "
+            "nom VARCHAR(40), prenom VARCHAR(30), genre VARCHAR(8), "
+            "adresse VARCHAR(50), complement_adresse VARCHAR(50), "
+            "tel VARCHAR(10), email VARCHAR(255), newsletter INTEGER)"
+        ))
+
+    init_db(ancien)
+    init_db(ancien)
+
+    index = {i["name"] for i in inspect(ancien).get_indexes("t_client")}
+    assert {
+        "ix_t_client_nom", "ix_t_client_prenom", "ix_t_client_email",
+        "ix_t_client_tel", "ix_t_client_newsletter"
+    } <= index
+    ancien.dispose()
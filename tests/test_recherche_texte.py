@@ -0,0 +1,179 @@
+# ============================================
+# ./tests/test_recherche_texte.py
+# ============================================
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+
+import manage
+from app import (
+    app, Base, engine, init_db, search_match_query, CLIENT_SEARCH_TABLE
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_client(client, nom, prenom="Prenom", adresse="Adresse", **champs):
+    return client.post("/api/v1/client/", json=dict(
+        nom=nom, prenom=prenom, adresse=adresse, **champs
+    )).json()["codcli"]
+
+
+def rechercher(client, q, **params):
+    response = client.get("/api/v1/client/search", params=dict(q=q, **params))
+    assert response.status_code == 200
+    return [c["nom"] for c in response.json()]
+
+
+# --------------------------------------------------------------------
+# RECHERCHE
+# --------------------------------------------------------------------
+
+def test_fragment_au_milieu_des_champs(client):
+    creer_client(client, "Dupont", adresse="12 rue des Lilas")
+    creer_client(client, "Martin", complement_adresse="Bâtiment Lilas")
+    creer_client(client, "Durand", prenom="Apollinaire")
+
+    assert rechercher(client, "upon") == ["Dupont"]
+    assert rechercher(client, "lilas") == ["Dupont", "Martin"]
+    assert rechercher(client, "POLL") == ["Durand"]
+    assert rechercher(client, "introuvable") == []
+
+
+def test_mots_cumules(client):
+    creer_client(client, "Dupont", adresse="rue des Lilas")
+    creer_client(client, "Dupont", adresse="avenue Foch")
+
+    assert rechercher(client, "dupont lilas") == ["Dupont"]
+    # Les mots trop courts pour un trigramme sont ignorés
+    assert len(rechercher(client, "dupont de")) == 2
+
+
+def test_classement_par_pertinence(client):
+    creer_client(client, "Martin", adresse="Adresse quelconque")
+    creer_client(client, "Martin", prenom="Martine", adresse="rue Martin")
+
+    response = client.get("/api/v1/client/search?q=martin")
+    assert [c["prenom"] for c in response.json()] == ["Martine", "Prenom"]
+
+
+def test_pagination_de_la_recherche(client):
+    for i in range(5):
+        creer_client(client, f"Lefebvre{i}")
+
+    response = client.get("/api/v1/client/search?q=lefebvre&limit=2")
+    assert len(response.json()) == 2
+    lien = response.headers["Link"]
+    assert "/search?" in lien and "q=lefebvre" in lien
+
+    vus = [c["codcli"] for c in response.json()]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get(
+            "/api/v1/client/search",
+            params={"q": "lefebvre", "limit": 2,
+                    "cursor": response.headers["X-Next-Cursor"]}
+        )
+        vus += [c["codcli"] for c in response.json()]
+    assert len(vus) == len(set(vus)) == 5
+
+
+def test_requete_trop_courte_ou_invalide(client):
+    assert client.get("/api/v1/client/search?q=ab").status_code == 422
+    assert client.get("/api/v1/client/search").status_code == 422
+    response = client.get("/api/v1/client/search?q=abc&cursor=xyz")
+    assert response.status_code == 400
+
+
+def test_operateurs_pris_litteralement(client):
+    creer_client(client, 'Du "Pont"', adresse="OR NOT")
+
+    assert rechercher(client, '"pont"') == ['Du "Pont"']
+    assert rechercher(client, "NOT OR*") == []
+    assert search_match_query('a NEAR(') == '"NEAR("'
+    assert search_match_query('ab') is None
+
+
+# --------------------------------------------------------------------
+# SYNCHRONISATION PAR TRIGGERS
+# --------------------------------------------------------------------
+
+def test_index_suit_les_ecritures(client):
+    cid = creer_client(client, "Ancien")
+    assert rechercher(client, "ancien") == ["Ancien"]
+
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Nouveau"})
+    assert rechercher(client, "ancien") == []
+    assert rechercher(client, "nouveau") == ["Nouveau"]
+
+    client.delete(f"/api/v1/client/{cid}")
+    assert rechercher(client, "nouveau") == []
+
+
+def test_index_suit_les_ecritures_en_masse(client):
+    items = [{"nom": f"Masse{i}", "prenom": "P", "adresse": "A"}
+             for i in range(3)]
+    ids = client.post("/api/v1/client/bulk", json=items).json()["codcli"]
+    assert len(rechercher(client, "masse")) == 3
+
+    client.patch("/api/v1/client/bulk", json={
+        "ids": ids[:1], "patch": {"nom": "Autre"}
+    })
+    client.request("DELETE", "/api/v1/client/bulk", json={"ids": ids[1:2]})
+    assert rechercher(client, "masse") == ["Masse2"]
+
+
+# --------------------------------------------------------------------
+# BASE EXISTANTE ET RECONSTRUCTION
+# --------------------------------------------------------------------
+
+def test_init_db_indexe_une_base_existante(tmp_path):
+    ancien = create_engine(f"sqlite:///{tmp_path / 'ancienne.db'}")
+    with ancien.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE t_client (codcli INTEGER PRIMARY KEY, "
+            "nom VARCHAR(40), prenom VARCHAR(30), genre VARCHAR(8), "
+            "adresse VARCHAR(50), complement_adresse VARCHAR(50), "
+            "tel VARCHAR(10), email VARCHAR(255), newsletter INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO t_client (nom, adresse) VALUES ('Ancien', 'Lilas')"
+        ))
+
+    init_db(ancien)
+
+    assert inspect(ancien).has_table(CLIENT_SEARCH_TABLE)
+    with ancien.connect() as conn:
+        trouve = conn.execute(text(
+            f"SELECT rowid FROM {CLIENT_SEARCH_TABLE} "
+            f"WHERE {CLIENT_SEARCH_TABLE} MATCH 'lilas'"
+        )).scalars().all()
+    assert trouve == [1]
+    ancien.dispose()
+
+
+def test_commande_de_reconstruction(client, capsys):
+    creer_client(client, "Reconstruit")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"INSERT INTO {CLIENT_SEARCH_TABLE}({CLIENT_SEARCH_TABLE}) "
+            "VALUES ('delete-all')"
+        )
+    assert rechercher(client, "reconstruit") == []
+
+    manage.main(["rebuild-search"])
+
+    assert "1 clients" in capsys.readouterr().out
+    assert rechercher(client, "reconstruit") == ["Reconstruit"]
@@ -0,0 +1,82 @@
+# ============================================
+# ./tests/test_requetes_sql.py
+# ============================================
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app, Base, engine
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_client(client):
+    return client.post("/api/v1/client/", json={
+        "nom": "Nom",
+        "prenom": "Prenom",
+        "adresse": "Adresse"
+    }).json()["codcli"]
+
+
+# --------------------------------------------------------------------
+# UNE SEULE INSTRUCTION PAR ÉCRITURE
+# --------------------------------------------------------------------
+
+def test_create_une_instruction(client, statements):
+    creer_client(client)
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+    assert "RETURNING" in statements[0]
+
+
+def test_patch_une_instruction(client, statements):
+    cid = creer_client(client)
+    statements.clear()
+
+    response = client.patch(f"/api/v1/client/{cid}", json={"nom": "Modif"})
+    assert response.status_code == 200
+    assert response.json()["nom"] == "Modif"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE")
+
+
+def test_patch_inexistant_une_instruction(client, statements):
+    response = client.patch("/api/v1/client/9999", json={"nom": "Modif"})
+    assert response.status_code == 404
+    assert len(statements) == 1
+
+
+def test_delete_une_instruction(client, statements):
+    cid = creer_client(client)
+    statements.clear()
+
+    response = client.delete(f"/api/v1/client/{cid}")
+    assert response.status_code == 200
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE")
+
+
+def test_delete_inexistant_une_instruction(client, statements):
+    response = client.delete("/api/v1/client/9999")
+    assert response.status_code == 404
+    assert len(statements) == 1
+
+
+def test_get_une_instruction(client, statements):
+    cid = creer_client(client)
+    statements.clear()
+
+    assert client.get(f"/api/v1/client/{cid}").status_code == 200
+    assert len(statements) == 1
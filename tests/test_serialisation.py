@@ -0,0 +1,150 @@
+# ============================================
+# ./tests/test_serialisation.py
+# ============================================
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as module_app
+from app import (
+    app, Base, engine, dumps_json, SessionLocal, ClientRepository,
+    ClientService, ClientInDB, ClientRecord
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_clients(client):
+    client.post("/api/v1/client/", json={
+        "nom": "Éloïse",
+        "prenom": "Zoë \"ß\" 😀",
+        "adresse": "1, rue des Lilas\\Bis",
+        "newsletter": 1
+    })
+    client.post("/api/v1/client/", json={
+        "nom": "Sans",
+        "prenom": "Options",
+        "adresse": "Adresse",
+        "genre": None,
+        "email": None
+    })
+    client.post("/api/v1/client/", json={
+        "nom": "Dernier",
+        "prenom": "Client",
+        "adresse": "Adresse"
+    })
+
+
+def lire_liste(client, monkeypatch, rapide, url="/api/v1/client/"):
+    monkeypatch.setattr(module_app, "CLIENT_FAST_JSON", rapide)
+    return client.get(url)
+
+
+# --------------------------------------------------------------------
+# CONTRAT DU CHEMIN RAPIDE
+# --------------------------------------------------------------------
+
+def test_liste_identique_octet_pour_octet(client, monkeypatch):
+    creer_clients(client)
+
+    standard = lire_liste(client, monkeypatch, False)
+    rapide = lire_liste(client, monkeypatch, True)
+
+    assert rapide.status_code == standard.status_code == 200
+    assert rapide.content == standard.content
+    assert rapide.headers["content-type"] == standard.headers["content-type"]
+    assert rapide.headers["ETag"] == standard.headers["ETag"]
+
+
+def test_page_identique_avec_curseur(client, monkeypatch):
+    creer_clients(client)
+
+    url = "/api/v1/client/?limit=2"
+    standard = lire_liste(client, monkeypatch, False, url)
+    rapide = lire_liste(client, monkeypatch, True, url)
+
+    assert rapide.content == standard.content
+    assert rapide.headers["X-Next-Cursor"] == standard.headers["X-Next-Cursor"]
+    assert rapide.headers["Link"] == standard.headers["Link"]
+
+
+def test_liste_vide_et_304(client, monkeypatch):
+    vide = lire_liste(client, monkeypatch, True)
+    assert vide.content == b"[]"
+
+    creer_clients(client)
+    etag = lire_liste(client, monkeypatch, True).headers["ETag"]
+    response = client.get(
+        "/api/v1/client/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_repli_sans_orjson(client, monkeypatch):
+    creer_clients(client)
+    standard = lire_liste(client, monkeypatch, False)
+
+    monkeypatch.setattr(module_app, "orjson", None)
+    rapide = lire_liste(client, monkeypatch, True)
+    assert rapide.content == standard.content
+
+
+def test_dumps_json_compatible():
+    contenu = {"nom": "Éloïse 😀", "tel": None, "newsletter": 0}
+    assert json.loads(dumps_json(contenu)) == contenu
+    assert dumps_json(contenu) == json.dumps(
+        contenu, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+# --------------------------------------------------------------------
+# LECTURES SANS OBJETS ORM
+# --------------------------------------------------------------------
+
+def test_lecture_en_enregistrements(client):
+    creer_clients(client)
+
+    db = SessionLocal()
+    try:
+        repo = ClientRepository(db)
+        clients = repo.get_all_clients()
+        premier = repo.get_client_by_id(clients[0].codcli)
+
+        assert all(isinstance(c, ClientRecord) for c in clients)
+        assert [c.nom for c in clients] == ["Éloïse", "Sans", "Dernier"]
+        assert premier == clients[0]
+        assert repo.get_client_by_id(9999) is None
+        # Aucune instance ORM n’entre dans l’identity map
+        assert len(db.identity_map) == 0
+        with pytest.raises(AttributeError):
+            premier.nom = "Modif"
+    finally:
+        db.close()
+
+
+def test_enregistrement_conforme_a_clientindb(client):
+    creer_clients(client)
+
+    db = SessionLocal()
+    try:
+        service = ClientService(ClientRepository(db))
+        for record in service.repository.get_all_clients():
+            attendu = ClientInDB.parse_obj(record._asdict()).dict()
+            assert service.get_client_by_id(record.codcli) == attendu
+            assert list(attendu) == list(record._fields)
+    finally:
+        db.close()
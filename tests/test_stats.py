@@ -0,0 +1,171 @@
+# ============================================
+# ./tests/test_stats.py
+# ============================================
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+import manage
+from app import (
+    app, Base, engine, init_db, reconcile_client_stats, CLIENT_STATS_TABLE
+)
+
+# --------------------------------------------------------------------
+# FIXTURES
+# --------------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def creer_client(client, genre=None, newsletter=0):
+    return client.post("/api/v1/client/", json={
+        "nom": "Nom", "prenom": "Prenom", "adresse": "Adresse",
+        "genre": genre, "newsletter": newsletter
+    }).json()["codcli"]
+
+
+def stats(client):
+    response = client.get("/api/v1/client/stats")
+    assert response.status_code == 200
+    return response.json()
+
+
+def repartition(buckets):
+    return {bucket["value"]: bucket["count"] for bucket in buckets}
+
+
+# --------------------------------------------------------------------
+# COMPTEURS
+# --------------------------------------------------------------------
+
+def test_stats_base_vide(client):
+    assert stats(client) == {
+        "total": 0, "newsletter_ratio": 0.0, "newsletter": [], "genre": []
+    }
+
+
+def test_stats_apres_creations(client):
+    creer_client(client, "F", 1)
+    creer_client(client, "F", 0)
+    creer_client(client, None, 1)
+    creer_client(client, "M", 1)
+
+    resultat = stats(client)
+    assert resultat["total"] == 4
+    assert resultat["newsletter_ratio"] == 0.75
+    assert repartition(resultat["newsletter"]) == {0: 1, 1: 3}
+    assert repartition(resultat["genre"]) == {"F": 2, "M": 1, None: 1}
+
+
+def test_stats_suivent_modifications_et_suppressions(client):
+    cid = creer_client(client, "F", 0)
+    autre = creer_client(client, "M", 0)
+
+    client.patch(f"/api/v1/client/{cid}", json={"newsletter": 1})
+    client.patch(f"/api/v1/client/{cid}", json={"nom": "Sans effet"})
+    client.delete(f"/api/v1/client/{autre}")
+
+    resultat = stats(client)
+    assert resultat["total"] == 1
+    assert repartition(resultat["newsletter"]) == {1: 1}
+    assert repartition(resultat["genre"]) == {"F": 1}
+
+
+def test_stats_suivent_les_ecritures_en_masse(client):
+    items = [
+        {"nom": "N", "prenom": "P", "adresse": "A", "newsletter": i % 2}
+        for i in range(6)
+    ]
+    client.post("/api/v1/client/bulk", json=items)
+    client.patch("/api/v1/client/bulk", json={
+        "filter": {"newsletter": 0}, "patch": {"genre": "X"}
+    })
+    client.request(
+        "DELETE", "/api/v1/client/bulk", json={"filter": {"newsletter": 1}}
+    )
+
+    resultat = stats(client)
+    assert resultat["total"] == 3
+    assert repartition(resultat["genre"]) == {"X": 3}
+    assert reconcile_client_stats(engine) == []
+
+
+def test_stats_sans_parcours_de_la_table(client):
+    creer_client(client)
+    executees = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executees.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        stats(client)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert len(executees) == 1
+    assert "t_client " not in executees[0] + " "
+    assert CLIENT_STATS_TABLE in executees[0]
+
+
+# --------------------------------------------------------------------
+# RÉCONCILIATION
+# --------------------------------------------------------------------
+
+def test_reconciliation_corrige_la_derive(client, capsys):
+    creer_client(client, "F", 1)
+    creer_client(client, "F", 1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"UPDATE {CLIENT_STATS_TABLE} SET count = 7 "
+            "WHERE dimension = 'total'"
+        ))
+        conn.execute(text(
+            f"DELETE FROM {CLIENT_STATS_TABLE} WHERE dimension = 'genre'"
+        ))
+    assert stats(client)["total"] == 7
+
+    assert manage.main(["reconcile-stats", "--fail-on-drift"]) == 1
+    sortie = capsys.readouterr().out
+    assert "total=None : 7 -> 2" in sortie
+    assert "genre='F' : 0 -> 2" in sortie
+
+    assert stats(client)["total"] == 2
+    assert repartition(stats(client)["genre"]) == {"F": 2}
+    assert manage.main(["reconcile-stats", "--fail-on-drift"]) == 0
+
+
+def test_init_db_compte_une_base_existante(tmp_path):
+    ancien = create_engine(f"sqlite:///{tmp_path / 'ancienne.db'}")
+    with ancien.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE t_client (codcli INTEGER PRIMARY KEY, "
+            "nom VARCHAR(40), prenom VARCHAR(30), genre VARCHAR(8), "
+            "adresse VARCHAR(50), complement_adresse VARCHAR(50), "
+            "tel VARCHAR(10), email VARCHAR(255), newsletter INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO t_client (nom, genre, newsletter) "
+            "VALUES ('A', 'F', 1), ('B', NULL, 0)"
+        ))
+
+    init_db(ancien)
+    with ancien.begin() as conn:
+        conn.execute(text("INSERT INTO t_client (nom) VALUES ('C')"))
+
+    assert reconcile_client_stats(ancien) == []
+    with ancien.connect() as conn:
+        total = conn.execute(text(
+            f"SELECT count FROM {CLIENT_STATS_TABLE} "
+            "WHERE dimension = 'total'"
+        )).scalar()
+    assert total == 3
+    ancien.dispose()